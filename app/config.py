@@ -16,6 +16,29 @@ class Settings:
     GOOGLE_CLIENT_ID: str | None = None
     CORS_ORIGINS: str = "*"
     LOG_LEVEL: str = "INFO"
+    CALENDAR_OUTBOX_WORKER: bool = True
+    CALENDAR_OUTBOX_POLL_SECONDS: float = 2.0
+    GOOGLE_EVENTS_CACHE_TTL: float = 300.0
+    GOOGLE_EVENTS_CACHE_SIZE: int = 64
+    PDF_CACHE_DIR: str = "cache/pdfs"
+    PDF_CACHE_MAX_BYTES: int = 100 * 1024 * 1024
+    PDF_RENDER_WORKERS: int = 2
+    PDF_RENDER_QUEUE_LIMIT: int = 8
+    PDF_RENDER_TIMEOUT: float = 60.0
+    AUTH_TOKEN_CACHE_SIZE: int = 1024
+    AUTH_USER_CACHE_TTL: float = 30.0
+    AUTH_USER_CACHE_SIZE: int = 256
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_PGBOUNCER: bool = False
+    LIST_PAGINATION_COMPAT: bool = True
+    LIST_DEFAULT_LIMIT: int = 100
+    LIST_MAX_LIMIT: int = 1000
 
 
 _CAL_ID_RE = re.compile(r"^[A-Za-z0-9_-]+@group\.calendar\.google\.com$")
@@ -29,6 +52,14 @@ def _getenv(key: str, default: str | None = None) -> str | None:
     return value
 
 
+def _getbool(key: str, default: bool) -> bool:
+    """Interpret an environment variable as a boolean flag."""
+    value = _getenv(key)
+    if value is None or value == "":
+        return default
+    return value.lower() in {"1", "true", "yes", "on"}
+
+
 def load_settings() -> Settings:
     missing = []
     database_url = _getenv("DATABASE_URL")
@@ -58,6 +89,31 @@ def load_settings() -> Settings:
         GOOGLE_CLIENT_ID=_getenv("GOOGLE_CLIENT_ID"),
         CORS_ORIGINS=_getenv("CORS_ORIGINS", "*"),
         LOG_LEVEL=_getenv("LOG_LEVEL", "INFO"),
+        CALENDAR_OUTBOX_WORKER=_getbool("CALENDAR_OUTBOX_WORKER", True),
+        CALENDAR_OUTBOX_POLL_SECONDS=float(
+            _getenv("CALENDAR_OUTBOX_POLL_SECONDS", "2")
+        ),
+        GOOGLE_EVENTS_CACHE_TTL=float(_getenv("GOOGLE_EVENTS_CACHE_TTL", "300")),
+        GOOGLE_EVENTS_CACHE_SIZE=int(_getenv("GOOGLE_EVENTS_CACHE_SIZE", "64")),
+        PDF_CACHE_DIR=_getenv("PDF_CACHE_DIR", "cache/pdfs"),
+        PDF_CACHE_MAX_BYTES=int(_getenv("PDF_CACHE_MAX_BYTES", str(100 * 1024 * 1024))),
+        PDF_RENDER_WORKERS=int(_getenv("PDF_RENDER_WORKERS", "2")),
+        PDF_RENDER_QUEUE_LIMIT=int(_getenv("PDF_RENDER_QUEUE_LIMIT", "8")),
+        PDF_RENDER_TIMEOUT=float(_getenv("PDF_RENDER_TIMEOUT", "60")),
+        AUTH_TOKEN_CACHE_SIZE=int(_getenv("AUTH_TOKEN_CACHE_SIZE", "1024")),
+        AUTH_USER_CACHE_TTL=float(_getenv("AUTH_USER_CACHE_TTL", "30")),
+        AUTH_USER_CACHE_SIZE=int(_getenv("AUTH_USER_CACHE_SIZE", "256")),
+        BCRYPT_ROUNDS=int(_getenv("BCRYPT_ROUNDS", "12")),
+        PASSWORD_HASH_WORKERS=int(_getenv("PASSWORD_HASH_WORKERS", "2")),
+        DB_POOL_SIZE=int(_getenv("DB_POOL_SIZE", "5")),
+        DB_MAX_OVERFLOW=int(_getenv("DB_MAX_OVERFLOW", "10")),
+        DB_POOL_TIMEOUT=float(_getenv("DB_POOL_TIMEOUT", "30")),
+        DB_POOL_RECYCLE=int(_getenv("DB_POOL_RECYCLE", "1800")),
+        DB_POOL_PRE_PING=_getbool("DB_POOL_PRE_PING", True),
+        DB_PGBOUNCER=_getbool("DB_PGBOUNCER", False),
+        LIST_PAGINATION_COMPAT=_getbool("LIST_PAGINATION_COMPAT", True),
+        LIST_DEFAULT_LIMIT=int(_getenv("LIST_DEFAULT_LIMIT", "100")),
+        LIST_MAX_LIMIT=int(_getenv("LIST_MAX_LIMIT", "1000")),
     )
 
 
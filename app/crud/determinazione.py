@@ -1,5 +1,12 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models.determinazione import Determinazione
+from app.schemas.determinazione import DeterminazioneResponse
+from app.services.pagination import Keyset, ListParams, Page
+
+KEYSET = Keyset(
+    Determinazione, DeterminazioneResponse, Determinazione.scadenza, Determinazione.id
+)
 
 
 def create_determinazione(db: Session, data):
@@ -16,6 +23,11 @@ def get_determinazioni(db: Session):
     return db.query(Determinazione).all()
 
 
+def get_determinazioni_page(db: Session, params: ListParams) -> Page:
+    """Return a page of determinazioni ordered by ``scadenza``."""
+    return KEYSET.fetch(db, select(Determinazione), params)
+
+
 def update_determinazione(db: Session, determinazione_id: str, data):
     """Update an existing ``Determinazione`` or return ``None`` if absent."""
     db_det = (
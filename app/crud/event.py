@@ -1,6 +1,10 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.event import Event
 from app.models.user import User
+from app.schemas.event import EventResponse
+from app.services.pagination import Keyset, ListParams, Page
 import logging
 
 from app.config import settings
@@ -8,6 +12,8 @@ from app.services import calendar_events
 
 logger = logging.getLogger(__name__)
 
+KEYSET = Keyset(Event, EventResponse, Event.data_ora, Event.id)
+
 
 def create_event(db: Session, data, user: User):
     """Insert a new :class:`Event` for ``user`` from the given schema."""
@@ -28,12 +34,49 @@ def create_event(db: Session, data, user: User):
     return db_event
 
 
+def _visible_events(user: User | None):
+    stmt = select(Event)
+    if user is None:
+        return stmt.where(Event.is_public == True)
+    return stmt.where((Event.is_public == True) | (Event.user_id == user.id))
+
+
+def _events_between(user: User, start, end):
+    return (
+        _visible_events(user)
+        .where(Event.data_ora >= start, Event.data_ora <= end)
+        .order_by(Event.data_ora)
+    )
+
+
 def get_events(db: Session, user: User | None = None):
     """Retrieve events visible to ``user`` (or public if ``None``)."""
-    query = db.query(Event)
-    if user is None:
-        return query.filter(Event.is_public == True).all()
-    return query.filter((Event.is_public == True) | (Event.user_id == user.id)).all()
+    return db.scalars(_visible_events(user)).all()
+
+
+async def get_events_async(db: AsyncSession, user: User | None = None):
+    """Async variant of :func:`get_events`."""
+    return (await db.scalars(_visible_events(user))).all()
+
+
+async def get_events_page_async(
+    db: AsyncSession, params: ListParams, user: User | None = None
+) -> Page:
+    """Return a page of the events visible to ``user`` ordered by ``data_ora``."""
+    return await KEYSET.fetch_async(db, _visible_events(user), params)
+
+
+def get_events_between(db: Session, user: User, start, end):
+    """Return events visible to ``user`` with ``start <= data_ora <= end``.
+
+    Results are ordered by ``data_ora``.
+    """
+    return db.scalars(_events_between(user, start, end)).all()
+
+
+async def get_events_between_async(db: AsyncSession, user: User, start, end):
+    """Async variant of :func:`get_events_between`."""
+    return (await db.scalars(_events_between(user, start, end))).all()
 
 
 def update_event(db: Session, event_id: str, data, user: User):
@@ -1,15 +1,22 @@
 import os
 import uuid
 import logging
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from fastapi import UploadFile, HTTPException
 import aiofiles
 from app.models.pdf_file import PDFFile
-from app.schemas.pdf_file import PDFFileCreate
+from app.schemas.pdf_file import PDFFileCreate, PDFFileResponse
 from app.config import settings
+from app.services.pagination import Keyset, ListParams, Page
 
 logger = logging.getLogger(__name__)
 
+# newest first, as in :func:`get_multi`
+KEYSET = Keyset(
+    PDFFile, PDFFileResponse, PDFFile.uploaded_at, PDFFile.id, descending=True
+)
+
 
 def get_upload_root() -> str:
     """Return the path where PDF files should be stored."""
@@ -53,6 +60,10 @@ def get_multi(db: Session):
     return db.query(PDFFile).order_by(PDFFile.uploaded_at.desc()).all()
 
 
+def get_page(db: Session, params: ListParams) -> Page:
+    return KEYSET.fetch(db, select(PDFFile), params)
+
+
 def delete(db: Session, *, filename: str) -> PDFFile | None:
     """Remove a ``PDFFile`` entry and delete the file from disk."""
     db_obj = db.query(PDFFile).filter(PDFFile.filename == filename).first()
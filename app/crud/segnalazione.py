@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.segnalazione import Segnalazione
 from app.models.user import User
@@ -27,6 +29,12 @@ def get_segnalazioni(db: Session, user: User):
     return db.query(Segnalazione).filter(Segnalazione.user_id == user.id).all()
 
 
+async def get_segnalazioni_async(db: AsyncSession, user: User):
+    return (
+        await db.scalars(select(Segnalazione).where(Segnalazione.user_id == user.id))
+    ).all()
+
+
 def get_segnalazioni_by_stato(db: Session, user: User, stati: list[str]):
     """Return segnalazioni owned by ``user`` whose ``stato`` is in ``stati``."""
     if not stati:
@@ -1,6 +1,16 @@
 from datetime import date
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models.segnaletica_orizzontale import SegnaleticaOrizzontale
+from app.schemas.segnaletica_orizzontale import SegnaleticaOrizzontaleResponse
+from app.services.pagination import Keyset, ListParams, Page
+
+KEYSET = Keyset(
+    SegnaleticaOrizzontale,
+    SegnaleticaOrizzontaleResponse,
+    SegnaleticaOrizzontale.anno,
+    SegnaleticaOrizzontale.id,
+)
 
 
 def create_segnaletica_orizzontale(db: Session, data):
@@ -22,6 +32,16 @@ def get_segnaletica_orizzontale(db: Session, search: str | None = None, anno: in
     return query.all()
 
 
+def get_segnaletica_orizzontale_page(
+    db: Session, params: ListParams, anno: int | None = None
+) -> Page:
+    """Pagina dei record ordinati per ``anno``, filtrati per ``anno`` se indicato."""
+    stmt = select(SegnaleticaOrizzontale)
+    if anno is not None:
+        stmt = stmt.where(SegnaleticaOrizzontale.anno == anno)
+    return KEYSET.fetch(db, stmt, params)
+
+
 def update_segnaletica_orizzontale(db: Session, so_id: str, data):
     db_obj = db.query(SegnaleticaOrizzontale).filter(SegnaleticaOrizzontale.id == so_id).first()
     if not db_obj:
@@ -1,5 +1,16 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models.segnaletica_verticale import SegnaleticaVerticale
+from app.schemas.segnaletica_verticale import SegnaleticaVerticaleResponse
+from app.services.pagination import Keyset, ListParams, Page
+
+# ``anno`` puo' essere NULL: l'ordinamento usa la descrizione
+KEYSET = Keyset(
+    SegnaleticaVerticale,
+    SegnaleticaVerticaleResponse,
+    SegnaleticaVerticale.descrizione,
+    SegnaleticaVerticale.id,
+)
 
 
 def create_segnaletica_verticale(db: Session, data):
@@ -19,6 +30,21 @@ def get_segnaletica_verticale(db: Session, search: str | None = None, anno: int
     return query.all()
 
 
+def get_segnaletica_verticale_page(
+    db: Session,
+    params: ListParams,
+    search: str | None = None,
+    anno: int | None = None,
+) -> Page:
+    """Pagina dei record ordinati per ``descrizione``, con gli stessi filtri."""
+    stmt = select(SegnaleticaVerticale)
+    if search:
+        stmt = stmt.where(SegnaleticaVerticale.descrizione.ilike(f"%{search}%"))
+    if anno is not None:
+        stmt = stmt.where(SegnaleticaVerticale.anno == anno)
+    return KEYSET.fetch(db, stmt, params)
+
+
 def update_segnaletica_verticale(db: Session, sv_id: str, data):
     db_obj = db.query(SegnaleticaVerticale).filter(SegnaleticaVerticale.id == sv_id).first()
     if not db_obj:
@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.todo import ToDo
 from app.models.user import User
@@ -12,11 +14,35 @@ def create_todo(db: Session, data, user: User):
     return db_todo
 
 
+def _todos_between(user: User, start, end):
+    return (
+        select(ToDo)
+        .where(ToDo.user_id == user.id)
+        .where(ToDo.scadenza >= start, ToDo.scadenza <= end)
+        .order_by(ToDo.scadenza)
+    )
+
+
 def get_todos(db: Session, user: User):
     """Return all ``ToDo`` objects owned by ``user``."""
     return db.query(ToDo).filter(ToDo.user_id == user.id).all()
 
 
+async def get_todos_async(db: AsyncSession, user: User):
+    """Async variant of :func:`get_todos`."""
+    return (await db.scalars(select(ToDo).where(ToDo.user_id == user.id))).all()
+
+
+def get_todos_between(db: Session, user: User, start, end):
+    """Return todos of ``user`` due between ``start`` and ``end``, by due date."""
+    return db.scalars(_todos_between(user, start, end)).all()
+
+
+async def get_todos_between_async(db: AsyncSession, user: User, start, end):
+    """Async variant of :func:`get_todos_between`."""
+    return (await db.scalars(_todos_between(user, start, end))).all()
+
+
 def update_todo(db: Session, todo_id: str, data, user: User):
     """Update a ``ToDo`` owned by ``user`` or return ``None`` if it does not exist."""
     db_todo = db.query(ToDo).filter(ToDo.id == todo_id, ToDo.user_id == user.id).first()
@@ -1,13 +1,25 @@
 """
 CRUD per i turni di servizio
 ────────────────────────────
-• upsert_turno  → crea o aggiorna (1–3 intervalli) e sincronizza G-Calendar
-• remove_turno → elimina dal DB e dal calendario turni
+• upsert_turno      → crea o aggiorna (1–3 intervalli) e accoda il sync G-Calendar
+• bulk_upsert_turni → come sopra ma per un intero import, in una transazione
+• remove_turno      → elimina dal DB e accoda la rimozione dal calendario turni
+
+Ogni scrittura invalida i PDF settimanali in cache (:mod:`app.services.pdf_cache`)
+delle settimane ISO coinvolte.
+
+Le operazioni su Google Calendar vengono scritte nella tabella
+``calendar_outbox`` nella stessa transazione e svolte in background da
+:mod:`app.services.calendar_outbox`.
 """
 
 from __future__ import annotations
+import uuid
 from uuid import UUID
 
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from datetime import date
@@ -17,16 +29,20 @@ logger = logging.getLogger(__name__)
 
 from app.models.turno import Turno  # modello ORM
 from app.models.user import User
-from app.schemas.turno import DAY_OFF_TYPES, TurnoIn, TipoTurno  # Pydantic (input)
-from app.config import settings
-from app.services import gcal
+from app.schemas.turno import DAY_OFF_TYPES, TurnoIn, TipoTurno, TurnoOut  # Pydantic
+from app.services import calendar_outbox, pdf_cache
+from app.services.pagination import Keyset, ListParams, Page
+
+# ordinamento naturale delle liste di turni (paginazione keyset)
+KEYSET = Keyset(Turno, TurnoOut, Turno.giorno, Turno.id)
 
 
 # ------------------------------------------------------------------------------
 def upsert_turno(db: Session, payload: TurnoIn) -> Turno:
     """
     Crea un nuovo turno o aggiorna quello esistente per lo stesso user+giorno.
-    Dopo il commit sincronizza l’evento nel calendario “Turni di Servizio”.
+    Nella stessa transazione accoda il sync dell’evento nel calendario
+    “Turni di Servizio”.
     """
     # 1. verifica esistenza utente
     user = db.query(User).filter_by(id=payload.user_id).first()
@@ -40,7 +56,9 @@ def upsert_turno(db: Session, payload: TurnoIn) -> Turno:
         .first()
     )
     if rec is None:
-        rec = Turno(user_id=payload.user_id, giorno=payload.giorno)
+        rec = Turno(
+            id=str(uuid.uuid4()), user_id=payload.user_id, giorno=payload.giorno
+        )
 
     # 3. riempie i tre intervalli orari
     rec.inizio_1 = payload.inizio_1
@@ -53,32 +71,141 @@ def upsert_turno(db: Session, payload: TurnoIn) -> Turno:
     rec.tipo = payload.tipo.value  # NORMALE | STRAORD | FERIE
     rec.note = payload.note
 
-    # 4. salva su database
+    # 4. accoda il sync Google Calendar (salta per i RECUPERO)
     db.add(rec)
+    if payload.tipo is not TipoTurno.RECUPERO:
+        calendar_outbox.enqueue(db, rec.id, calendar_outbox.SYNC)
+
+    # 5. salva su database (turno + outbox nella stessa transazione)
     db.commit()
-    db.refresh(rec)  # ottieni id definitivo
+    db.refresh(rec)
 
-    # 5. sincronizza l’evento Google Calendar (salta per i RECUPERO)
-    if payload.tipo is not TipoTurno.RECUPERO:
-        try:
-            gcal.sync_shift_event(rec)
-        except Exception as exc:
-            # non bloccare l’operazione DB se G-Cal fallisce, ma loggare
-            cal_id = settings.G_SHIFT_CAL_ID
-            evt_id = gcal.shift_event_id(rec.id)
-            logger.error(
-                "Errore sync calendario (cal_id=%s, event_id=%s): %s",
-                cal_id,
-                evt_id,
-                exc,
-            )
+    # 6. il PDF settimanale in cache non è più valido
+    pdf_cache.invalidate_days([rec.giorno])
 
     return rec
 
 
+# ------------------------------------------------------------------------------
+_UPSERT_COLUMNS = (
+    "inizio_1",
+    "fine_1",
+    "inizio_2",
+    "fine_2",
+    "inizio_3",
+    "fine_3",
+    "tipo",
+    "note",
+)
+
+
+def _row_values(payload: TurnoIn) -> dict:
+    """Valori di colonna per ``payload`` (senza ``id``)."""
+    return {
+        "user_id": payload.user_id,
+        "giorno": payload.giorno,
+        "inizio_1": payload.inizio_1,
+        "fine_1": payload.fine_1,
+        "inizio_2": payload.inizio_2,
+        "fine_2": payload.fine_2,
+        "inizio_3": payload.inizio_3,
+        "fine_3": payload.fine_3,
+        "tipo": payload.tipo.value,
+        "note": payload.note,
+    }
+
+
+def upsert_statement(values: list[dict]):
+    """
+    ``INSERT … ON CONFLICT (user_id, giorno) DO UPDATE`` per PostgreSQL.
+    Richiede l’indice univoco su ``turni(user_id, giorno)``.
+    """
+    stmt = pg_insert(Turno).values(values)
+    return stmt.on_conflict_do_update(
+        index_elements=[Turno.user_id, Turno.giorno],
+        set_={col: getattr(stmt.excluded, col) for col in _UPSERT_COLUMNS},
+    )
+
+
+def bulk_upsert_turni(db: Session, payloads: list[TurnoIn]) -> list[Turno]:
+    """
+    Crea o aggiorna in blocco i turni di un import.
+
+    Gli utenti vengono verificati con una sola query, i turni esistenti per le
+    coppie ``(user_id, giorno)`` coinvolte vengono caricati con un’altra e
+    tutte le scritture, compreso l’accodamento dei sync calendario, avvengono
+    in un’unica transazione. Su PostgreSQL si usa ``INSERT … ON CONFLICT``;
+    sugli altri database (SQLite nei test) si ripiega sull’ORM. Se la stessa
+    coppia compare più volte vince l’ultima, come con chiamate ripetute a
+    :func:`upsert_turno`.
+    """
+    by_key: dict[tuple[str, date], TurnoIn] = {}
+    for payload in payloads:
+        by_key[(payload.user_id, payload.giorno)] = payload
+    if not by_key:
+        return []
+
+    # 1. verifica esistenza utenti (una query)
+    user_ids = {user_id for user_id, _ in by_key}
+    found = {u.id for u in db.query(User).filter(User.id.in_(user_ids)).all()}
+    if user_ids - found:
+        raise HTTPException(status_code=400, detail="Unknown user")
+
+    # 2. turni già presenti per gli stessi utenti/giorni (una query)
+    giorni = [giorno for _, giorno in by_key]
+    existing = {
+        (rec.user_id, rec.giorno): rec
+        for rec in db.query(Turno)
+        .filter(
+            Turno.user_id.in_(user_ids),
+            Turno.giorno >= min(giorni),
+            Turno.giorno <= max(giorni),
+        )
+        .all()
+        if (rec.user_id, rec.giorno) in by_key
+    }
+
+    # 3. scrittura in un’unica transazione
+    ids = []
+    if db.get_bind().dialect.name == "postgresql":
+        values = []
+        for key, payload in by_key.items():
+            rec = existing.get(key)
+            turno_id = rec.id if rec is not None else str(uuid.uuid4())
+            values.append({"id": turno_id, **_row_values(payload)})
+            ids.append(turno_id)
+        db.execute(upsert_statement(values))
+    else:
+        for key, payload in by_key.items():
+            rec = existing.get(key)
+            if rec is None:
+                rec = Turno(id=str(uuid.uuid4()))
+                db.add(rec)
+            for col, value in _row_values(payload).items():
+                setattr(rec, col, value)
+            ids.append(rec.id)
+
+    # 4. accoda i sync Google Calendar (salta per i RECUPERO)
+    calendar_outbox.enqueue_many(
+        db,
+        (
+            turno_id
+            for turno_id, payload in zip(ids, by_key.values())
+            if payload.tipo is not TipoTurno.RECUPERO
+        ),
+        calendar_outbox.SYNC,
+    )
+    db.commit()
+    pdf_cache.invalidate_days(giorni)
+
+    # 5. ricarica i record con una sola query
+    loaded = {rec.id: rec for rec in db.query(Turno).filter(Turno.id.in_(ids)).all()}
+    return [loaded[i] for i in ids]
+
+
 # ------------------------------------------------------------------------------
 def remove_turno(db: Session, turno_id: UUID) -> None:
-    """Elimina turno dal DB e dal calendario."""
+    """Elimina turno dal DB e accoda la rimozione dal calendario."""
 
     # 1. verifica che il turno esista
     rec = db.query(Turno).filter_by(id=turno_id).first()
@@ -87,30 +214,23 @@ def remove_turno(db: Session, turno_id: UUID) -> None:
             status_code=status.HTTP_404_NOT_FOUND, detail="Turno non trovato"
         )
 
-    # 2. cancella evento su Google se esiste (ignora eventuali errori)
+    # 2. accoda la cancellazione dell'evento su Google (salta per i giorni liberi)
     try:
         tipo = TipoTurno(rec.tipo)
     except ValueError:
         tipo = None
 
     if tipo not in DAY_OFF_TYPES:
-        try:
-            gcal.delete_shift_event(turno_id)
-        except Exception as exc:  # pragma: no cover - unexpected errors
-            # non bloccare l'operazione DB se G-Cal fallisce, ma loggare
-            cal_id = settings.G_SHIFT_CAL_ID
-            evt_id = gcal.shift_event_id(turno_id)
-            logger.error(
-                "Errore sync calendario (cal_id=%s, event_id=%s): %s",
-                cal_id,
-                evt_id,
-                exc,
-            )
-
-    # 3. cancella record dal DB
+        calendar_outbox.enqueue(db, rec.id, calendar_outbox.DELETE)
+
+    # 3. cancella record dal DB (nella stessa transazione dell'outbox)
+    giorno = rec.giorno
     db.delete(rec)
     db.commit()
 
+    # 4. il PDF settimanale in cache non è più valido
+    pdf_cache.invalidate_days([giorno])
+
 
 # ------------------------------------------------------------------------------
 def get_turni(db: Session, user: User) -> list[Turno]:
@@ -129,6 +249,16 @@ def list_all(db: Session) -> list[Turno]:
     return db.query(Turno).order_by(Turno.giorno.asc()).all()
 
 
+async def list_all_async(db: AsyncSession) -> list[Turno]:
+    """Variante asincrona di :func:`list_all`."""
+    return list(await db.scalars(select(Turno).order_by(Turno.giorno.asc())))
+
+
+async def list_page_async(db: AsyncSession, params: ListParams) -> Page:
+    """Pagina di turni ordinati per ``giorno`` (e ``id``)."""
+    return await KEYSET.fetch_async(db, select(Turno), params)
+
+
 # ------------------------------------------------------------------------------
 def list_between(db: Session, start: date, end: date) -> list[Turno]:
     """Return ``Turno`` records between ``start`` and ``end`` dates."""
@@ -1,11 +1,13 @@
-from sqlalchemy.orm import Session, joinedload
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
 from fastapi import HTTPException
 from app.models.user import User
-from passlib.context import CryptContext
+from app.models.turno import Turno
+from app.services.passwords import hash_password
 import uuid
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 def create_user(db: Session, email: str, password: str, nome: str):
     """Create and return a new user with a hashed password."""
@@ -17,7 +19,7 @@ def create_user(db: Session, email: str, password: str, nome: str):
     if not nome:
         raise HTTPException(status_code=400, detail="Invalid nome")
 
-    hashed_password = pwd_context.hash(password)
+    hashed_password = hash_password(password)
     db_user = User(
         id=str(uuid.uuid4()),
         email=email,
@@ -35,13 +37,36 @@ def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
 
-def verify_password(plain_password, hashed_password):
-    """Return ``True`` if the plaintext password matches the hashed one."""
-    return pwd_context.verify(plain_password, hashed_password)
+def update_password_hash(db: Session, db_user: User, hashed_password: str):
+    """Salva un nuovo hash della password (es. dopo un cambio di ``BCRYPT_ROUNDS``)."""
+    db.add(db_user)
+    db_user.hashed_password = hashed_password
+    db.commit()
+    return db_user
+
+
+def list_users(
+    db: Session, turni_from: date | None = None, turni_to: date | None = None
+):
+    """Restituisce gli utenti ordinati per nome.
 
+    Senza finestra vengono letti solo ``id``, ``email`` e ``nome``. Con
+    ``turni_from`` e/o ``turni_to`` ogni utente include i propri turni di
+    quell'intervallo (estremi compresi), caricati con una sola query filtrata
+    in SQL invece dell'intero storico.
+    """
+    if turni_from is None and turni_to is None:
+        stmt = select(User.id, User.email, User.nome).order_by(User.nome.asc())
+        return db.execute(stmt).all()
 
-def list_users(db: Session):
-    """Restituisce tutti gli utenti ordinati per nome con i turni caricati."""
-    return (
-        db.query(User).options(joinedload(User.turni)).order_by(User.nome.asc()).all()
+    window = []
+    if turni_from is not None:
+        window.append(Turno.giorno >= turni_from)
+    if turni_to is not None:
+        window.append(Turno.giorno <= turni_to)
+    stmt = (
+        select(User)
+        .options(selectinload(User.turni.and_(*window)))
+        .order_by(User.nome.asc())
     )
+    return db.scalars(stmt).all()
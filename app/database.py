@@ -1,9 +1,14 @@
 from sqlalchemy import create_engine, event
 from sqlalchemy.engine.url import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from app.config import settings
 import os
+import threading
+import time
 
 # Recupera la URL del database dal modulo di configurazione
 DATABASE_URL = settings.DATABASE_URL
@@ -12,6 +17,9 @@ DATABASE_URL = settings.DATABASE_URL
 url = make_url(DATABASE_URL)
 if url.drivername.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
+    # stesso file, driver asincrono
+    async_url = url.set(drivername="sqlite+aiosqlite")
+    async_connect_args = {}
 else:
     sslmode_env = os.getenv("DATABASE_SSLMODE")
     if sslmode_env is not None:
@@ -23,14 +31,182 @@ else:
         connect_args = {}
     else:
         connect_args = {"sslmode": "require"}
+    # asyncpg non conosce ``sslmode``: la stessa modalita' va passata come ``ssl``
+    async_url = url.set(drivername="postgresql+asyncpg").difference_update_query(
+        ["sslmode"]
+    )
+    async_connect_args = {"ssl": sslmode_env or sslmode_query or "require"}
+    if settings.DB_PGBOUNCER:
+        # PgBouncer in transaction mode non supporta i prepared statement
+        async_url = async_url.update_query_dict(
+            {"prepared_statement_cache_size": "0"}
+        )
+        async_connect_args["statement_cache_size"] = 0
+
+
+class PoolMetrics:
+    """Contatori del pool di connessioni esposti da ``/health/db-pool``.
+
+    Misurano quante connessioni sono in uso, quanto si attende per ottenerne
+    una, quante volte si supera ``DB_POOL_SIZE`` (overflow) e quanti
+    checkout vanno in timeout: servono a dimensionare i worker rispetto al
+    limite di connessioni del database.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Azzera i contatori (le connessioni in uso restano contate)."""
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.max_in_use = self.in_use
+            self.overflow_hits = 0
+            self.timeouts = 0
+            self.waits = 0
+            self.wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+
+    def record_wait(
+        self, seconds: float, overflow: bool = False, timed_out: bool = False
+    ) -> None:
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            if overflow:
+                self.overflow_hits += 1
+            if timed_out:
+                self.timeouts += 1
+
+    def on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def on_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "overflow_hits": self.overflow_hits,
+                "timeouts": self.timeouts,
+                "avg_wait_seconds": (
+                    self.wait_seconds / self.waits if self.waits else 0.0
+                ),
+                "max_wait_seconds": self.max_wait_seconds,
+            }
+
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """``QueuePool`` che misura l'attesa per ottenere una connessione.
+
+    Conta anche le connessioni aperte oltre ``pool_size`` (overflow).
+    """
+
+    metrics = pool_metrics
+
+    def _do_get(self):
+        overflow = self.overflow()
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(
+            time.perf_counter() - started,
+            overflow=self.overflow() > max(overflow, 0),
+        )
+        return conn
+
+
+class TimedAsyncQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    """Variante di :class:`TimedQueuePool` per il motore asincrono."""
+
+    metrics = async_pool_metrics
+
+
+def _engine_options(poolclass=TimedQueuePool) -> dict:
+    """Opzioni del pool lette da ``Settings``.
+
+    In modalita' PgBouncer il pooling e' delegato a PgBouncer: ogni sessione
+    apre e chiude la propria connessione verso PgBouncer (``NullPool``) e il
+    pre-ping non serve.
+    """
+    if settings.DB_PGBOUNCER:
+        return {"poolclass": NullPool, "pool_pre_ping": False}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
 
 # Crea il motore SQLAlchemy con gli argomenti appropriati
 engine = create_engine(
     DATABASE_URL,
     connect_args=connect_args,
-    pool_pre_ping=True,
+    **_engine_options(),
+)
+
+# Motore asincrono per le route di sola lettura piu' frequenti; il motore
+# sincrono resta per Alembic, gli import e le altre route
+async_engine = create_async_engine(
+    async_url,
+    connect_args=async_connect_args,
+    **_engine_options(TimedAsyncQueuePool),
 )
 
+for _engine, _metrics in (
+    (engine, pool_metrics),
+    (async_engine.sync_engine, async_pool_metrics),
+):
+    event.listen(_engine, "connect", _metrics.on_connect)
+    event.listen(_engine, "checkout", _metrics.on_checkout)
+    event.listen(_engine, "checkin", _metrics.on_checkin)
+
+
+def _pool_stats(pool, metrics: PoolMetrics) -> dict:
+    data = {"pool": type(pool).__name__, **metrics.stats()}
+    if isinstance(pool, QueuePool):
+        data.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+        )
+    return data
+
+
+def pool_stats() -> dict:
+    """Stato del pool sincrono e, sotto ``async``, di quello asincrono."""
+    data = _pool_stats(engine.pool, pool_metrics)
+    data["async"] = _pool_stats(async_engine.pool, async_pool_metrics)
+    return data
+
+
 if url.drivername.startswith("sqlite"):
 
     @event.listens_for(engine, "connect")
@@ -39,12 +215,17 @@ if url.drivername.startswith("sqlite"):
         cursor.execute("PRAGMA foreign_keys=ON")
         cursor.close()
 
+    event.listen(async_engine.sync_engine, "connect", _enable_foreign_keys)
+
 
 # Esporta gli argomenti di connessione per i test
 CONNECT_ARGS = connect_args
 
 # Configura la session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
 
 # Base per i modelli ORM
 Base = declarative_base()
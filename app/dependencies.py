@@ -1,12 +1,15 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import Depends, Header, HTTPException, status
 from jose import jwt, JWTError
 from app.config import settings
 
-from .database import SessionLocal
+from .database import AsyncSessionLocal, SessionLocal
 from .models.user import User
+from .services import auth_cache
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -17,11 +20,14 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    authorization: str | None = Header(None, alias="Authorization"),
-) -> User:
-    """Return the authenticated ``User`` based on the JWT token."""
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Yield an ``AsyncSession`` for routes that query without the threadpool."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _token_email(authorization: str | None) -> str:
+    """Return the ``sub`` (e-mail) of the bearer token in ``authorization``."""
     if authorization is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -36,17 +42,37 @@ def get_current_user(
         raise HTTPException(status_code=500, detail="Secret key not configured")
     algorithm = settings.ALGORITHM
 
-    try:
-        payload = jwt.decode(token, secret, algorithms=[algorithm])
-        email = payload.get("sub")
-        if not email:
-            raise HTTPException(status_code=401, detail="Invalid token payload")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+    key = (token, secret, algorithm)
+    email = auth_cache.token_cache.get(key)
+    if email is None:
+        try:
+            payload = jwt.decode(token, secret, algorithms=[algorithm])
+            email = payload.get("sub")
+            if not email:
+                raise HTTPException(status_code=401, detail="Invalid token payload")
+        except JWTError:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        auth_cache.token_cache.put(key, email, payload.get("exp"))
+    return email
+
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    authorization: str | None = Header(None, alias="Authorization"),
+) -> User:
+    """Return the authenticated ``User`` based on the JWT token.
 
+    Verified tokens and recently seen users are served from
+    :mod:`app.services.auth_cache`; a cached user is a detached snapshot.
+    """
+    email = _token_email(authorization)
+    user = auth_cache.user_cache.get(email)
+    if user is not None:
+        return user
     user = db.query(User).filter(User.email == email).first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    auth_cache.user_cache.put(user)
     return user
 
 
@@ -58,3 +84,29 @@ def get_optional_user(
     if authorization is None:
         return None
     return get_current_user(db=db, authorization=authorization)
+
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    authorization: str | None = Header(None, alias="Authorization"),
+) -> User:
+    """Async variant of :func:`get_current_user` for routes using ``get_async_db``."""
+    email = _token_email(authorization)
+    user = auth_cache.user_cache.get(email)
+    if user is not None:
+        return user
+    user = (await db.scalars(select(User).where(User.email == email))).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    auth_cache.user_cache.put(user)
+    return user
+
+
+async def get_optional_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    authorization: str | None = Header(None, alias="Authorization"),
+) -> User | None:
+    """Async variant of :func:`get_optional_user`."""
+    if authorization is None:
+        return None
+    return await get_current_user_async(db=db, authorization=authorization)
@@ -1,4 +1,7 @@
+from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 from app.config import settings
@@ -20,6 +23,8 @@ from app.routes import (
 from app.routes.orari import router as orari_router
 from app.routes import inventory
 from app.routes import imports
+from app.services import calendar_outbox, passwords, pdf_renderer
+from app.services.pagination import NEXT_CURSOR_HEADER
 
 
 # Enable automatic redirect so both `/path` and `/path/` work
@@ -27,7 +32,26 @@ from app.routes import imports
 log_level = settings.LOG_LEVEL.upper()
 logging.basicConfig(level=getattr(logging, log_level, logging.INFO))
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the calendar outbox worker and the PDF render pool alongside the application."""
+    stop = asyncio.Event()
+    worker = None
+    if settings.CALENDAR_OUTBOX_WORKER and settings.G_SHIFT_CAL_ID:
+        worker = asyncio.create_task(calendar_outbox.run_worker(stop))
+    pdf_renderer.pool.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        if worker is not None:
+            await worker
+        pdf_renderer.pool.shutdown()
+        passwords.shutdown()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Database tables are managed with Alembic migrations.
 # Tests create tables manually using `Base.metadata.create_all()`.
@@ -44,6 +68,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(users.router)
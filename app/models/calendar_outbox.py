@@ -0,0 +1,23 @@
+from datetime import datetime
+import uuid
+from sqlalchemy import Column, String, DateTime, Integer
+from app.database import Base
+
+
+class CalendarOutbox(Base):
+    """Pending Google Calendar operation for a turno.
+
+    Rows are written in the same transaction as the turno change and drained
+    by :mod:`app.services.calendar_outbox`. There is at most one row per
+    turno, so repeated changes collapse into a single calendar call.
+    """
+
+    __tablename__ = "calendar_outbox"
+
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    turno_id = Column(String, unique=True, nullable=False)
+    action = Column(String(10), nullable=False)  # sync | delete
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+    enqueued_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    next_attempt_at = Column(DateTime, nullable=True, default=datetime.utcnow, index=True)
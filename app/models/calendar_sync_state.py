@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+from app.database import Base
+
+
+class CalendarSyncState(Base):
+    """Last Google ``nextSyncToken`` seen for a calendar.
+
+    Used by :mod:`app.services.calendar_reconcile` to fetch only the events
+    changed since the previous reconciliation.
+    """
+
+    __tablename__ = "calendar_sync_state"
+
+    calendar_id = Column(String, primary_key=True)
+    sync_token = Column(String, nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, String, DateTime, Float
+from sqlalchemy import Column, String, DateTime, Float, Index
 from app.database import Base
 import uuid
 
 
 class Determinazione(Base):
     __tablename__ = "determinazioni"
+    __table_args__ = (
+        # keyset pagination of the list (crud.determinazione.KEYSET)
+        Index("ix_determinazioni_scadenza_id", "scadenza", "id"),
+    )
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     capitolo = Column(String, nullable=False)
     numero = Column(String, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 import uuid
@@ -6,6 +6,10 @@ import uuid
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        # keyset pagination of the list (crud.event.KEYSET)
+        Index("ix_events_data_ora_id", "data_ora", "id"),
+    )
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     titolo = Column(String, nullable=False)
     descrizione = Column(String, nullable=True)
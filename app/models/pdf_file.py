@@ -1,11 +1,15 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Index
 from app.database import Base
 
 
 class PDFFile(Base):
     __tablename__ = "pdf_files"
+    __table_args__ = (
+        # keyset pagination of the list (crud.pdf_file.KEYSET)
+        Index("ix_pdf_files_uploaded_at_id", "uploaded_at", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     title = Column(String, nullable=False)
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, String, Integer
+from sqlalchemy import Column, String, Integer, Index
 from app.database import Base
 import uuid
 
 
 class SegnaleticaOrizzontale(Base):
     __tablename__ = "segnaletica_orizzontale"
+    __table_args__ = (
+        # keyset pagination of the list (crud.segnaletica_orizzontale.KEYSET)
+        Index("ix_segnaletica_orizzontale_anno_id", "anno", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     azienda = Column(String, nullable=False)
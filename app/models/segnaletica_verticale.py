@@ -1,10 +1,14 @@
-from sqlalchemy import Column, String, Integer
+from sqlalchemy import Column, String, Integer, Index
 from app.database import Base
 import uuid
 
 
 class SegnaleticaVerticale(Base):
     __tablename__ = "segnaletica_verticale"
+    __table_args__ = (
+        # keyset pagination of the list (crud.segnaletica_verticale.KEYSET)
+        Index("ix_segnaletica_verticale_descrizione_id", "descrizione", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     descrizione = Column(String, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Date, Time, ForeignKey
+from sqlalchemy import Column, String, Date, Time, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 import uuid
@@ -6,6 +6,12 @@ import uuid
 
 class Turno(Base):
     __tablename__ = "turni"
+    __table_args__ = (
+        # upsert lookups / ON CONFLICT target and per-user listings
+        Index("ux_turni_user_id_giorno", "user_id", "giorno", unique=True),
+        # week and range queries (list_between)
+        Index("ix_turni_giorno", "giorno"),
+    )
 
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.dependencies import get_db
 from app.schemas.user import UserCredentials
 from pydantic import BaseModel
-from google.oauth2 import id_token
-from google.auth.transport import requests
 from app.crud import user
 from jose import jwt
 from app.config import settings
+from app.services import google_id_token, passwords
 import datetime
 
 SECRET_KEY = settings.SECRET_KEY
@@ -23,19 +23,37 @@ class GoogleToken(BaseModel):
     token: str
 
 
+def _find_user(db: Session, email: str):
+    """Load the user and give the connection back to the pool at once.
+
+    No connection is held while bcrypt runs; closing in the same thread
+    avoids waiting for a free request thread just to release it.
+    """
+    try:
+        return user.get_user_by_email(db, email)
+    finally:
+        db.close()
+
+
 @router.post("/login")
-def login(form_data: UserCredentials, db: Session = Depends(get_db)):
+async def login(form_data: UserCredentials, db: Session = Depends(get_db)):
     """Authenticate a user and issue a JWT access token.
 
     The provided credentials are validated against the stored user data.
     On success the generated token and token type are returned, otherwise a
-    400 HTTP error is raised.
+    400 HTTP error is raised. The bcrypt check runs on the password hashing
+    executor and outdated hashes are replaced with one at the current cost.
     """
-    db_user = user.get_user_by_email(db, form_data.email)
-    if not db_user or not user.verify_password(
+    db_user = await run_in_threadpool(_find_user, db, form_data.email)
+    if not db_user:
+        raise HTTPException(status_code=400, detail="Invalid credentials")
+    valid, new_hash = await passwords.verify_and_update(
         form_data.password, db_user.hashed_password
-    ):
+    )
+    if not valid:
         raise HTTPException(status_code=400, detail="Invalid credentials")
+    if new_hash:
+        await run_in_threadpool(user.update_password_hash, db, db_user, new_hash)
     expire = datetime.datetime.utcnow() + datetime.timedelta(
         minutes=ACCESS_TOKEN_EXPIRE_MINUTES
     )
@@ -46,13 +64,17 @@ def login(form_data: UserCredentials, db: Session = Depends(get_db)):
 
 @router.post("/google-login")
 def google_login(data: GoogleToken, db: Session = Depends(get_db)):
-    """Validate a Google ID token and issue a JWT access token."""
+    """Validate a Google ID token and issue a JWT access token.
+
+    Google's signing certificates are cached for their ``max-age``, so the
+    token is normally checked without any network call.
+    """
     client_id = settings.GOOGLE_CLIENT_ID
     if not client_id:
         raise HTTPException(status_code=500, detail="GOOGLE_CLIENT_ID not configured")
 
     try:
-        info = id_token.verify_oauth2_token(data.token, requests.Request(), client_id)
+        info = google_id_token.verify(data.token, client_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid Google token")
 
@@ -1,47 +1,67 @@
-from datetime import datetime, timedelta
+import asyncio
+import heapq
+from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import get_db, get_current_user
+from app.dependencies import get_async_db, get_current_user_async
 import re
 from app.models.user import User
 from app.schemas.event import EventResponse
 from app.schemas.todo import ToDoResponse
 from app.crud import event, todo
-from app.services.google_calendar import list_upcoming_events
+from app.services import google_calendar
 from app.services import gcal
+from app.services.responses import dump_rows
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 
-@router.get("/upcoming")
-def upcoming_events(
-    days: int = 7,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    now = datetime.utcnow()
-    limit = now + timedelta(days=days)
+def _utc_naive(value: datetime) -> datetime:
+    """Comparable form of ``value``: Google returns aware datetimes."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _sort_key(item: dict) -> datetime:
+    return _utc_naive(item["data_ora"])
+
 
+async def _db_items(db: AsyncSession, user: User, now: datetime, limit: datetime):
+    """Load events and todos inside the window, each list ordered by date."""
+    events = await event.get_events_between_async(db, user, now, limit)
     ev_items = [
-        {
-            **EventResponse.model_validate(ev, from_attributes=True).dict(),
-            "kind": "event",
-        }
-        for ev in event.get_events(db, current_user)
-        if now <= ev.data_ora <= limit
+        {**data, "kind": "event"}
+        for data in dump_rows(EventResponse, events, mode="python")
     ]
 
     todo_items = []
-    for td in todo.get_todos(db, current_user):
-        if now <= td.scadenza <= limit:
-            data = ToDoResponse.model_validate(td, from_attributes=True).dict()
-            data.pop("user_id", None)
-            data["data_ora"] = data.pop("scadenza")
-            data["kind"] = "todo"
-            todo_items.append(data)
+    todos = await todo.get_todos_between_async(db, user, now, limit)
+    for data in dump_rows(ToDoResponse, todos, mode="python"):
+        data.pop("user_id", None)
+        data["data_ora"] = data.pop("scadenza")
+        data["kind"] = "todo"
+        todo_items.append(data)
+    return ev_items, todo_items
+
+
+@router.get("/upcoming")
+async def upcoming_events(
+    days: int = 7,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    now = datetime.utcnow()
+    limit = now + timedelta(days=days)
 
-    gcal_raw = list_upcoming_events(days)
+    # the Google fetch runs in parallel with the database queries
+    (ev_items, todo_items), gcal_raw = await asyncio.gather(
+        _db_items(db, current_user, now, limit),
+        run_in_threadpool(google_calendar.list_upcoming_events, days),
+    )
 
     me_name = gcal.short_name_for_user(current_user).lower()
 
@@ -63,13 +83,10 @@ def upcoming_events(
     gcal_items = [
         {**g, "kind": "google"}
         for g in gcal_raw
-        if now <= g.get("data_ora") <= limit and include_event(g)
+        if now <= _utc_naive(g.get("data_ora")) <= limit and include_event(g)
     ]
 
-    combined = ev_items + todo_items + gcal_items
-    combined.sort(key=lambda x: x["data_ora"])
-    # Convert datetimes to ISO strings for JSON response
-    for item in combined:
-        if isinstance(item.get("data_ora"), datetime):
-            item["data_ora"] = item["data_ora"].isoformat()
-    return combined
+    # every source is already ordered by date
+    combined = list(heapq.merge(ev_items, todo_items, gcal_items, key=_sort_key))
+    # orjson writes the datetimes in ISO format
+    return ORJSONResponse(combined)
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.dependencies import get_db
+from app.services.pagination import ListParams, page_response
+from app.services.responses import rows_response
 from app.schemas.determinazione import DeterminazioneCreate, DeterminazioneResponse
 from app.crud import determinazione
 
@@ -16,10 +18,19 @@ def create_determinazione_route(
 
 
 @router.get("/", response_model=list[DeterminazioneResponse])
-def list_determinazioni(db: Session = Depends(get_db)):
-    """Return all determinazioni stored in the database."""
-    db_dets = determinazione.get_determinazioni(db)
-    return db_dets
+def list_determinazioni(
+    params: ListParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    """Return the determinazioni stored in the database.
+
+    Paginated by ``scadenza`` with ``limit``/``after``; ``fields`` selects
+    the returned columns.
+    """
+    if not params.paginated and not params.fields:
+        rows = determinazione.get_determinazioni(db)
+        return rows_response(DeterminazioneResponse, rows)
+    return page_response(determinazione.get_determinazioni_page(db, params))
 
 
 @router.put("/{determinazione_id}", response_model=DeterminazioneResponse)
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from app.dependencies import get_db
 from app.schemas.dispositivo import DispositivoCreate, DispositivoResponse
 from app.crud import dispositivo
+from app.services.responses import rows_response
 
 router = APIRouter(prefix="/dispositivi", tags=["Dispositivi"])
 
@@ -18,7 +19,8 @@ def list_dispositivi(
     anno: int | None = None,
     db: Session = Depends(get_db),
 ):
-    return dispositivo.get_dispositivi(db, search=search, anno=anno)
+    rows = dispositivo.get_dispositivi(db, search=search, anno=anno)
+    return rows_response(DispositivoResponse, rows)
 
 
 @router.put("/{dispositivo_id}", response_model=DispositivoResponse)
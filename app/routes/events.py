@@ -1,9 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.dependencies import get_db, get_current_user, get_optional_user
+from app.dependencies import (
+    get_async_db,
+    get_current_user,
+    get_db,
+    get_optional_user_async,
+)
 from app.models.user import User
 from app.schemas.event import EventCreate, EventResponse
 from app.crud import event
+from app.services.pagination import ListParams, page_response
+from app.services.responses import rows_response
 
 router = APIRouter(prefix="/events", tags=["Events"])
 
@@ -19,12 +27,21 @@ def create_event_route(
 
 
 @router.get("/", response_model=list[EventResponse])
-def list_events(
-    db: Session = Depends(get_db),
-    current_user: User | None = Depends(get_optional_user),
+async def list_events(
+    params: ListParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User | None = Depends(get_optional_user_async),
 ):
-    """Retrieve all events from the database."""
-    return event.get_events(db, current_user)
+    """Retrieve the events visible to the caller.
+
+    Paginated by ``data_ora`` with ``limit``/``after``; ``fields`` selects
+    the returned columns.
+    """
+    if not params.paginated and not params.fields:
+        rows = await event.get_events_async(db, current_user)
+        return rows_response(EventResponse, rows)
+    page = await event.get_events_page_async(db, params, current_user)
+    return page_response(page)
 
 
 @router.put("/{event_id}", response_model=EventResponse)
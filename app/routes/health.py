@@ -3,7 +3,16 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from app.config import settings
 
-from app.dependencies import get_db
+from app.database import pool_stats
+from app.dependencies import get_current_user, get_db
+from app.models.user import User
+from app.services import (
+    auth_cache,
+    google_calendar,
+    google_id_token,
+    pdf_cache,
+    pdf_renderer,
+)
 
 router = APIRouter(tags=["Health"])
 
@@ -17,3 +26,39 @@ def health_check(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="SECRET_KEY not configured")
     db.execute(text("SELECT 1"))
     return {"status": "ok"}
+
+
+@router.get("/health/calendar-cache")
+def calendar_cache_stats(current_user: User = Depends(get_current_user)):
+    """Return hit/miss counters of the Google Calendar events cache."""
+    return google_calendar.events_cache.stats()
+
+
+@router.get("/health/pdf-cache")
+def pdf_cache_stats(current_user: User = Depends(get_current_user)):
+    """Return hit/miss counters and disk usage of the weekly PDF cache."""
+    return pdf_cache.week_pdf_cache.stats()
+
+
+@router.get("/health/pdf-renderer")
+def pdf_renderer_stats(current_user: User = Depends(get_current_user)):
+    """Return queue depth, render counts and timings of the PDF render pool."""
+    return pdf_renderer.pool.stats()
+
+
+@router.get("/health/auth-cache")
+def auth_cache_stats(current_user: User = Depends(get_current_user)):
+    """Return hit/miss counters of the JWT and authenticated user caches."""
+    return auth_cache.stats()
+
+
+@router.get("/health/google-certs")
+def google_certs_stats(current_user: User = Depends(get_current_user)):
+    """Return hit/miss counters of the Google ID token certificate cache."""
+    return google_id_token.certs_request.stats()
+
+
+@router.get("/health/db-pool")
+def db_pool_stats(current_user: User = Depends(get_current_user)):
+    """Return usage, checkout wait times and overflow hits of the DB pool."""
+    return pool_stats()
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, UploadFile, Depends, BackgroundTasks, HTTPException
+from fastapi import APIRouter, UploadFile, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 import logging
-from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 import tempfile
 import os
@@ -9,7 +9,9 @@ from pydantic import ValidationError
 from app.dependencies import get_db
 from app.schemas.turno import TurnoIn
 from app.crud import turno as crud_turno
-from app.services.excel_import import parse_excel, df_to_pdf
+from app.services.excel_import import parse_excel
+from app.services.shift_grid import df_to_html
+from app.services.pdf_renderer import pdf_response, render
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +21,6 @@ router = APIRouter(prefix="/import", tags=["Import"])
 @router.post("/xlsx")
 async def import_xlsx(
     file: UploadFile,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
 ):
     """Import Excel shifts, sync them and return a PDF summary."""
@@ -33,19 +34,19 @@ async def import_xlsx(
         # 2 – parse Excel -> TurnoIn payloads
         rows = parse_excel(tmp_path, db)
 
-        # 3 – store/update each shift (DB + Google Calendar)
+        # 3 – validate every row, then store/update them in one transaction
+        turni = []
         for idx, payload in enumerate(rows):
             try:
-                turno = TurnoIn(**payload)
+                turni.append(TurnoIn(**payload))
             except ValidationError as err:
                 raise HTTPException(status_code=400, detail=f"Row {idx+2}: {err}")
-            crud_turno.upsert_turno(db, turno)
+        crud_turno.bulk_upsert_turni(db, turni)
 
         # 4 – generate PDF summary
-        pdf_path, html_path = df_to_pdf(rows, db)
-        background_tasks.add_task(os.remove, pdf_path)
-        background_tasks.add_task(os.remove, html_path)
-        return FileResponse(pdf_path, filename="turni_settimana.pdf")
+        html = await run_in_threadpool(df_to_html, rows, db)
+        pdf = await render(html)
+        return pdf_response(pdf, "turni_settimana.pdf")
     except HTTPException:
         raise
     except Exception as e:
@@ -59,8 +60,7 @@ async def import_xlsx(
 @router.post("/excel", include_in_schema=False)
 async def import_excel(
     file: UploadFile,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
 ):
     """Alias for :func:`import_xlsx`"""
-    return await import_xlsx(file=file, background_tasks=background_tasks, db=db)
+    return await import_xlsx(file=file, db=db)
@@ -1,25 +1,18 @@
-from fastapi import APIRouter, BackgroundTasks, Depends
-from fastapi.responses import FileResponse
-import os
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 from app.dependencies import get_db
 from app.models.segnaletica_orizzontale import SegnaleticaOrizzontale
 
-from app.services.inventory_pdf import build_inventory_pdf
+from app.services.inventory_pdf import build_inventory_html
+from app.services.pdf_renderer import pdf_response, render
 
 router = APIRouter(prefix="/inventory", tags=["Inventory"])
 
 
-@router.get("/pdf")
-def inventory_pdf(
-    year: int,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
-):
-    """Return a PDF inventory report for the specified year."""
-
+def _inventory_items(db: Session, year: int) -> list[dict]:
     query = (
         db.query(
             SegnaleticaOrizzontale.descrizione.label("name"),
@@ -28,13 +21,19 @@ def inventory_pdf(
         .filter(SegnaleticaOrizzontale.anno == year)
         .group_by(SegnaleticaOrizzontale.descrizione)
     )
-    items = [
+    return [
         {"name": row.name, "count": int(row.count)}
         for row in query.all()
     ]
 
-    pdf_path, html_path = build_inventory_pdf(items, year)
-    background_tasks.add_task(os.remove, pdf_path)
-    background_tasks.add_task(os.remove, html_path)
+
+@router.get("/pdf")
+async def inventory_pdf(
+    year: int,
+    db: Session = Depends(get_db),
+):
+    """Return a PDF inventory report for the specified year."""
+    items = await run_in_threadpool(_inventory_items, db, year)
+    pdf = await render(build_inventory_html(items, year))
     filename = f"inventory_{year}.pdf"
-    return FileResponse(pdf_path, filename=filename)
+    return pdf_response(pdf, filename)
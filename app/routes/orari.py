@@ -1,18 +1,29 @@
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
-from fastapi.responses import FileResponse
-from fastapi.encoders import jsonable_encoder
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import date, timedelta
-import os
 
-from app.dependencies import get_db, get_current_user
+from app.dependencies import (
+    get_async_db,
+    get_current_user,
+    get_current_user_async,
+    get_db,
+)
 from app.models.user import User
 from app.schemas.turno import TurnoIn, TurnoOut
 from app.crud import turno as crud_turno
-from app.services.excel_import import df_to_pdf
+from app.services import pdf_cache
+from app.services.shift_grid import df_to_html, week_notes, weeks_to_html
+from app.services.pagination import ListParams, page_response
+from app.services.responses import dump_rows, rows_response
+from app.services.pdf_renderer import pdf_response, render
 
 router = APIRouter(prefix="/orari", tags=["Turni"])
 
+# longest range accepted by /orari/pdf/range (about a year)
+MAX_RANGE_WEEKS = 53
+
 
 @router.post("/", response_model=TurnoOut)
 def save_turno(
@@ -25,12 +36,19 @@ def save_turno(
 
 
 @router.get("/", response_model=list[TurnoOut])
-def list_turni(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def list_turni(
+    params: ListParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    """Return all turni without filtering by user."""
-    return crud_turno.list_all(db)
+    """Return the turni of every user ordered by day.
+
+    Paginated with ``limit``/``after`` (next cursor in ``X-Next-Cursor``);
+    ``fields`` selects the returned columns.
+    """
+    if not params.paginated and not params.fields:
+        return rows_response(TurnoOut, await crud_turno.list_all_async(db))
+    return page_response(await crud_turno.list_page_async(db, params))
 
 
 @router.delete("/{turno_id}")
@@ -44,14 +62,39 @@ def delete_turno(
     return {"ok": True}
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Return ``True`` when the ``If-None-Match`` header lists ``etag``."""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+
+def _week_inputs(db: Session, start: date, end: date) -> tuple[list, tuple, str]:
+    """Load the rows and notes of the week and hash them into the cache key."""
+    turni = crud_turno.list_between(db, start, end)
+
+    rows = dump_rows(TurnoOut, turni)
+
+    notes = week_notes(db, start, end)
+    user_ids = {t.user_id for t in turni}
+    agents = dict(db.query(User.id, User.nome).filter(User.id.in_(user_ids)).all())
+    key = pdf_cache.cache_key(pdf_cache.render_version(), rows, agents, notes)
+    return rows, notes, key
+
+
 @router.get("/pdf")
-def week_pdf(
+async def week_pdf(
     week: str,
-    background_tasks: BackgroundTasks,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Return a PDF summary of turni for the given ISO week (YYYY-Www)."""
+    """Return a PDF summary of turni for the given ISO week (YYYY-Www).
+
+    The PDF is cached on disk under a hash of its inputs, which is also sent
+    as ``ETag``: a matching ``If-None-Match`` gets ``304 Not Modified``.
+    """
     try:
         year_str, week_str = week.split("-W")
         start = date.fromisocalendar(int(year_str), int(week_str), 1)
@@ -59,15 +102,51 @@ def week_pdf(
         raise HTTPException(status_code=400, detail="Invalid week format")
     end = start + timedelta(days=6)
 
-    turni = crud_turno.list_between(db, start, end)
+    rows, notes, key = await run_in_threadpool(_week_inputs, db, start, end)
+    etag = f'"{key}"'
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
 
-    rows = [
-        jsonable_encoder(TurnoOut.model_validate(t, from_attributes=True))
-        for t in turni
-    ]
+    label = pdf_cache.iso_week(start)
+    pdf = pdf_cache.week_pdf_cache.get(label, key)
+    if pdf is None:
+        html = await run_in_threadpool(df_to_html, rows, db, notes)
+        pdf = await render(html)
+        pdf_cache.week_pdf_cache.put(label, key, pdf)
 
-    pdf_path, html_path = df_to_pdf(rows, db)
-    background_tasks.add_task(os.remove, pdf_path)
-    background_tasks.add_task(os.remove, html_path)
     filename = f"turni_{week}.pdf"
-    return FileResponse(pdf_path, filename=filename)
+    response = pdf_response(pdf, filename)
+    response.headers["ETag"] = etag
+    return response
+
+
+def _range_html(db: Session, start: date, end: date) -> str:
+    turni = crud_turno.list_between(db, start, end)
+    return weeks_to_html(turni, db, start, end)
+
+
+@router.get("/pdf/range")
+async def range_pdf(
+    start: date,
+    end: date,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Return one PDF with a page per ISO week between ``start`` and ``end``.
+
+    The range is widened to whole ISO weeks; turni and notes are loaded once
+    for all of it and the document is rendered in a single pass.
+    """
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not precede start")
+    first = start - timedelta(days=start.weekday())
+    last = end + timedelta(days=6 - end.weekday())
+    if (last - first).days // 7 + 1 > MAX_RANGE_WEEKS:
+        raise HTTPException(
+            status_code=400, detail=f"Range longer than {MAX_RANGE_WEEKS} weeks"
+        )
+
+    html = await run_in_threadpool(_range_html, db, first, last)
+    pdf = await render(html)
+    filename = f"turni_{start.isoformat()}_{end.isoformat()}.pdf"
+    return pdf_response(pdf, filename)
@@ -7,6 +7,8 @@ from app.dependencies import get_db, get_optional_user
 from app.models.user import User
 from app.schemas.pdf_file import PDFFileCreate, PDFFileResponse
 from app.crud import pdf_file as crud_pdf_file
+from app.services.pagination import ListParams, page_response
+from app.services.responses import rows_response
 
 logger = logging.getLogger(__name__)
 
@@ -14,8 +16,13 @@ router = APIRouter(prefix="/pdf", tags=["PDF"])
 
 
 @router.get("/", response_model=List[PDFFileResponse])
-def list_pdfs(db: Session = Depends(get_db)):
-    return crud_pdf_file.get_multi(db)
+def list_pdfs(
+    params: ListParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    if not params.paginated and not params.fields:
+        return rows_response(PDFFileResponse, crud_pdf_file.get_multi(db))
+    return page_response(crud_pdf_file.get_page(db, params))
 
 
 @router.post("/", response_model=PDFFileResponse, status_code=201)
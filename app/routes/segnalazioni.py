@@ -1,6 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.dependencies import get_db, get_current_user
+from app.dependencies import (
+    get_async_db,
+    get_current_user,
+    get_current_user_async,
+    get_db,
+)
 from app.models.user import User
 from app.schemas.segnalazione import (
     SegnalazioneCreate,
@@ -9,6 +15,7 @@ from app.schemas.segnalazione import (
     StatoSegnalazione,
 )
 from app.crud import segnalazione as crud
+from app.services.responses import rows_response
 
 router = APIRouter(prefix="/segnalazioni", tags=["Segnalazioni"])
 
@@ -25,11 +32,12 @@ async def create_segnalazione(
 
 
 @router.get("/", response_model=list[SegnalazioneResponse])
-def list_segnalazioni(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def list_segnalazioni(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    return crud.get_segnalazioni(db, current_user)
+    rows = await crud.get_segnalazioni_async(db, current_user)
+    return rows_response(SegnalazioneResponse, rows)
 
 
 @router.get("/by-stato", response_model=list[SegnalazioneResponse])
@@ -43,7 +51,8 @@ def list_segnalazioni_by_stato(
         stati = [StatoSegnalazione(p).value for p in parts]
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
-    return crud.get_segnalazioni_by_stato(db, current_user, stati)
+    rows = crud.get_segnalazioni_by_stato(db, current_user, stati)
+    return rows_response(SegnalazioneResponse, rows)
 
 
 @router.get("/{segnalazione_id}", response_model=SegnalazioneResponse)
@@ -6,6 +6,7 @@ from app.schemas.segnaletica_temporanea import (
     SegnaleticaTemporaneaResponse,
 )
 from app.crud import segnaletica_temporanea as crud
+from app.services.responses import rows_response
 
 router = APIRouter(prefix="/segnaletica-temporanea", tags=["Segnaletica Temporanea"])
 
@@ -23,7 +24,8 @@ def list_segnaletica_temporanea(
     anno: int | None = None,
     db: Session = Depends(get_db),
 ):
-    return crud.get_segnaletica_temporanea(db, search=search, anno=anno)
+    rows = crud.get_segnaletica_temporanea(db, search=search, anno=anno)
+    return rows_response(SegnaleticaTemporaneaResponse, rows)
 
 
 @router.put("/{st_id}", response_model=SegnaleticaTemporaneaResponse)
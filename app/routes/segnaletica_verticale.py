@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.dependencies import get_db
+from app.services.pagination import ListParams, page_response
+from app.services.responses import rows_response
 from app.schemas.segnaletica_verticale import (
     SegnaleticaVerticaleCreate,
     SegnaleticaVerticaleResponse,
@@ -21,9 +23,14 @@ def create_segnaletica_verticale_route(
 def list_segnaletica_verticale(
     search: str | None = None,
     anno: int | None = None,
+    params: ListParams = Depends(),
     db: Session = Depends(get_db),
 ):
-    return crud.get_segnaletica_verticale(db, search=search, anno=anno)
+    if not params.paginated and not params.fields:
+        rows = crud.get_segnaletica_verticale(db, search=search, anno=anno)
+        return rows_response(SegnaleticaVerticaleResponse, rows)
+    page = crud.get_segnaletica_verticale_page(db, params, search=search, anno=anno)
+    return page_response(page)
 
 
 @router.put("/{sv_id}", response_model=SegnaleticaVerticaleResponse)
@@ -1,11 +1,10 @@
 from fastapi import (
     APIRouter,
-    BackgroundTasks,
     Depends,
     HTTPException,
     UploadFile,
 )
-from fastapi.responses import FileResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import os
 import tempfile
@@ -20,9 +19,12 @@ from app.schemas.segnaletica_orizzontale import (
 )
 from app.crud import segnaletica_orizzontale as crud
 from app.services.segnaletica_orizzontale_pdf import (
-    build_segnaletica_orizzontale_pdf,
+    build_segnaletica_orizzontale_html,
 )
 from app.services.segnaletica_orizzontale_import import parse_file
+from app.services.pagination import ListParams, page_response
+from app.services.responses import rows_response
+from app.services.pdf_renderer import pdf_response, render
 
 logger = logging.getLogger(__name__)
 
@@ -36,9 +38,21 @@ def get_years_route(db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=list[SegnaleticaOrizzontaleResponse])
-def list_records(year: int | None = None, db: Session = Depends(get_db)):
-    """List signage records, optionally filtering by ``year``."""
-    return crud.get_segnaletica_orizzontale(db, search=None, anno=year)
+def list_records(
+    year: int | None = None,
+    params: ListParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    """List signage records, optionally filtering by ``year``.
+
+    Paginated by ``anno`` with ``limit``/``after``; ``fields`` selects the
+    returned columns.
+    """
+    if not params.paginated and not params.fields:
+        rows = crud.get_segnaletica_orizzontale(db, search=None, anno=year)
+        return rows_response(SegnaleticaOrizzontaleResponse, rows)
+    page = crud.get_segnaletica_orizzontale_page(db, params, anno=year)
+    return page_response(page)
 
 
 @router.post("/", response_model=SegnaleticaOrizzontaleResponse)
@@ -65,23 +79,20 @@ def delete_record(record_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/pdf")
-def signage_horizontal_pdf(
+async def signage_horizontal_pdf(
     year: int,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
 ):
     """Return a signage plan PDF for the given ``year``."""
-    pdf_path, html_path = build_segnaletica_orizzontale_pdf(db, year)
-    background_tasks.add_task(os.remove, pdf_path)
-    background_tasks.add_task(os.remove, html_path)
+    html = await run_in_threadpool(build_segnaletica_orizzontale_html, db, year)
+    pdf = await render(html)
     filename = f"signage_horizontal_{year}.pdf"
-    return FileResponse(pdf_path, filename=filename)
+    return pdf_response(pdf, filename)
 
 
 @router.post("/import")
 async def import_signage_horizontal(
     file: UploadFile,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
 ):
     """Import signage entries from a spreadsheet and return a PDF summary."""
@@ -102,16 +113,15 @@ async def import_signage_horizontal(
                 db, SegnaleticaOrizzontaleCreate(**payload)
             )
 
-        pdf_path, html_path = build_segnaletica_orizzontale_pdf(db, year)
-        background_tasks.add_task(os.remove, pdf_path)
-        background_tasks.add_task(os.remove, html_path)
+        html = await run_in_threadpool(build_segnaletica_orizzontale_html, db, year)
+        pdf = await render(html)
         logger.info(
             "Import segnaletica orizzontale: %d record creati per anno %d",
             len(rows),
             year,
         )
         filename = f"signage_horizontal_{year}.pdf"
-        return FileResponse(pdf_path, filename=filename)
+        return pdf_response(pdf, filename)
     except HTTPException:
         raise
     except Exception as e:
@@ -1,9 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.dependencies import get_db, get_current_user
+from app.dependencies import (
+    get_async_db,
+    get_current_user,
+    get_current_user_async,
+    get_db,
+)
 from app.models.user import User
 from app.schemas.todo import ToDoCreate, ToDoResponse
 from app.crud import todo
+from app.services.responses import rows_response
 
 router = APIRouter(prefix="/todo", tags=["ToDo"])
 
@@ -19,11 +26,12 @@ def create_todo_route(
 
 
 @router.get("/", response_model=list[ToDoResponse])
-def list_todos(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+async def list_todos(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     """List todo items for the authenticated user."""
-    return todo.get_todos(db, current_user)
+    return rows_response(ToDoResponse, await todo.get_todos_async(db, current_user))
 
 
 @router.put("/{todo_id}", response_model=ToDoResponse)
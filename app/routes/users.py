@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.dependencies import get_db, get_current_user
 from app.schemas.user import UserCreate, UserResponse, UserOut
 from app.crud import user
 from app.models.user import User
+from app.services.responses import rows_response
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -11,10 +14,18 @@ router = APIRouter(prefix="/users", tags=["Users"])
 # ───── nuovo endpoint GET /users/ ─────
 @router.get("/", response_model=list[UserResponse])
 def list_users_route(
+    turni_from: date | None = Query(None, description="Includi i turni da questo giorno"),
+    turni_to: date | None = Query(None, description="Includi i turni fino a questo giorno"),
     db: Session = Depends(get_db),
 ):
-    """Restituisce la lista di tutti gli utenti."""
-    return user.list_users(db)
+    """Restituisce la lista di tutti gli utenti.
+
+    ``turni`` è vuoto salvo che si indichi una finestra con ``turni_from`` e/o
+    ``turni_to``: in tal caso contiene i turni di quei giorni.
+    """
+    if turni_from and turni_to and turni_from > turni_to:
+        raise HTTPException(status_code=400, detail="turni_from must not follow turni_to")
+    return rows_response(UserResponse, user.list_users(db, turni_from, turni_to))
 
 
 # ───────────────────────────────────────
@@ -0,0 +1,171 @@
+"""In-process caches behind :func:`app.dependencies.get_current_user`.
+
+``token_cache`` remembers the ``sub`` and ``exp`` claims of JWTs that were
+already verified, keyed by the token (and the secret/algorithm used), so a
+token is decoded once per process until it expires. ``user_cache`` keeps the
+column values of recently authenticated users for a few seconds and hands
+out *detached* ``User`` snapshots: each caller gets its own instance, so
+sessions never share objects and relationships are not loadable from it.
+
+User rows updated or deleted through the ORM drop their cache entry at
+flush time; the short TTL bounds staleness for changes made elsewhere.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import settings
+from app.models.user import User
+
+
+class TokenCache:
+    """LRU of verified JWT claims, evicted once ``exp`` has passed."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[str, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> str | None:
+        """Return the cached ``sub`` of ``key`` unless the token has expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                sub, exp = entry
+                if exp is None or exp > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return sub
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, sub: str, exp: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        try:
+            exp = float(exp) if exp is not None else None
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._entries[key] = (sub, exp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return _stats(self.hits, self.misses, len(self._entries), self.maxsize)
+
+
+class UserCache:
+    """Short-TTL LRU of user column values keyed by e-mail."""
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, email: str) -> User | None:
+        """Return a new detached ``User`` snapshot for ``email`` or ``None``."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is not None:
+                expires, values = entry
+                if expires > now:
+                    self._entries.move_to_end(email)
+                    self.hits += 1
+                    return _snapshot(values)
+                del self._entries[email]
+            self.misses += 1
+            return None
+
+    def put(self, user: User) -> None:
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        values = {
+            attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs
+        }
+        with self._lock:
+            self._entries[user.email] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(user.email)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *emails: str | None) -> None:
+        with self._lock:
+            for email in emails:
+                if email is not None:
+                    self._entries.pop(email, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            data = _stats(self.hits, self.misses, len(self._entries), self.maxsize)
+            data["ttl_seconds"] = self.ttl
+            return data
+
+
+def _stats(hits: int, misses: int, size: int, maxsize: int) -> dict[str, Any]:
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / lookups if lookups else 0.0,
+        "size": size,
+        "maxsize": maxsize,
+    }
+
+
+def _snapshot(values: dict) -> User:
+    user = User(**values)
+    # persistent identity without a session: never INSERTed if re-attached
+    make_transient_to_detached(user)
+    return user
+
+
+token_cache = TokenCache(maxsize=settings.AUTH_TOKEN_CACHE_SIZE)
+user_cache = UserCache(
+    ttl=settings.AUTH_USER_CACHE_TTL, maxsize=settings.AUTH_USER_CACHE_SIZE
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target: User) -> None:
+    history = inspect(target).attrs.email.history
+    user_cache.invalidate(target.email, *(history.deleted or ()))
+
+
+def clear() -> None:
+    """Empty both caches (e.g. after a settings change or in tests)."""
+    token_cache.clear()
+    user_cache.clear()
+
+
+def stats() -> dict[str, Any]:
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
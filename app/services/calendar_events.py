@@ -1,16 +1,11 @@
 from __future__ import annotations
 
-import json
 import logging
-import os
 from datetime import timedelta
 
-from googleapiclient.discovery import build  # type: ignore
-from google.oauth2.service_account import Credentials as SACredentials  # type: ignore
-from google.oauth2.credentials import Credentials as UserCredentials  # type: ignore
-
 from app.config import settings
 from app.models.event import Event
+from app.services import google_calendar, google_clients
 
 logger = logging.getLogger(__name__)
 
@@ -22,20 +17,7 @@ def create_event(event: Event) -> None:
     if not creds_json or not calendar_id:
         return
 
-    if os.path.isfile(creds_json):
-        with open(creds_json, "r") as fh:
-            info = json.load(fh)
-    else:
-        info = json.loads(creds_json)
-
-    if info.get("type") == "service_account":
-        creds = SACredentials.from_service_account_info(
-            info, scopes=["https://www.googleapis.com/auth/calendar"]
-        )
-    else:
-        creds = UserCredentials.from_authorized_user_info(info)
-
-    service = build("calendar", "v3", credentials=creds)
+    service = google_clients.get_service([google_clients.CALENDAR_SCOPE])
 
     body = {
         "summary": event.titolo,
@@ -46,6 +28,8 @@ def create_event(event: Event) -> None:
 
     try:
         service.events().insert(calendarId=calendar_id, body=body).execute()
+        # the dashboard reads this calendar through the window cache
+        google_calendar.events_cache.invalidate(calendar_id)
         logger.info("Inserted event %s into calendar %s", event.id, calendar_id)
     except Exception as exc:  # pragma: no cover - unexpected errors
         logger.error(
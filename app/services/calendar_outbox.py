@@ -0,0 +1,227 @@
+"""
+Coda persistente (outbox) delle operazioni Google Calendar sui turni.
+
+Le CRUD dei turni scrivono una riga in ``calendar_outbox`` nella stessa
+transazione della modifica, così la richiesta HTTP termina al commit.
+Un worker in background (avviato da ``app.main`` oppure come processo a sé
+con ``python -m app.services.calendar_outbox``) svuota la coda con retry e
+backoff esponenziale. Per ogni turno esiste al più una riga: modifiche
+successive prima del drain si fondono in un'unica chiamata a Google.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy.orm import Session, selectinload
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.calendar_outbox import CalendarOutbox
+from app.models.turno import Turno
+from app.services import gcal
+
+logger = logging.getLogger(__name__)
+
+SYNC = "sync"
+DELETE = "delete"
+
+# entries are parked (next_attempt_at = NULL) after this many failures
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+# how long a claimed entry is hidden from other workers while in flight
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+# ------------------------------------------------------------------- enqueue
+def enqueue(db: Session, turno_id, action: str) -> None:
+    """Accoda ``action`` per ``turno_id`` senza fare commit."""
+    enqueue_many(db, [turno_id], action)
+
+
+def enqueue_many(db: Session, turno_ids: Iterable, action: str) -> None:
+    """Accoda ``action`` per ogni turno in ``turno_ids`` senza fare commit.
+
+    Un'operazione già in coda per lo stesso turno viene sostituita, così la
+    coda contiene sempre solo l'ultimo stato da propagare. Senza
+    ``G_SHIFT_CAL_ID`` non accoda nulla: nessun worker svuoterebbe la coda.
+    """
+    if not settings.G_SHIFT_CAL_ID:
+        return
+    ids = list(dict.fromkeys(str(i) for i in turno_ids))
+    if not ids:
+        return
+
+    now = datetime.utcnow()
+    pending = {
+        row.turno_id: row
+        for row in db.query(CalendarOutbox)
+        .filter(CalendarOutbox.turno_id.in_(ids))
+        .all()
+    }
+    for turno_id in ids:
+        row = pending.get(turno_id)
+        if row is None:
+            row = CalendarOutbox(turno_id=turno_id)
+            db.add(row)
+        row.action = action
+        row.attempts = 0
+        row.last_error = None
+        row.enqueued_at = now
+        row.next_attempt_at = now
+
+
+# ------------------------------------------------------------------- drain
+def backoff(attempts: int) -> timedelta:
+    """Ritardo prima del tentativo successivo dopo ``attempts`` fallimenti."""
+    return min(BACKOFF_BASE * (2 ** (attempts - 1)), BACKOFF_MAX)
+
+
+def _claim(db: Session, limit: int) -> list[tuple[str, str, str, datetime]]:
+    """Riserva fino a ``limit`` operazioni scadute e restituisce i loro dati."""
+    now = datetime.utcnow()
+    query = (
+        db.query(CalendarOutbox)
+        .filter(CalendarOutbox.next_attempt_at <= now)
+        .order_by(CalendarOutbox.next_attempt_at.asc())
+        .limit(limit)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        query = query.with_for_update(skip_locked=True)
+
+    claimed = []
+    for row in query.all():
+        row.next_attempt_at = now + CLAIM_LEASE
+        claimed.append((row.id, row.turno_id, row.action, row.enqueued_at))
+    db.commit()
+    return claimed
+
+
+def _apply(db: Session, claimed: list[tuple]) -> dict[str, str | None]:
+    """Esegue su Google Calendar le operazioni ``claimed`` in batch.
+
+    Restituisce ``{turno_id: errore}`` con ``None`` per le operazioni riuscite.
+    """
+    deletes = [turno_id for _, turno_id, action, _ in claimed if action == DELETE]
+    syncs = [turno_id for _, turno_id, action, _ in claimed if action != DELETE]
+
+    outcome: dict[str, str | None] = {}
+    turni = []
+    if syncs:
+        # l'evento usa il nome dell'agente: utenti caricati con una sola query
+        turni = (
+            db.query(Turno)
+            .options(selectinload(Turno.user))
+            .filter(Turno.id.in_(syncs))
+            .all()
+        )
+    # turni rimossi dopo l'accodamento: la delete è già in coda
+    outcome.update(dict.fromkeys(syncs))
+
+    batches = ((gcal.sync_shift_events, turni), (gcal.delete_shift_events, deletes))
+    for run, items in batches:
+        if not items:
+            continue
+        try:
+            report = run(items)
+        except Exception as exc:
+            ids = [str(getattr(i, "id", i)) for i in items]
+            outcome.update(dict.fromkeys(ids, str(exc)))
+            continue
+        for turno_id, result in report.items():
+            failed = result["status"] == "failed"
+            outcome[turno_id] = (result["error"] or "failed") if failed else None
+    return outcome
+
+
+def drain_once(db: Session, limit: int = 50) -> int:
+    """Processa le operazioni in coda scadute e restituisce quante ne ha prese.
+
+    Le chiamate a Google partono in batch tramite
+    :func:`gcal.sync_shift_events` e :func:`gcal.delete_shift_events`.
+    Le righe vengono eliminate solo se nessuno le ha riaccodate nel frattempo;
+    in caso di errore viene programmato un nuovo tentativo con backoff.
+    """
+    claimed = _claim(db, limit)
+    if not claimed:
+        return 0
+
+    outcome = _apply(db, claimed)
+    for entry_id, turno_id, action, enqueued_at in claimed:
+        current = db.query(CalendarOutbox).filter(
+            CalendarOutbox.id == entry_id,
+            CalendarOutbox.enqueued_at == enqueued_at,
+        )
+        error = outcome.get(turno_id)
+        if error is None:
+            current.delete(synchronize_session=False)
+            continue
+        row = current.first()
+        if row is None:
+            continue
+        row.attempts += 1
+        row.last_error = error[:500]
+        if row.attempts >= MAX_ATTEMPTS:
+            row.next_attempt_at = None
+            logger.error(
+                "Calendar outbox: giving up on %s %s after %d attempts: %s",
+                action,
+                turno_id,
+                row.attempts,
+                error,
+            )
+        else:
+            row.next_attempt_at = datetime.utcnow() + backoff(row.attempts)
+            logger.warning(
+                "Calendar outbox: %s %s failed (attempt %d): %s",
+                action,
+                turno_id,
+                row.attempts,
+                error,
+            )
+    db.commit()
+    return len(claimed)
+
+
+# ------------------------------------------------------------------- worker
+def _drain_with_session(limit: int = 50) -> int:
+    db = SessionLocal()
+    try:
+        return drain_once(db, limit)
+    finally:
+        db.close()
+
+
+async def run_worker(stop: asyncio.Event, poll_seconds: float | None = None) -> None:
+    """Svuota la coda finché ``stop`` non viene impostato."""
+    interval = (
+        poll_seconds
+        if poll_seconds is not None
+        else settings.CALENDAR_OUTBOX_POLL_SECONDS
+    )
+    logger.info("Calendar outbox worker started (poll=%ss)", interval)
+    while not stop.is_set():
+        try:
+            processed = await asyncio.to_thread(_drain_with_session)
+        except Exception:  # pragma: no cover - unexpected errors
+            logger.exception("Calendar outbox drain failed")
+            processed = 0
+        if processed:
+            continue
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+    logger.info("Calendar outbox worker stopped")
+
+
+if __name__ == "__main__":  # pragma: no cover - manual entry point
+    logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO))
+    try:
+        asyncio.run(run_worker(asyncio.Event()))
+    except KeyboardInterrupt:
+        pass
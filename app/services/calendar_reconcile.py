@@ -0,0 +1,229 @@
+"""
+Riconciliazione del calendario 'Turni di Servizio' con la tabella ``turni``.
+
+Invece di riscrivere ogni turno, :func:`reconcile_shift_calendar` legge gli
+eventi ``shift-*`` presenti su Google e li confronta con i turni tramite un
+hash dei campi gestiti dall'applicazione; partono solo insert, update e
+delete per i turni che differiscono, raggruppati in batch.
+
+Il ``nextSyncToken`` restituito da Google viene salvato in
+``calendar_sync_state``: le esecuzioni successive scaricano solo gli eventi
+modificati da allora. Le modifiche lato database sono già propagate dalla
+outbox (:mod:`app.services.calendar_outbox`), quindi in modalità incrementale
+basta correggere gli eventi toccati su Google, anche fuori dall'intervallo:
+il loro turno si ricava dall'id dell'evento. Se il token scade (HTTP 410)
+si torna automaticamente alla lettura completa dell'intervallo.
+
+Uso notturno: ``python -m app.services.calendar_reconcile [--days N] [--full]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import uuid
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.calendar_sync_state import CalendarSyncState
+from app.models.turno import Turno
+from app.services import gcal
+
+logger = logging.getLogger(__name__)
+
+
+def _bodies(turni) -> dict[str, tuple]:
+    """Return ``{event_id: (turno_id, body)}`` for the working ``turni``."""
+    expected = {}
+    for turno in turni:
+        if gcal.is_day_off(turno):
+            continue
+        body = gcal.shift_event_body(turno)
+        expected[body["id"]] = (str(turno.id), body)
+    return expected
+
+
+def _expected_events(db: Session, start: date, end: date) -> dict[str, tuple]:
+    """Return ``{event_id: (turno_id, body)}`` for the working turni in range."""
+    turni = (
+        db.query(Turno)
+        .options(joinedload(Turno.user))
+        .filter(Turno.giorno >= start, Turno.giorno <= end)
+        .all()
+    )
+    return _bodies(turni)
+
+
+def _expected_for_events(db: Session, event_ids) -> dict[str, tuple]:
+    """Like :func:`_expected_events` for the turni behind ``event_ids``.
+
+    The turno of ``shift-<id>`` is the one whose id without dashes is
+    ``<id>``; ORM ids are UUIDs, whose dashes are put back.
+    """
+    candidates = set()
+    for evt_id in event_ids:
+        suffix = evt_id.removeprefix("shift-")
+        candidates.add(suffix)
+        try:
+            candidates.add(str(uuid.UUID(suffix)))
+        except ValueError:
+            pass
+    if not candidates:
+        return {}
+    turni = (
+        db.query(Turno)
+        .options(joinedload(Turno.user))
+        .filter(Turno.id.in_(candidates))
+        .all()
+    )
+    return _bodies(turni)
+
+
+def _event_day(event: dict) -> date | None:
+    start = event.get("start") or {}
+    if "dateTime" in start:
+        return datetime.fromisoformat(start["dateTime"]).date()
+    if "date" in start:
+        return date.fromisoformat(start["date"])
+    return None
+
+
+def _diff(
+    expected: dict[str, tuple],
+    remote: list[dict],
+    start: date,
+    end: date,
+    full: bool,
+) -> list[tuple]:
+    """Build the batch operations needed to align ``remote`` with ``expected``.
+
+    In a full listing an unknown event is deleted only inside the range. In
+    an incremental one ``expected`` also holds the turni of the changed
+    events outside the range, so an unknown event has no turno at all.
+    """
+    ops = []
+    seen = set()
+    for event in remote:
+        evt_id = event["id"]
+        seen.add(evt_id)
+        cancelled = event.get("status") == "cancelled"
+        if evt_id in expected:
+            turno_id, body = expected[evt_id]
+            if cancelled:
+                # evento cancellato su Google: lo ripristiniamo
+                restored = dict(body, status="confirmed")
+                ops.append((turno_id, "update", evt_id, restored))
+            elif gcal.event_hash(event) != gcal.event_hash(body):
+                ops.append((turno_id, "update", evt_id, body))
+        elif not cancelled:
+            day = _event_day(event)
+            if not full or (day is not None and start <= day <= end):
+                ops.append((evt_id, "delete", evt_id, None))
+
+    if full:
+        # in lettura completa un evento assente va creato
+        for evt_id, (turno_id, body) in expected.items():
+            if evt_id not in seen:
+                ops.append((turno_id, "insert", evt_id, body))
+    return ops
+
+
+def _save_token(db: Session, cal_id: str, token: str | None) -> None:
+    state = db.get(CalendarSyncState, cal_id)
+    if state is None:
+        state = CalendarSyncState(calendar_id=cal_id)
+        db.add(state)
+    state.sync_token = token
+    state.updated_at = datetime.utcnow()
+    db.commit()
+
+
+def reconcile_shift_calendar(
+    start: date,
+    end: date,
+    db: Session | None = None,
+    full: bool = False,
+) -> dict:
+    """Allinea gli eventi ``shift-*`` tra ``start`` e ``end`` ai turni salvati.
+
+    Usa il ``nextSyncToken`` memorizzato se presente (salvo ``full=True``).
+    Restituisce un riepilogo con la modalità usata, il numero di eventi letti
+    e quanti eventi sono stati inseriti, aggiornati, eliminati o sono falliti.
+    """
+    cal_id = settings.G_SHIFT_CAL_ID
+    if not cal_id:
+        raise RuntimeError("G_SHIFT_CAL_ID is not configured")
+
+    own_session = db is None
+    if own_session:
+        db = SessionLocal()
+    try:
+        state = db.get(CalendarSyncState, cal_id)
+        token = None if full or state is None else state.sync_token
+
+        remote = None
+        if token:
+            try:
+                remote, next_token = gcal.list_shift_events(sync_token=token)
+            except gcal.SyncTokenExpired:
+                logger.info("Sync token for %s expired, listing range", cal_id)
+        if remote is None:
+            full = True
+            remote, next_token = gcal.list_shift_events(
+                time_min=gcal.iso_dt(start, time(0, 0)),
+                time_max=gcal.iso_dt(end + timedelta(days=1), time(0, 0)),
+            )
+
+        expected = _expected_events(db, start, end)
+        if not full:
+            # eventi modificati fuori dall'intervallo: si confrontano con i
+            # loro turni, altrimenti il token salvato non li rivedrebbe più
+            outside = [e["id"] for e in remote if e["id"] not in expected]
+            expected.update(_expected_for_events(db, outside))
+        ops = _diff(expected, remote, start, end, full)
+        report = gcal.run_event_batches(cal_id, ops)
+
+        summary = {
+            "mode": "full" if full else "incremental",
+            "listed": len(remote),
+            "inserted": 0,
+            "updated": 0,
+            "deleted": 0,
+            "failed": 0,
+        }
+        for result in report.values():
+            summary[result["status"]] += 1
+
+        if summary["failed"]:
+            # gli eventi non riparati non cambiano su Google e una lettura
+            # incrementale non li rivedrebbe: la prossima sarà completa
+            logger.warning(
+                "%d shift events not reconciled on %s, next run lists the full range",
+                summary["failed"],
+                cal_id,
+            )
+            _save_token(db, cal_id, None)
+        elif next_token:
+            _save_token(db, cal_id, next_token)
+        logger.info("Reconciled shift calendar %s: %s", cal_id, summary)
+        return summary
+    finally:
+        if own_session:
+            db.close()
+
+
+if __name__ == "__main__":  # pragma: no cover - manual entry point
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--full", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO))
+    today = date.today()
+    print(
+        reconcile_shift_calendar(
+            today, today + timedelta(days=args.days), full=args.full
+        )
+    )
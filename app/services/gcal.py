@@ -7,19 +7,19 @@ Richiede:
 """
 
 from datetime import date, time, datetime
-from functools import lru_cache
 import hashlib
 from app.config import settings
 import logging
 
 import json
-import os
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-import googleapiclient.errors as gerr
 
+from app.services import google_clients
+from app.services.lazy_modules import LazyModule
 from app.schemas.turno import DAY_OFF_TYPES, TipoTurno
 
+# ``HttpError`` is only needed once a Google call fails
+gerr = LazyModule("googleapiclient.errors")
+
 logger = logging.getLogger(__name__)
 
 # Default behaviour is to avoid sending email notifications when calendar
@@ -47,26 +47,9 @@ AGENT_SHORT_NAMES = {
 
 
 # ------------------------------------------------------------------- credenziali
-@lru_cache()
 def get_client():
-    """Return a Google Calendar client built from service account credentials."""
-    creds_json = settings.GOOGLE_CREDENTIALS_JSON
-    if creds_json is None:
-        raise RuntimeError("GOOGLE_CREDENTIALS_JSON is not configured")
-
-    if os.path.isfile(creds_json):
-        creds = service_account.Credentials.from_service_account_file(
-            creds_json,
-            scopes=["https://www.googleapis.com/auth/calendar"],
-        )
-    else:
-        info = json.loads(creds_json)
-        creds = service_account.Credentials.from_service_account_info(
-            info,
-            scopes=["https://www.googleapis.com/auth/calendar"],
-        )
-
-    return build("calendar", "v3", credentials=creds)
+    """Return the shared Google Calendar client for the shift calendar."""
+    return google_clients.get_service([google_clients.CALENDAR_SCOPE])
 
 
 # ------------------------------------------------------------------- calendar ID
@@ -148,25 +131,8 @@ def short_name_for_user(user) -> str:
 
 
 # ------------------------------------------------------------------- sync turni
-def sync_shift_event(turno):
-    """
-    Crea o aggiorna l'evento relativo a un turno
-    nel calendario 'Turni di Servizio'.
-    """
-    cal_id = settings.G_SHIFT_CAL_ID
-    if not cal_id:
-        raise RuntimeError("G_SHIFT_CAL_ID is not configured")
-    try:
-        tipo = TipoTurno(turno.tipo)
-    except ValueError:
-        tipo = None
-
-    if tipo in DAY_OFF_TYPES:
-        # remove any existing calendar event for day-off records
-        delete_shift_event(turno.id)
-        logger.info("Removed calendar event for day off: %s", turno.id)
-        return
-
+def shift_event_body(turno) -> dict:
+    """Return the Google Calendar event body for a working ``turno``."""
     # Google Calendar limita l'alfabeto degli identificativi degli eventi a
     # lettere, numeri, underscore e trattino. Gli UUID generati dall'ORM
     # contengono "-" che sono consentiti ma in alcuni casi Google restituisce
@@ -179,7 +145,7 @@ def sync_shift_event(turno):
     end = last_non_null(turno.fine_3, turno.fine_2, turno.fine_1)
 
     title_name = short_name_for_user(turno.user)
-    body = {
+    return {
         "id": evt_id,
         "summary": title_name,
         "description": f"Turno servizio {title_name}",
@@ -188,6 +154,32 @@ def sync_shift_event(turno):
         "colorId": color_for_user(turno.user),
     }
 
+
+def is_day_off(turno) -> bool:
+    try:
+        return TipoTurno(turno.tipo) in DAY_OFF_TYPES
+    except ValueError:
+        return False
+
+
+def sync_shift_event(turno):
+    """
+    Crea o aggiorna l'evento relativo a un turno
+    nel calendario 'Turni di Servizio'.
+    """
+    cal_id = settings.G_SHIFT_CAL_ID
+    if not cal_id:
+        raise RuntimeError("G_SHIFT_CAL_ID is not configured")
+
+    if is_day_off(turno):
+        # remove any existing calendar event for day-off records
+        delete_shift_event(turno.id)
+        logger.info("Removed calendar event for day off: %s", turno.id)
+        return
+
+    body = shift_event_body(turno)
+    evt_id = body["id"]
+
     gcal = get_client()
     try:
         gcal.events().update(
@@ -251,3 +243,203 @@ def delete_shift_event(turno_id):
                 "Failed to delete event %s on calendar %s", turno_id, cal_id
             )
             raise
+
+
+# ------------------------------------------------------------------- batch
+# Google accepts at most 50 calls in a single batch HTTP request for Calendar.
+BATCH_SIZE = 50
+
+_DONE = {"update": "updated", "insert": "inserted", "delete": "deleted"}
+
+
+def _batch_request(service, cal_id: str, action: str, evt_id: str, body):
+    events = service.events()
+    if action == "update":
+        return events.update(
+            calendarId=cal_id,
+            eventId=evt_id,
+            body=body,
+            sendUpdates=DEFAULT_SEND_UPDATES,
+        )
+    if action == "insert":
+        return events.insert(
+            calendarId=cal_id, body=body, sendUpdates=DEFAULT_SEND_UPDATES
+        )
+    return events.delete(
+        calendarId=cal_id, eventId=evt_id, sendUpdates=DEFAULT_SEND_UPDATES
+    )
+
+
+def run_event_batches(cal_id: str, ops: list[tuple]) -> dict[str, dict]:
+    """Execute ``ops`` through batch HTTP requests of up to :data:`BATCH_SIZE`.
+
+    Each op is ``(turno_id, action, event_id, body)`` with ``action`` one of
+    ``update``, ``insert`` or ``delete``. Updates failing with
+    404/400 are turned into inserts queued for the next batch, deletes of
+    missing events count as done. Returns ``{turno_id: {"status", "error"}}``.
+    """
+    report: dict[str, dict] = {}
+    if not ops:
+        return report
+
+    service = get_client()
+    pending = list(ops)
+    while pending:
+        chunk, pending = pending[:BATCH_SIZE], pending[BATCH_SIZE:]
+        retry: list[tuple] = []
+
+        def callback(request_id, response, exception, chunk=chunk, retry=retry):
+            turno_id, action, evt_id, body = chunk[int(request_id)]
+            status = getattr(getattr(exception, "resp", None), "status", None)
+            if exception is None:
+                report[turno_id] = {"status": _DONE[action], "error": None}
+            elif action == "update" and status in (404, 400):
+                logger.info(
+                    "Update of event %s on calendar %s failed (%s), inserting",
+                    evt_id,
+                    cal_id,
+                    status,
+                )
+                retry.append((turno_id, "insert", evt_id, body))
+            elif action == "delete" and status in (404, 410):
+                report[turno_id] = {"status": "deleted", "error": None}
+            else:
+                logger.error(
+                    "Batch %s of event %s on calendar %s failed: %s",
+                    action,
+                    evt_id,
+                    cal_id,
+                    exception,
+                )
+                report[turno_id] = {"status": "failed", "error": str(exception)}
+
+        batch = service.new_batch_http_request(callback=callback)
+        for idx, (turno_id, action, evt_id, body) in enumerate(chunk):
+            batch.add(
+                _batch_request(service, cal_id, action, evt_id, body),
+                request_id=str(idx),
+            )
+        batch.execute()
+        # inserts for missing events go out with the next batch
+        pending = retry + pending
+
+    logger.info("Batch synced %d shift events on calendar %s", len(report), cal_id)
+    return report
+
+
+def sync_shift_events(turni) -> dict[str, dict]:
+    """Create, update or remove the calendar events of many ``turni`` at once.
+
+    Operations are grouped in batch HTTP requests of up to :data:`BATCH_SIZE`
+    calls instead of one round trip per shift. Day-off shifts have their event
+    deleted, like :func:`sync_shift_event`. The returned report maps each
+    ``turno.id`` (as ``str``) to ``{"status": ..., "error": ...}`` where
+    ``status`` is ``updated``, ``inserted``, ``deleted`` or ``failed``.
+    """
+    cal_id = settings.G_SHIFT_CAL_ID
+    if not cal_id:
+        raise RuntimeError("G_SHIFT_CAL_ID is not configured")
+
+    ops = []
+    for turno in turni:
+        evt_id = shift_event_id(turno.id)
+        if is_day_off(turno):
+            ops.append((str(turno.id), "delete", evt_id, None))
+        else:
+            ops.append((str(turno.id), "update", evt_id, shift_event_body(turno)))
+    return run_event_batches(cal_id, ops)
+
+
+def delete_shift_events(turno_ids) -> dict[str, dict]:
+    """Batch counterpart of :func:`delete_shift_event` for many ``turno_ids``.
+
+    Returns the same per-shift report as :func:`sync_shift_events`.
+    """
+    cal_id = settings.G_SHIFT_CAL_ID
+    if not cal_id:
+        raise RuntimeError("G_SHIFT_CAL_ID is not configured")
+
+    ops = [(str(t), "delete", shift_event_id(t), None) for t in turno_ids]
+    return run_event_batches(cal_id, ops)
+
+
+# ------------------------------------------------------------------- reconcile
+# Only the fields compared by :func:`event_hash` are requested when listing.
+SHIFT_EVENT_FIELDS = (
+    "items(id,status,summary,description,colorId,start,end),"
+    "nextPageToken,nextSyncToken"
+)
+
+
+class SyncTokenExpired(Exception):
+    """Google rejected a stored ``syncToken`` (HTTP 410): a full list is needed."""
+
+
+def _normalize_dt(value: dict | None) -> str | None:
+    if not value:
+        return None
+    if "dateTime" in value:
+        # Google may answer in the calendar time zone: compare instants
+        return datetime.fromisoformat(value["dateTime"]).astimezone().isoformat()
+    return value.get("date")
+
+
+def event_hash(event: dict) -> str:
+    """Return a stable hash of the fields of ``event`` managed by the app."""
+    payload = [
+        event.get("summary") or "",
+        event.get("description") or "",
+        event.get("colorId") or "",
+        _normalize_dt(event.get("start")),
+        _normalize_dt(event.get("end")),
+    ]
+    return hashlib.sha1(json.dumps(payload).encode("utf-8")).hexdigest()
+
+
+def list_shift_events(
+    time_min: str | None = None,
+    time_max: str | None = None,
+    sync_token: str | None = None,
+) -> tuple[list[dict], str | None]:
+    """List the ``shift-*`` events of the shift calendar.
+
+    Either a ``time_min``/``time_max`` window or a ``sync_token`` from a
+    previous call can be given; Google does not accept both. All pages are
+    followed and only :data:`SHIFT_EVENT_FIELDS` are requested. Returns the
+    events and the ``nextSyncToken`` to store for the next incremental run.
+    Raises :class:`SyncTokenExpired` when Google invalidated ``sync_token``.
+    """
+    cal_id = settings.G_SHIFT_CAL_ID
+    if not cal_id:
+        raise RuntimeError("G_SHIFT_CAL_ID is not configured")
+
+    params = {
+        "calendarId": cal_id,
+        "fields": SHIFT_EVENT_FIELDS,
+        "maxResults": 2500,
+        "singleEvents": True,
+    }
+    if sync_token:
+        params["syncToken"] = sync_token
+    else:
+        params["timeMin"] = time_min
+        params["timeMax"] = time_max
+
+    service = get_client()
+    events: list[dict] = []
+    page_token = None
+    while True:
+        try:
+            resp = service.events().list(pageToken=page_token, **params).execute()
+        except gerr.HttpError as e:
+            if sync_token and e.resp.status == 410:
+                raise SyncTokenExpired(str(e)) from e
+            raise
+        events.extend(
+            item
+            for item in resp.get("items", [])
+            if item.get("id", "").startswith("shift-")
+        )
+        page_token = resp.get("nextPageToken")
+        if not page_token:
+            return events, resp.get("nextSyncToken")
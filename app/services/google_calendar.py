@@ -1,96 +1,221 @@
 from __future__ import annotations
 
-import json
-from datetime import datetime, timedelta
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from fastapi import HTTPException
 from app.config import settings
-from functools import lru_cache
-import os
+from app.services import google_clients
 
 
-@lru_cache(maxsize=1)
 def get_service() -> Any:
-    """Return a cached Google Calendar service client.
+    """Return the shared read-only Google Calendar client.
 
-    Credentials are loaded from ``settings.GOOGLE_CREDENTIALS_JSON`` and the
-    resulting ``build`` object is cached so subsequent calls reuse the same
-    client instance.
+    Credentials are loaded from ``settings.GOOGLE_CREDENTIALS_JSON`` once per
+    process by :mod:`app.services.google_clients`.
     """
 
-    creds_json = settings.GOOGLE_CREDENTIALS_JSON
-    if not creds_json:
+    if not settings.GOOGLE_CREDENTIALS_JSON:
         raise RuntimeError("GOOGLE_CREDENTIALS_JSON is not configured")
+    return google_clients.get_service([google_clients.CALENDAR_READONLY_SCOPE])
 
-    from googleapiclient.discovery import build  # type: ignore
-    from google.oauth2.service_account import Credentials as SACredentials  # type: ignore
-    from google.oauth2.credentials import Credentials as UserCredentials  # type: ignore
 
-    if os.path.isfile(creds_json):
-        with open(creds_json, "r") as fh:
-            info = json.load(fh)
-    else:
-        info = json.loads(creds_json)
+# Only the fields used by the dashboard and the weekly PDF are requested.
+EVENT_FIELDS = "items(id,summary,description,colorId,start,end),nextPageToken"
 
-    if info.get("type") == "service_account":
-        creds = SACredentials.from_service_account_info(
-            info,
-            scopes=["https://www.googleapis.com/auth/calendar.readonly"],
-        )
-    else:
-        creds = UserCredentials.from_authorized_user_info(info)
+# Windows are widened to whole UTC days so that close requests share a fetch;
+# overlapping windows are merged up to this span.
+MAX_MERGED_SPAN = timedelta(days=62)
 
-    return build("calendar", "v3", credentials=creds)
 
-def list_upcoming_events(days: int) -> list[dict[str, Any]]:
-    """Return upcoming Google Calendar events within ``days``.
+class EventWindowCache:
+    """Read-through TTL + LRU cache of events keyed by calendar and window.
 
-    The function expects ``GOOGLE_CREDENTIALS_JSON`` and ``GOOGLE_CALENDAR_ID``
-    environment variables. When they are missing, an empty list is returned.
-    ``data_ora`` fields in the returned dictionaries are ``datetime`` objects.
+    Each entry holds every event of ``calendar_id`` overlapping the window
+    ``[time_min, time_max)``; any request contained in a live window is served
+    from it. ``hits`` and ``misses`` count lookups to help tune the TTL.
     """
-    creds_json = settings.GOOGLE_CREDENTIALS_JSON
-    calendar_id = settings.GOOGLE_CALENDAR_ID
-    if not creds_json or not calendar_id:
-        return []
 
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[float, list]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, calendar_id: str, start: datetime, end: datetime):
+        """Return the cached events of a window covering ``[start, end)``."""
+        now = time.monotonic()
+        with self._lock:
+            for key, (expires, events) in list(self._entries.items()):
+                if expires <= now:
+                    del self._entries[key]
+                    continue
+                cal, lo, hi = key
+                if cal == calendar_id and lo <= start and end <= hi:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return events
+            self.misses += 1
+            return None
+
+    def claim_span(
+        self, calendar_id: str, start: datetime, end: datetime
+    ) -> tuple[datetime, datetime]:
+        """Extend ``[start, end)`` over the overlapping cached windows.
+
+        The merged windows are dropped: the caller refetches the superset.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                cal, lo, hi = key
+                if cal != calendar_id or hi <= start or end <= lo:
+                    continue
+                if max(hi, end) - min(lo, start) > MAX_MERGED_SPAN:
+                    continue
+                start, end = min(lo, start), max(hi, end)
+                del self._entries[key]
+        return start, end
+
+    def store(self, calendar_id: str, start: datetime, end: datetime, events: list):
+        with self._lock:
+            key = (calendar_id, start, end)
+            self._entries[key] = (time.monotonic() + self.ttl, events)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, calendar_id: str) -> None:
+        """Drop the cached windows of ``calendar_id`` after a write to it."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == calendar_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "windows": len(self._entries),
+                "ttl_seconds": self.ttl,
+                "maxsize": self.maxsize,
+            }
+
+
+events_cache = EventWindowCache(
+    ttl=settings.GOOGLE_EVENTS_CACHE_TTL, maxsize=settings.GOOGLE_EVENTS_CACHE_SIZE
+)
+
+
+def _utc(dt: datetime) -> datetime:
+    """Return ``dt`` as a naive UTC datetime (naive values are already UTC)."""
+    if dt.tzinfo is None:
+        return dt
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _parse_when(value: dict[str, Any] | None) -> datetime | None:
+    when = (value or {}).get("dateTime") or (value or {}).get("date")
+    if not when:
+        return None
     try:
-        service = get_service()
-        now = datetime.utcnow()
-        time_min = now.isoformat() + "Z"
-        time_max = (now + timedelta(days=days)).isoformat() + "Z"
+        return datetime.fromisoformat(when.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _fetch_window(calendar_id: str, start: datetime, end: datetime) -> list[tuple]:
+    """Fetch every event overlapping ``[start, end)`` following all pages.
+
+    Returns ``(start_utc, end_utc, item)`` tuples ordered by start time.
+    """
+    service = get_service()
+    events = []
+    page_token = None
+    while True:
         result = (
             service.events()
             .list(
                 calendarId=calendar_id,
-                timeMin=time_min,
-                timeMax=time_max,
+                timeMin=start.isoformat() + "Z",
+                timeMax=end.isoformat() + "Z",
                 singleEvents=True,
                 orderBy="startTime",
+                fields=EVENT_FIELDS,
+                pageToken=page_token,
             )
             .execute()
         )
-        items = []
         for ev in result.get("items", []):
-            start = ev.get("start", {})
-            when = start.get("dateTime") or start.get("date")
-            if not when:
-                continue
-            try:
-                dt = datetime.fromisoformat(when.replace("Z", "+00:00"))
-            except ValueError:
+            dt = _parse_when(ev.get("start"))
+            if dt is None:
                 continue
-            items.append(
-                {
-                    "id": ev.get("id"),
-                    "titolo": ev.get("summary"),
-                    "descrizione": ev.get("description"),
-                    "data_ora": dt,
-                    "colorId": ev.get("colorId"),
-                }
-            )
-        return items
+            ends = _parse_when(ev.get("end")) or dt
+            item = {
+                "id": ev.get("id"),
+                "titolo": ev.get("summary"),
+                "descrizione": ev.get("description"),
+                "data_ora": dt,
+                "colorId": ev.get("colorId"),
+            }
+            events.append((_utc(dt), _utc(ends), item))
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            return events
+
+
+def _events_in_window(start: datetime, end: datetime) -> list[dict[str, Any]]:
+    """Return the events of ``GOOGLE_CALENDAR_ID`` overlapping ``[start, end)``.
+
+    Reads go through :data:`events_cache`; on a miss the window is widened to
+    whole days and merged with overlapping cached windows before fetching.
+    """
+    calendar_id = settings.GOOGLE_CALENDAR_ID
+    start, end = _utc(start), _utc(end)
+
+    events = events_cache.lookup(calendar_id, start, end)
+    if events is None:
+        lo = datetime.combine(start.date(), datetime.min.time())
+        hi = datetime.combine(end.date(), datetime.min.time())
+        if hi < end:
+            hi += timedelta(days=1)
+        lo, hi = events_cache.claim_span(calendar_id, lo, hi)
+        events = _fetch_window(calendar_id, lo, hi)
+        events_cache.store(calendar_id, lo, hi, events)
+
+    return [
+        dict(item)
+        for ev_start, ev_end, item in events
+        if ev_start < end and (ev_end > start or ev_start >= start)
+    ]
+
+
+def list_upcoming_events(days: int) -> list[dict[str, Any]]:
+    """Return upcoming Google Calendar events within ``days``.
+
+    The function expects ``GOOGLE_CREDENTIALS_JSON`` and ``GOOGLE_CALENDAR_ID``
+    environment variables. When they are missing, an empty list is returned.
+    ``data_ora`` fields in the returned dictionaries are ``datetime`` objects.
+    Results are served from :data:`events_cache` when possible.
+    """
+    creds_json = settings.GOOGLE_CREDENTIALS_JSON
+    calendar_id = settings.GOOGLE_CALENDAR_ID
+    if not creds_json or not calendar_id:
+        return []
+
+    try:
+        now = datetime.utcnow()
+        return _events_in_window(now, now + timedelta(days=days))
     except HTTPException:
         raise
     except Exception as exc:  # pragma: no cover - unexpected errors
@@ -103,7 +228,7 @@ def list_events_between(start: datetime, end: datetime) -> list[dict[str, Any]]:
     Credentials and calendar ID are loaded from ``settings`` in the same way as
     :func:`list_upcoming_events`.  When either is missing an empty list is
     returned. ``data_ora`` fields in the returned dictionaries are ``datetime``
-    objects.
+    objects. Results are served from :data:`events_cache` when possible.
     """
 
     creds_json = settings.GOOGLE_CREDENTIALS_JSON
@@ -112,40 +237,7 @@ def list_events_between(start: datetime, end: datetime) -> list[dict[str, Any]]:
         return []
 
     try:
-        service = get_service()
-        time_min = start.isoformat() + "Z"
-        time_max = end.isoformat() + "Z"
-        result = (
-            service.events()
-            .list(
-                calendarId=calendar_id,
-                timeMin=time_min,
-                timeMax=time_max,
-                singleEvents=True,
-                orderBy="startTime",
-            )
-            .execute()
-        )
-        items = []
-        for ev in result.get("items", []):
-            start_obj = ev.get("start", {})
-            when = start_obj.get("dateTime") or start_obj.get("date")
-            if not when:
-                continue
-            try:
-                dt = datetime.fromisoformat(when.replace("Z", "+00:00"))
-            except ValueError:
-                continue
-            items.append(
-                {
-                    "id": ev.get("id"),
-                    "titolo": ev.get("summary"),
-                    "descrizione": ev.get("description"),
-                    "data_ora": dt,
-                    "colorId": ev.get("colorId"),
-                }
-            )
-        return items
+        return _events_in_window(start, end)
     except HTTPException:
         raise
     except Exception as exc:  # pragma: no cover - unexpected errors
@@ -0,0 +1,123 @@
+"""Process-wide registry of Google API clients.
+
+Building a client with ``googleapiclient.discovery.build`` parses the
+discovery document and, without care, reloads the credentials every time.
+This module keeps one set of credentials per scope set and builds clients
+from the discovery document bundled with ``google-api-python-client``, loaded
+once per process, so no network fetch is ever needed.
+
+``httplib2`` connections are not thread-safe, so every thread gets its own
+client for a scope set; the credentials are shared and their token refresh is
+serialised with a lock so concurrent requests refresh only once.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Iterable
+
+from app.config import settings
+
+CALENDAR_SCOPE = "https://www.googleapis.com/auth/calendar"
+CALENDAR_READONLY_SCOPE = "https://www.googleapis.com/auth/calendar.readonly"
+
+_lock = threading.Lock()
+_credentials: dict[frozenset[str], Any] = {}
+_local = threading.local()
+# bumped by :func:`clear` so per-thread clients are rebuilt
+_generation = 0
+
+
+@lru_cache(maxsize=None)
+def discovery_document(service_name: str, version: str) -> dict:
+    """Return the bundled discovery document of ``service_name`` ``version``."""
+    from googleapiclient import discovery_cache  # type: ignore
+
+    content = discovery_cache.get_static_doc(service_name, version)
+    if content is None:
+        raise RuntimeError(f"No bundled discovery document for {service_name} {version}")
+    return json.loads(content)
+
+
+def _load_credentials(scopes: frozenset[str]) -> Any:
+    creds_json = settings.GOOGLE_CREDENTIALS_JSON
+    if not creds_json:
+        raise RuntimeError("GOOGLE_CREDENTIALS_JSON is not configured")
+
+    from google.oauth2.service_account import Credentials as SACredentials  # type: ignore
+    from google.oauth2.credentials import Credentials as UserCredentials  # type: ignore
+
+    if os.path.isfile(creds_json):
+        with open(creds_json, "r") as fh:
+            info = json.load(fh)
+    else:
+        info = json.loads(creds_json)
+
+    if info.get("type") == "service_account":
+        creds = SACredentials.from_service_account_info(info, scopes=sorted(scopes))
+    else:
+        creds = UserCredentials.from_authorized_user_info(info)
+    _make_refresh_thread_safe(creds)
+    return creds
+
+
+def _make_refresh_thread_safe(creds: Any) -> None:
+    """Serialise ``creds.refresh`` and skip it when another thread already did."""
+    refresh = getattr(creds, "refresh", None)
+    if refresh is None:
+        return
+    refresh_lock = threading.Lock()
+
+    def locked_refresh(request):
+        with refresh_lock:
+            if getattr(creds, "valid", False):
+                return
+            refresh(request)
+
+    try:
+        creds.refresh = locked_refresh
+    except AttributeError:  # pragma: no cover - immutable credentials objects
+        pass
+
+
+def get_credentials(scopes: Iterable[str]) -> Any:
+    """Return the shared credentials for ``scopes``, loading them once."""
+    key = frozenset(scopes)
+    with _lock:
+        creds = _credentials.get(key)
+        if creds is None:
+            creds = _credentials[key] = _load_credentials(key)
+        return creds
+
+
+def get_service(
+    scopes: Iterable[str], service_name: str = "calendar", version: str = "v3"
+) -> Any:
+    """Return this thread's client for ``service_name`` authorised for ``scopes``."""
+    key = (frozenset(scopes), service_name, version)
+    services = getattr(_local, "services", None)
+    if services is None or getattr(_local, "generation", None) != _generation:
+        services = _local.services = {}
+        _local.generation = _generation
+
+    service = services.get(key)
+    if service is None:
+        from googleapiclient import discovery  # type: ignore
+
+        service = discovery.build_from_document(
+            discovery_document(service_name, version),
+            credentials=get_credentials(key[0]),
+        )
+        services[key] = service
+    return service
+
+
+def clear() -> None:
+    """Forget cached credentials and clients (e.g. after a settings change)."""
+    global _generation
+    with _lock:
+        _credentials.clear()
+        _generation += 1
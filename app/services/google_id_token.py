@@ -0,0 +1,150 @@
+"""Verification of Google ID tokens used by ``/google-login``.
+
+``google.oauth2.id_token`` downloads Google's public certificates for every
+token it checks. :data:`certs_request` is the google-auth transport used
+here instead: it goes through one pooled ``requests.Session`` (kept-alive
+connections) and answers certificate fetches from memory for as long as the
+``Cache-Control: max-age`` of the last response allows, so on the hot path
+verifying a token is only the local signature and claims check.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from typing import Any, Mapping
+
+import requests
+from google.auth import exceptions, transport
+from google.auth.transport.requests import Request
+from google.oauth2 import id_token
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE_RE = re.compile(r"(?:^|,)\s*max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+# certificate endpoint, overridable in tests
+certs_url = GOOGLE_CERTS_URL
+
+
+def max_age(headers: Mapping[str, str]) -> int:
+    """Return the ``max-age`` of a ``Cache-Control`` header in seconds.
+
+    ``0`` when the header is absent or forbids caching.
+    """
+    value = next(
+        (v for k, v in headers.items() if k.lower() == "cache-control"), ""
+    )
+    if re.search(r"no-store|no-cache", value, re.IGNORECASE):
+        return 0
+    match = _MAX_AGE_RE.search(value)
+    return int(match.group(1)) if match else 0
+
+
+class _CachedResponse(transport.Response):
+    def __init__(self, status: int, headers: Mapping[str, str], data: bytes):
+        self._status = status
+        self._headers = dict(headers)
+        self._data = data
+
+    @property
+    def status(self) -> int:
+        return self._status
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        return self._headers
+
+    @property
+    def data(self) -> bytes:
+        return self._data
+
+
+class CachingCertsRequest(transport.Request):
+    """google-auth transport caching successful GETs for their ``max-age``.
+
+    Only used for the certificate endpoints, whose responses are the same
+    for every caller. Concurrent misses on the same URL fetch it once.
+    """
+
+    def __init__(self, request: transport.Request):
+        self._request = request
+        self._entries: dict[str, tuple[float, _CachedResponse]] = {}
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, url: str) -> _CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            return None
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=None, **kwargs):
+        if method != "GET":
+            return self._request(
+                url, method=method, body=body, headers=headers, timeout=timeout, **kwargs
+            )
+
+        response = self._cached(url)
+        if response is not None:
+            return response
+        with self._fetch_lock:
+            # another thread may have refreshed the entry meanwhile
+            response = self._cached(url)
+            if response is not None:
+                return response
+            with self._lock:
+                self.misses += 1
+            fetched = self._request(
+                url, method=method, headers=headers, timeout=timeout, **kwargs
+            )
+            response = _CachedResponse(fetched.status, fetched.headers, fetched.data)
+            ttl = max_age(response.headers) if response.status == 200 else 0
+            if ttl > 0:
+                with self._lock:
+                    self._entries[url] = (time.monotonic() + ttl, response)
+            return response
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "cached_urls": sum(1 for exp, _ in self._entries.values() if exp > now),
+            }
+
+
+session = requests.Session()
+session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=10))
+certs_request = CachingCertsRequest(Request(session))
+
+
+def verify(token: str, audience: str) -> dict:
+    """Verify a Google ID ``token`` issued for ``audience`` and return its claims.
+
+    Raises ``ValueError`` or ``google.auth.exceptions.GoogleAuthError`` when
+    the token is invalid.
+    """
+    claims = id_token.verify_token(
+        token, certs_request, audience=audience, certs_url=certs_url
+    )
+    if claims.get("iss") not in GOOGLE_ISSUERS:
+        raise exceptions.GoogleAuthError(
+            "Wrong issuer. 'iss' should be one of the following: {}".format(
+                GOOGLE_ISSUERS
+            )
+        )
+    return claims
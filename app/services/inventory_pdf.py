@@ -1,39 +1,17 @@
-from typing import List, Dict, Any, Tuple
-from weasyprint import HTML
-import tempfile
+from typing import List, Dict, Any
 
+from app.services.pdf_renderer import render_pdf
+from app.services.report_templates import INVENTORY, render_report
 
-def build_inventory_pdf(items: List[Dict[str, Any]], year: int) -> Tuple[str, str]:
-    """Generate an inventory PDF for *year* from ``items``.
 
-    Each item should be a mapping with ``name`` and ``count`` keys. The
-    function returns a tuple ``(pdf_path, html_path)`` with the generated
-    files.
-    """
-
-    rows_html = "".join(
-        f"<tr><td>{item.get('name', '')}</td><td>{item.get('count', '')}</td></tr>"
-        for item in items
-    )
+def build_inventory_html(items: List[Dict[str, Any]], year: int) -> str:
+    """Build the inventory report HTML for *year* from ``items``.
 
-    html_content = f"""
-    <html>
-    <body>
-    <h1>Inventario {year}</h1>
-    <h1 style='font-size:64px; color:yellow;'>🚧 LAVORI IN CORSO 🚧</h1>
-    <table border='1' style='border-collapse:collapse;'>
-        <tr><th>Nome</th><th>Quantità</th></tr>
-        {rows_html}
-    </table>
-    </body>
-    </html>
+    Each item should be a mapping with ``name`` and ``count`` keys.
     """
+    return render_report(INVENTORY, items=items, year=year)
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".html") as tmp_html:
-        tmp_html.write(html_content.encode("utf-8"))
-        html_path = tmp_html.name
-
-    pdf_path = html_path.replace(".html", ".pdf")
-    HTML(filename=html_path).write_pdf(pdf_path)
 
-    return pdf_path, html_path
+def build_inventory_pdf(items: List[Dict[str, Any]], year: int) -> bytes:
+    """Generate an inventory PDF for *year* and return the rendered bytes."""
+    return render_pdf(build_inventory_html(items, year))
@@ -0,0 +1,34 @@
+"""Deferred imports of heavy optional libraries.
+
+``pandas``, ``numpy``, WeasyPrint and ``googleapiclient`` add seconds to a
+cold start while most requests never use them. Modules that need them at call
+time bind a :class:`LazyModule` at import time instead::
+
+    pd = LazyModule("pandas")
+
+and the real module is imported on the first attribute access.
+"""
+
+from __future__ import annotations
+
+import importlib
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule:
+    """Proxy importing the module ``name`` on first attribute access."""
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+
+    def _load(self) -> ModuleType:
+        # ``import_module`` returns the cached module after the first call and
+        # the import lock makes concurrent first accesses safe
+        return importlib.import_module(self._name)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        return f"<LazyModule {self._name!r}>"
@@ -0,0 +1,214 @@
+"""Keyset pagination and column projection for list endpoints.
+
+List endpoints accept three optional query parameters:
+
+``limit``
+    page size (capped at ``LIST_MAX_LIMIT``);
+``after``
+    the opaque cursor returned in the ``X-Next-Cursor`` header of the
+    previous page;
+``fields``
+    comma-separated columns to return; only those are selected from the
+    database.
+
+Pages are ordered by the natural sort key of the endpoint, which always ends
+with the primary key, and the next page starts strictly after the last row of
+the previous one (``WHERE key > cursor``), so with a composite index on the
+sort key (migration 0018) paging costs one index range scan however deep the
+client goes. NULLs of a nullable key sort after every value, first when the
+order is descending, as PostgreSQL orders them. The body is still a JSON
+array; the header is absent on the last page.
+
+With ``LIST_PAGINATION_COMPAT`` enabled (the default), requests without
+``limit`` and ``after`` get every row, as before pagination existed.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Any, Sequence
+
+from fastapi import HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import and_, false, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.config import settings
+from app.services.responses import rows_response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class ListParams:
+    """``limit``/``after``/``fields`` query parameters (use with ``Depends()``)."""
+
+    def __init__(
+        self,
+        limit: int | None = Query(None, ge=1, description="Page size"),
+        after: str | None = Query(None, description="Cursor of the previous page"),
+        fields: str | None = Query(None, description="Comma-separated columns"),
+    ):
+        self.limit = limit
+        self.after = after
+        self.fields = [f.strip() for f in (fields or "").split(",") if f.strip()]
+
+    @property
+    def paginated(self) -> bool:
+        return (
+            self.limit is not None
+            or self.after is not None
+            or not settings.LIST_PAGINATION_COMPAT
+        )
+
+    @property
+    def page_size(self) -> int:
+        return min(self.limit or settings.LIST_DEFAULT_LIMIT, settings.LIST_MAX_LIMIT)
+
+
+@dataclass
+class Page:
+    rows: list
+    schema: type
+    next_cursor: str | None = None
+    fields: list[str] | None = None
+
+
+def _encode(values: Sequence[Any]) -> str:
+    raw = json.dumps(jsonable_encoder(list(values)), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _parse(value: Any, python_type: type) -> Any:
+    if value is None or isinstance(value, python_type):
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is time:
+        return time.fromisoformat(value)
+    return python_type(value)
+
+
+class Keyset:
+    """Natural sort key of a list endpoint.
+
+    ``keys`` are columns of ``model`` ending with a unique one (the primary
+    key); ``descending`` reverses the whole order. ``schema`` is the response
+    model, whose column fields may be requested with ``fields``.
+    """
+
+    def __init__(self, model, schema, *keys, descending: bool = False):
+        self.model = model
+        self.schema = schema
+        self.keys = keys
+        self.descending = descending
+        columns = set(model.__table__.columns.keys())
+        self.allowed_fields = [f for f in schema.model_fields if f in columns]
+
+    def _decode(self, cursor: str) -> list[Any]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded))
+            if not isinstance(values, list) or len(values) != len(self.keys):
+                raise ValueError(cursor)
+            return [
+                _parse(v, key.type.python_type) for v, key in zip(values, self.keys)
+            ]
+        except (ValueError, TypeError, binascii.Error):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    @staticmethod
+    def _equal(key, value):
+        return key.is_(None) if value is None else key == value
+
+    def _beyond(self, key, value):
+        """Rows of ``key`` strictly after ``value`` in the page order."""
+        if not key.nullable:
+            return key < value if self.descending else key > value
+        # NULLs sort as greater than every value, as in PostgreSQL: last
+        # ascending, first descending
+        if self.descending:
+            return key.is_not(None) if value is None else key < value
+        return false() if value is None else or_(key.is_(None), key > value)
+
+    def _after(self, values: list[Any]):
+        """``(k1, k2, ...) > values`` (``<`` when descending) as portable SQL."""
+        clauses = []
+        for i, key in enumerate(self.keys):
+            equal = (self._equal(k, v) for k, v in zip(self.keys[:i], values[:i]))
+            clauses.append(and_(*equal, self._beyond(key, values[i])))
+        return or_(*clauses)
+
+    def _order(self, key):
+        if self.descending:
+            return key.desc().nulls_first() if key.nullable else key.desc()
+        return key.asc().nulls_last() if key.nullable else key.asc()
+
+    def _fields(self, params: ListParams) -> list[str] | None:
+        if not params.fields:
+            return None
+        unknown = [f for f in params.fields if f not in self.allowed_fields]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}",
+            )
+        return params.fields
+
+    def statement(self, base: Select, params: ListParams) -> Select:
+        """Apply projection, cursor, order and limit of ``params`` to ``base``."""
+        fields = self._fields(params)
+        stmt = base
+        if fields:
+            columns = [self.model.__table__.c[f] for f in fields]
+            # the sort key is needed to build the next cursor
+            columns += [k for k in self.keys if k.key not in fields]
+            stmt = stmt.with_only_columns(*columns)
+        if not params.paginated:
+            return stmt
+        if params.after:
+            stmt = stmt.where(self._after(self._decode(params.after)))
+        order = [self._order(k) for k in self.keys]
+        return stmt.order_by(*order).limit(params.page_size + 1)
+
+    def page(self, result, params: ListParams) -> Page:
+        """Build the :class:`Page` from the executed :meth:`statement`."""
+        fields = self._fields(params)
+        rows = list(result.all() if fields else result.scalars().all())
+        cursor = None
+        if params.paginated and len(rows) > params.page_size:
+            rows = rows[: params.page_size]
+            last = rows[-1]
+            cursor = _encode([getattr(last, k.key) for k in self.keys])
+        return Page(rows=rows, schema=self.schema, next_cursor=cursor, fields=fields)
+
+    def fetch(self, db: Session, base: Select, params: ListParams) -> Page:
+        return self.page(db.execute(self.statement(base, params)), params)
+
+    async def fetch_async(
+        self, db: AsyncSession, base: Select, params: ListParams
+    ) -> Page:
+        return self.page(await db.execute(self.statement(base, params)), params)
+
+
+def page_response(page: Page) -> Response:
+    """Return ``page`` from a route, with the next cursor in a header.
+
+    Full rows are serialized through the schema of the keyset; projected
+    rows are returned as they are, since they lack the other fields of it.
+    """
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else None
+    if page.fields:
+        return ORJSONResponse(
+            [{f: getattr(row, f) for f in page.fields} for row in page.rows],
+            headers=headers,
+        )
+    return rows_response(page.schema, page.rows, headers)
@@ -0,0 +1,74 @@
+"""Password hashing with bcrypt on a dedicated thread pool.
+
+A bcrypt check costs a few hundred milliseconds at the default cost. Run in
+the request threadpool, a burst of logins (e.g. at shift change) takes every
+thread and stalls unrelated endpoints; :func:`verify_and_update` runs it on
+its own executor of ``PASSWORD_HASH_WORKERS`` threads instead, so extra
+logins wait for a hashing thread without holding a request thread. bcrypt
+releases the GIL while hashing.
+
+The cost factor is ``BCRYPT_ROUNDS``; stored hashes made with a different
+cost are reported by :func:`verify_and_update` so the caller can save the
+rehashed value.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+
+from passlib.context import CryptContext
+
+from app.config import settings
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(settings.PASSWORD_HASH_WORKERS, 1),
+                thread_name_prefix="password-hash",
+            )
+        return _executor
+
+
+def shutdown() -> None:
+    """Stop the hashing threads (they are started again on the next call)."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def hash_password(password: str) -> str:
+    """Return the bcrypt hash of ``password``."""
+    return pwd_context.hash(password)
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    """Return ``True`` if ``password`` matches ``hashed_password``."""
+    return pwd_context.verify(password, hashed_password)
+
+
+async def verify_and_update(
+    password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Check ``password`` on the hashing executor.
+
+    Returns ``(valid, new_hash)``; ``new_hash`` is set when the password is
+    valid but ``hashed_password`` uses an outdated scheme or cost.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_executor(), pwd_context.verify_and_update, password, hashed_password
+    )
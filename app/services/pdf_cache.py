@@ -0,0 +1,209 @@
+"""Content-addressed on-disk cache of the weekly turni PDFs.
+
+Each PDF is stored as ``<root>/<YYYY-Www>/<key>.pdf`` where ``key`` is a hash
+of everything that ends up in the document: the turni rows, the notes coming
+from public events and Google Calendar, and the :func:`render_version` of the
+template and renderer. The same key doubles as the ``ETag`` of the response,
+so unchanged weeks can be answered with ``304``.
+
+The directory is bounded by size: a hit refreshes the file's modification
+time and, when the total grows past ``max_bytes``, the least recently used
+files are removed. The total is kept as a running count of what this process
+wrote and removed; the directory is only walked to start it and when the
+count goes past the limit, which also picks up the files written by other
+processes sharing it. Writes to ``turni`` drop the affected weeks through
+:func:`invalidate_days`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import date
+from functools import lru_cache
+from importlib import metadata
+from typing import Any, Iterable
+
+from app.config import settings
+from app.services import report_templates
+
+logger = logging.getLogger(__name__)
+
+
+def iso_week(day: date) -> str:
+    """Return the ``YYYY-Www`` label of the ISO week containing ``day``."""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def cache_key(*parts: Any) -> str:
+    """Hash ``parts`` (JSON-serialisable) into a stable hexadecimal key."""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# bump when the week grid built by ``shift_grid`` changes
+LAYOUT_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def render_version() -> str:
+    """Key of what shapes the PDF besides its data.
+
+    Combines :data:`LAYOUT_VERSION`, the source of the week template and the
+    WeasyPrint version, so a deploy changing any of them misses PDFs (and
+    ``ETag`` values) left in a persistent ``PDF_CACHE_DIR``.
+    """
+    try:
+        weasyprint = metadata.version("weasyprint")
+    except metadata.PackageNotFoundError:
+        weasyprint = None
+    template = report_templates.template_digest(report_templates.WEEK_SCHEDULE)
+    return cache_key(LAYOUT_VERSION, template, weasyprint)
+
+
+class PdfCache:
+    """Size-bounded LRU directory of rendered PDFs grouped by ISO week."""
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # running size of the directory, ``None`` until it is first walked
+        self._bytes: int | None = None
+        self._lock = threading.Lock()
+
+    def _path(self, week: str, key: str) -> str:
+        return os.path.join(self.root, week, f"{key}.pdf")
+
+    def get(self, week: str, key: str) -> bytes | None:
+        """Return the cached PDF for ``week``/``key`` or ``None``."""
+        path = self._path(week, key)
+        with self._lock:
+            try:
+                with open(path, "rb") as fh:
+                    data = fh.read()
+                os.utime(path)
+            except OSError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return data
+
+    def put(self, week: str, key: str, pdf: bytes) -> None:
+        """Store ``pdf`` and evict the least recently used files if needed."""
+        if len(pdf) > self.max_bytes:
+            return
+        path = self._path(week, key)
+        with self._lock:
+            # unique across the threads and worker processes sharing the dir
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                if self._bytes is None:
+                    self._bytes = sum(size for _, size, _ in self._files())
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(tmp, "wb") as fh:
+                    fh.write(pdf)
+                replaced = _size(path)
+                os.replace(tmp, path)
+                tmp = None
+                self._bytes += len(pdf) - replaced
+                if self._bytes > self.max_bytes:
+                    self._evict()
+            except OSError:
+                # the cache is an optimisation: a full disk must not fail requests
+                logger.warning("Could not cache PDF %s", path, exc_info=True)
+            finally:
+                if tmp is not None:
+                    try:
+                        os.remove(tmp)
+                    except OSError:
+                        pass
+
+    def _files(self) -> list[tuple[float, int, str]]:
+        files = []
+        for dirpath, _, names in os.walk(self.root):
+            for name in names:
+                if not name.endswith(".pdf"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+        return files
+
+    def _evict(self) -> None:
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._bytes = total
+
+    def invalidate(self, weeks: Iterable[str]) -> None:
+        """Drop every cached PDF of ``weeks``."""
+        with self._lock:
+            for week in set(weeks):
+                folder = os.path.join(self.root, week)
+                if self._bytes is not None:
+                    self._bytes -= _folder_size(folder)
+                shutil.rmtree(folder, ignore_errors=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            files = self._files()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "files": len(files),
+                "bytes": sum(size for _, size, _ in files),
+                "max_bytes": self.max_bytes,
+            }
+
+
+def _size(path: str) -> int:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+def _folder_size(folder: str) -> int:
+    try:
+        with os.scandir(folder) as entries:
+            return sum(
+                _size(entry.path)
+                for entry in entries
+                if entry.name.endswith(".pdf")
+            )
+    except OSError:
+        return 0
+
+
+week_pdf_cache = PdfCache(
+    root=settings.PDF_CACHE_DIR, max_bytes=settings.PDF_CACHE_MAX_BYTES
+)
+
+
+def invalidate_days(days: Iterable[date]) -> None:
+    """Drop the cached weekly PDFs of the ISO weeks containing ``days``."""
+    week_pdf_cache.invalidate(iso_week(day) for day in days)
@@ -0,0 +1,268 @@
+"""PDF rendering shared by the report builders.
+
+WeasyPrint reads the HTML from a string and writes the PDF into a
+``BytesIO``: nothing touches the filesystem, so there is nothing to clean up
+when a request fails or a worker dies half-way.
+
+Routes render through :func:`render`, which hands the CPU-bound layout to a
+bounded pool of worker processes (``PDF_RENDER_WORKERS``) that imported
+WeasyPrint and loaded the fonts when they started, keeping the API workers
+and their GIL free. When more than ``PDF_RENDER_QUEUE_LIMIT`` renders are
+already waiting for a worker, new requests get ``503`` with ``Retry-After``
+instead of piling up. A worker that dies (e.g. killed for memory) breaks the
+pool: the request gets ``503`` and the next one starts fresh workers. A
+render running longer than ``PDF_RENDER_TIMEOUT`` once a worker picked it up
+(waiting in the queue does not count) is interrupted in that worker and gets
+``504``; the worker goes on with the next render. With
+``PDF_RENDER_WORKERS=0`` renders run in the threadpool of the API process
+(used by the tests, which patch WeasyPrint).
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+import asyncio
+import faulthandler
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from typing import Any
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# relative resources (e.g. the logo) are resolved against the static folder
+STATIC_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "static")
+)
+# seconds past the timeout after which a render stuck in native code (where
+# the alarm cannot interrupt it) ends its worker process
+EXIT_GRACE = 10.0
+
+
+class RenderTimeout(Exception):
+    """Raised in a worker process by a render running past its deadline."""
+
+
+def render_pdf(html: str, base_url: str = STATIC_DIR) -> bytes:
+    """Render ``html`` to PDF bytes without temporary files."""
+    # WeasyPrint (and its font stack) is only loaded by processes that render
+    from weasyprint import HTML
+
+    buffer = BytesIO()
+    HTML(string=html, base_url=base_url).write_pdf(buffer)
+    return buffer.getvalue()
+
+
+def pdf_response(pdf: bytes, filename: str) -> StreamingResponse:
+    """Stream ``pdf`` back as an attachment called ``filename``."""
+    return StreamingResponse(
+        BytesIO(pdf),
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _warm_up() -> None:
+    """Worker initializer: lay out a tiny page so fonts and CSS are loaded."""
+    render_pdf("<html><body><p>warm-up</p></body></html>")
+
+
+def _timed_render(html: str, base_url: str) -> tuple[bytes, float]:
+    started = time.perf_counter()
+    pdf = render_pdf(html, base_url)
+    return pdf, time.perf_counter() - started
+
+
+def _expired(signum, frame) -> None:
+    raise RenderTimeout()
+
+
+def _run_with_deadline(render, timeout: float, html: str, base_url: str):
+    """Run ``render``, stopping it ``timeout`` seconds after it starts.
+
+    ``SIGALRM`` raises :class:`RenderTimeout` in the render, which leaves the
+    worker free for the next task. A render blocked in native code does not
+    see the signal; ``EXIT_GRACE`` seconds later faulthandler dumps its stack
+    and exits the process, which breaks the pool as any dead worker does.
+    """
+    if not timeout:
+        return render(html, base_url)
+    signal.signal(signal.SIGALRM, _expired)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    faulthandler.dump_traceback_later(timeout + EXIT_GRACE, exit=True)
+    try:
+        return render(html, base_url)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        faulthandler.cancel_dump_traceback_later()
+
+
+class RenderPool:
+    """Bounded process pool rendering PDFs, with timing metrics.
+
+    ``workers`` processes render at most ``workers`` documents at a time and
+    at most ``queue_limit`` more may wait; past that :meth:`render` raises
+    ``503``. Renders in worker processes are stopped after running for
+    ``timeout`` seconds (``0`` for no limit). Metrics separate the time spent
+    waiting for a worker from the time spent rendering.
+    """
+
+    def __init__(self, workers: int, queue_limit: int, timeout: float = 0):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._reset_metrics()
+
+    def _reset_metrics(self) -> None:
+        self.renders = 0
+        self.failures = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.render_seconds = 0.0
+        self.max_render_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return max(self.workers, 1) + self.queue_limit
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_up,
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        """Drop ``executor`` so that the next render starts new workers."""
+        with self._lock:
+            if self._executor is not executor:
+                return  # already replaced by a concurrent failure
+            self._executor = None
+            self.restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _render_in_worker(self, html: str, base_url: str) -> tuple[bytes, float]:
+        executor = self._get_executor()
+        try:
+            future = executor.submit(
+                _run_with_deadline, _timed_render, self.timeout, html, base_url
+            )
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            logger.error("PDF render worker died, restarting the pool")
+            self._discard(executor)
+            raise HTTPException(
+                status_code=503,
+                detail="PDF renderer restarted, retry later",
+                headers={"Retry-After": "1"},
+            )
+        except RenderTimeout:
+            logger.error("PDF render exceeded %ss", self.timeout)
+            with self._lock:
+                self.timeouts += 1
+            raise HTTPException(status_code=504, detail="PDF rendering timed out")
+
+    def start(self) -> None:
+        """Start the worker processes now instead of on the first render."""
+        if self.workers <= 0:
+            return
+        executor = self._get_executor()
+        # one task per worker so every process is spawned and warmed up
+        for _ in range(self.workers):
+            executor.submit(time.sleep, 0)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def render(self, html: str, base_url: str = STATIC_DIR) -> bytes:
+        """Render ``html`` to PDF bytes without blocking the event loop."""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="PDF renderer busy, retry later",
+                    headers={"Retry-After": "1"},
+                )
+            self._in_flight += 1
+
+        queued = time.perf_counter()
+        try:
+            if self.workers > 0:
+                pdf, elapsed = await self._render_in_worker(html, base_url)
+            else:
+                pdf, elapsed = await run_in_threadpool(_timed_render, html, base_url)
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        total = time.perf_counter() - queued
+        with self._lock:
+            self.renders += 1
+            self.render_seconds += elapsed
+            self.max_render_seconds = max(self.max_render_seconds, elapsed)
+            self.wait_seconds += max(total - elapsed, 0.0)
+        logger.debug("Rendered PDF in %.3fs (%.3fs total)", elapsed, total)
+        return pdf
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "in_flight": self._in_flight,
+                "renders": self.renders,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "restarts": self.restarts,
+                "avg_render_seconds": (
+                    self.render_seconds / self.renders if self.renders else 0.0
+                ),
+                "max_render_seconds": self.max_render_seconds,
+                "avg_wait_seconds": (
+                    self.wait_seconds / self.renders if self.renders else 0.0
+                ),
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._reset_metrics()
+
+
+pool = RenderPool(
+    workers=settings.PDF_RENDER_WORKERS,
+    queue_limit=settings.PDF_RENDER_QUEUE_LIMIT,
+    timeout=settings.PDF_RENDER_TIMEOUT,
+)
+
+
+async def render(html: str, base_url: str = STATIC_DIR) -> bytes:
+    """Render ``html`` to PDF bytes on the shared :data:`pool`."""
+    return await pool.render(html, base_url)
@@ -0,0 +1,65 @@
+"""Jinja2 templates of the HTML reports rendered to PDF.
+
+The templates in ``app/templates`` are compiled once, when this module is
+imported at startup, and rendered with autoescaping: values passed in the
+context are plain text and never need escaping by the caller. The logo URL is
+resolved once per process.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+import hashlib
+from pathlib import Path
+import os
+
+from fastapi import HTTPException
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+TEMPLATES_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "templates")
+)
+LOGO_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "static", "Logo.png")
+)
+
+WEEK_SCHEDULE = "turni_settimana.html"
+HORIZONTAL_SIGNAGE = "segnaletica_orizzontale.html"
+INVENTORY = "inventario.html"
+
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+# compiled now and kept in the environment cache
+_templates = {
+    name: _env.get_template(name)
+    for name in (WEEK_SCHEDULE, HORIZONTAL_SIGNAGE, INVENTORY)
+}
+
+
+@lru_cache(maxsize=None)
+def logo_url() -> str:
+    """Return the ``file://`` URL of ``static/Logo.png``.
+
+    Raises ``HTTPException`` (500) when the file is missing; the lookup is
+    retried on the next call in that case.
+    """
+    if not os.path.exists(LOGO_PATH):
+        raise HTTPException(status_code=500, detail="Logo file missing")
+    return Path(LOGO_PATH).as_uri()
+
+
+@lru_cache(maxsize=None)
+def template_digest(name: str) -> str:
+    """Return a hash of the source of template ``name`` (for cache keys)."""
+    source, _, _ = _env.loader.get_source(_env, name)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def render_report(name: str, **context) -> str:
+    """Render the precompiled template ``name`` with ``context``."""
+    return _templates[name].render(**context)
@@ -0,0 +1,43 @@
+"""JSON bodies of list endpoints.
+
+FastAPI serializes a returned list by validating it against the route
+``response_model``, dumping it to Python primitives and then encoding those
+to JSON. :func:`rows_response` validates the ORM rows once and writes the
+bytes with pydantic's ``TypeAdapter.dump_json`` instead; routes keep their
+``response_model`` for the OpenAPI schema, which FastAPI does not apply to a
+returned :class:`~fastapi.Response`.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Iterable, Mapping
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def list_adapter(schema: type) -> TypeAdapter:
+    """Cached ``TypeAdapter`` for ``list[schema]``."""
+    return TypeAdapter(list[schema])
+
+
+def dump_rows(schema: type, rows: Iterable[Any], mode: str = "json") -> list[dict]:
+    """Rows as dicts shaped by ``schema``.
+
+    With ``mode="python"`` dates and enums are kept as Python objects.
+    """
+    adapter = list_adapter(schema)
+    return adapter.dump_python(
+        adapter.validate_python(list(rows), from_attributes=True), mode=mode
+    )
+
+
+def rows_response(
+    schema: type, rows: Iterable[Any], headers: Mapping[str, str] | None = None
+) -> Response:
+    """JSON array of ``rows`` serialized through ``schema``."""
+    adapter = list_adapter(schema)
+    body = adapter.dump_json(adapter.validate_python(list(rows), from_attributes=True))
+    return Response(body, media_type="application/json", headers=headers)
@@ -1,8 +1,12 @@
-import pandas as pd
 from typing import Any, Dict, List
 from fastapi import HTTPException
 from pathlib import Path
 
+from app.services.lazy_modules import LazyModule
+
+# imported on first use: most workers never parse a spreadsheet
+pd = LazyModule("pandas")
+
 
 def parse_file(path: str) -> List[Dict[str, Any]]:
     """Return rows with ``azienda`` and ``descrizione`` from ``path``.
@@ -0,0 +1,292 @@
+"""Weekly shift grid shown in the turni PDFs.
+
+The grid is built in a single pass over the turni, which may be ``Turno``
+ORM objects, ``TurnoOut``-style dicts (as returned by the API or by
+:func:`app.services.excel_import.parse_excel`) or named tuples with the same
+fields. Days are grouped by ``date`` and times are formatted without
+parsing, so rendering a week does not need pandas.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+import re
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.models.event import Event
+from app.models.user import User
+from app.schemas.turno import DAY_OFF_TYPES
+from app.services import google_calendar
+from app.services.pdf_renderer import render_pdf
+from app.services.report_templates import WEEK_SCHEDULE, logo_url, render_report
+
+WEEKDAYS = (
+    "LUNEDI",
+    "MARTEDI",
+    "MERCOLEDI",
+    "GIOVEDI",
+    "VENERDI",
+    "SABATO",
+    "DOMENICA",
+)
+
+DAY_OFF_VALUES = frozenset(t.value for t in DAY_OFF_TYPES)
+
+EMAIL_RE = re.compile(r"\S+@\S+")
+_TIME_RE = re.compile(r"(\d{1,2}):(\d{2})(?::\d{2}(?:\.\d+)?)?")
+
+Notes = Tuple[Dict[str, List[str]], Dict[str, List[str]]]
+
+
+def _strip_emails(text: str) -> str:
+    """Remove email addresses from ``text`` and return the cleaned string."""
+
+    if not text:
+        return ""
+    cleaned = EMAIL_RE.sub("", text).strip()
+    return cleaned
+
+
+def _day_label(day: date) -> str:
+    return day.strftime("%d/%m/%Y")
+
+
+def week_notes(db: Session | None, start: date, end: date) -> Notes:
+    """Return the Google Calendar and public event notes between ``start`` and ``end``.
+
+    Both mappings are keyed by ``dd/mm/YYYY`` and hold the titles (without
+    e-mail addresses) listed in the notes column of :func:`df_to_html`.
+    """
+
+    # Load Google Calendar events for the week
+    gcal_notes: dict[str, list[str]] = {}
+    try:
+        events = google_calendar.list_events_between(
+            datetime.combine(start, time.min),
+            datetime.combine(end, time.max),
+        )
+    except HTTPException:
+        raise
+    except Exception:
+        events = []
+
+    for ev in events:
+        if str(ev.get("id", "")).startswith("shift-"):
+            continue
+        title = ev.get("titolo")
+        if isinstance(title, str) and title.strip().lower().startswith("turno"):
+            continue
+        day = ev.get("data_ora")
+        if isinstance(day, datetime):
+            key = _day_label(day.date())
+            if title:
+                clean = _strip_emails(str(title))
+                if clean:
+                    gcal_notes.setdefault(key, []).append(clean)
+
+    # Load public events from the database
+    event_notes: dict[str, list[str]] = {}
+    if db is not None:
+        public_events = (
+            db.query(Event.titolo, Event.data_ora)
+            .filter(Event.is_public == True)
+            .filter(Event.data_ora >= datetime.combine(start, time.min))
+            .filter(Event.data_ora <= datetime.combine(end, time.max))
+            .all()
+        )
+        for titolo, dt in public_events:
+            key = _day_label(dt.date())
+            clean = _strip_emails(str(titolo))
+            if clean:
+                event_notes.setdefault(key, []).append(clean)
+
+    return gcal_notes, event_notes
+
+
+def _field(row: Any, name: str) -> Any:
+    if isinstance(row, dict):
+        return row.get(name)
+    return getattr(row, name, None)
+
+
+def _present(value: Any) -> bool:
+    """``False`` for ``None``, empty strings and NaN (``value != value``)."""
+    return value is not None and value != "" and value == value
+
+
+def _as_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _fmt_time(t: Any) -> str:
+    """Return ``t`` formatted as HH:MM when it is a time or string value."""
+    if t is None or t == "":
+        return ""
+    if isinstance(t, time):
+        return f"{t.hour:02d}:{t.minute:02d}"
+    if isinstance(t, str):
+        match = _TIME_RE.fullmatch(t)
+        if match is None:
+            return t
+        hours, minutes = match.groups()
+        return f"{int(hours):02d}:{minutes}"
+    return str(t)
+
+
+def _cell(row: Any) -> Dict[str, Any]:
+    tipo = _field(row, "tipo")
+    tipo = getattr(tipo, "value", tipo)
+    if tipo in DAY_OFF_VALUES:
+        return {"dayoff": tipo, "segments": [], "extra": None}
+
+    segments = []
+    for n in (1, 2):
+        start, end = _field(row, f"inizio_{n}"), _field(row, f"fine_{n}")
+        if _present(start) and _present(end):
+            segments.append(f"{_fmt_time(start)} – {_fmt_time(end)}")
+    extra = None
+    start, end = _field(row, "inizio_3"), _field(row, "fine_3")
+    if _present(start) and _present(end):
+        extra = f"{_fmt_time(start)} – {_fmt_time(end)}"
+    return {"dayoff": None, "segments": segments, "extra": extra}
+
+
+def _agent_names(rows: List[Any], db: Session | None) -> Dict[str, str]:
+    """Map ``user_id`` to agent name with one query (empty without ``db``)."""
+    if db is None:
+        return {}
+    ids = {str(uid) for uid in (_field(r, "user_id") for r in rows) if uid is not None}
+    if not ids:
+        return {}
+    users = db.query(User.id, User.nome).filter(User.id.in_(ids)).all()
+    return {str(u.id): u.nome for u in users}
+
+
+def _group_by_day(
+    rows: Iterable[Any], names: Dict[str, str]
+) -> Dict[date, List[Tuple[str | None, Any]]]:
+    """Group ``rows`` by ``giorno`` as ``{day: [(agent, row), ...]}``."""
+    by_day: dict[date, list] = {}
+    for row in rows:
+        agent = _field(row, "Agente")
+        uid = _field(row, "user_id")
+        if uid is not None and str(uid) in names:
+            agent = names[str(uid)]
+        by_day.setdefault(_as_date(_field(row, "giorno")), []).append((agent, row))
+    return by_day
+
+
+def _week_context(
+    by_day: Dict[date, List[Tuple[str | None, Any]]],
+    week_days: List[date],
+    week_start_date: date,
+    gcal_notes: Dict[str, List[str]],
+    event_notes: Dict[str, List[str]],
+) -> Dict[str, Any]:
+    """Template context of the page for ``week_days`` (sorted keys of ``by_day``)."""
+    agents = sorted(
+        {agent for d in week_days for agent, _ in by_day[d] if isinstance(agent, str) and agent}
+    )
+
+    empty = {"dayoff": None, "segments": [], "extra": None}
+    days = []
+    for day in week_days:
+        label = _day_label(day)
+        cells: dict[str, dict] = {}
+        notes: list[str] = []
+        for agent, row in by_day[day]:
+            if isinstance(agent, str) and agent:
+                cells[agent] = _cell(row)
+            note = _field(row, "note")
+            if _present(note):
+                note_text = _strip_emails(str(note))
+                if note_text:
+                    notes.append(note_text)
+        days.append(
+            {
+                "weekday": WEEKDAYS[day.weekday()],
+                "date": label,
+                "cells": [cells.get(a, empty) for a in agents],
+                "notes": notes + gcal_notes.get(label, []) + event_notes.get(label, []),
+            }
+        )
+
+    return {
+        "start_date": _day_label(week_start_date),
+        "end_date": _day_label(week_start_date + timedelta(days=6)),
+        "agents": agents,
+        "days": days,
+    }
+
+
+def df_to_html(
+    rows: List[Any],
+    db: Session | None = None,
+    extra_notes: Notes | None = None,
+) -> str:
+    """Build the weekly shift table HTML from turni rows.
+
+    The week is the ISO week of the earliest ``giorno``. When a database
+    session is provided, agents are shown by name. ``extra_notes`` is the
+    result of :func:`week_notes` when the caller already loaded it.
+    """
+    by_day = _group_by_day(rows, _agent_names(rows, db))
+    first_day = min(by_day)
+    week_start_date = first_day - timedelta(days=first_day.weekday())
+
+    if extra_notes is None:
+        extra_notes = week_notes(db, week_start_date, week_start_date + timedelta(days=6))
+    gcal_notes, event_notes = extra_notes
+
+    # every day of ``rows`` is listed, as imports may spill past the week
+    week = _week_context(by_day, sorted(by_day), week_start_date, gcal_notes, event_notes)
+    return render_report(WEEK_SCHEDULE, logo_url=logo_url(), weeks=[week])
+
+
+def weeks_to_html(
+    rows: List[Any],
+    db: Session | None,
+    start: date,
+    end: date,
+    extra_notes: Notes | None = None,
+) -> str:
+    """Build one HTML document with a page per ISO week from ``start`` to ``end``.
+
+    ``rows`` may span the whole range; the notes are loaded once for all of
+    it (unless ``extra_notes`` is given), so a month or a quarter is laid out
+    in a single WeasyPrint pass.
+    """
+    first_monday = start - timedelta(days=start.weekday())
+    last_monday = end - timedelta(days=end.weekday())
+
+    by_day = _group_by_day(rows, _agent_names(rows, db))
+    if extra_notes is None:
+        extra_notes = week_notes(db, first_monday, last_monday + timedelta(days=6))
+    gcal_notes, event_notes = extra_notes
+
+    weeks = []
+    monday = first_monday
+    while monday <= last_monday:
+        week_days = [
+            d for d in (monday + timedelta(days=i) for i in range(7)) if d in by_day
+        ]
+        weeks.append(_week_context(by_day, week_days, monday, gcal_notes, event_notes))
+        monday += timedelta(days=7)
+
+    return render_report(WEEK_SCHEDULE, logo_url=logo_url(), weeks=weeks)
+
+
+def df_to_pdf(
+    rows: List[Any],
+    db: Session | None = None,
+    extra_notes: Notes | None = None,
+) -> bytes:
+    """Render the weekly shift table of :func:`df_to_html` to PDF bytes."""
+    return render_pdf(df_to_html(rows, db, extra_notes))
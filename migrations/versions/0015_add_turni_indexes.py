@@ -0,0 +1,45 @@
+"""add user/day and day indexes to turni"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0015_add_turni_indexes"
+down_revision = "0014_add_stato_to_todos"
+branch_labels = None
+depends_on = None
+
+
+def _duplicates(conn) -> list[tuple[str, str, int]]:
+    return conn.execute(
+        sa.text(
+            "SELECT user_id, giorno, COUNT(*) FROM turni "
+            "GROUP BY user_id, giorno HAVING COUNT(*) > 1 "
+            "ORDER BY user_id, giorno"
+        )
+    ).fetchall()
+
+
+def upgrade() -> None:
+    # the unique index needs one turno per user and day; which duplicate is
+    # the right one cannot be told from the table (and each may have its own
+    # calendar event), so they are left to be resolved by hand
+    duplicates = _duplicates(op.get_bind())
+    if duplicates:
+        pairs = "\n".join(
+            f"  user_id={user_id} giorno={giorno} ({count} rows)"
+            for user_id, giorno, count in duplicates
+        )
+        raise RuntimeError(
+            "Cannot create ux_turni_user_id_giorno: turni has more than one row "
+            "for these (user_id, giorno) pairs. Delete the extra shifts (and "
+            "their calendar events) and run the migration again.\n" + pairs
+        )
+    op.create_index(
+        "ux_turni_user_id_giorno", "turni", ["user_id", "giorno"], unique=True
+    )
+    op.create_index("ix_turni_giorno", "turni", ["giorno"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_turni_giorno", table_name="turni")
+    op.drop_index("ux_turni_user_id_giorno", table_name="turni")
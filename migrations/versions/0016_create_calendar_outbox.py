@@ -0,0 +1,32 @@
+"""create calendar_outbox table"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0016_create_calendar_outbox"
+down_revision = "0015_add_turni_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "calendar_outbox",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("turno_id", sa.String(), nullable=False, unique=True),
+        sa.Column("action", sa.String(length=10), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("enqueued_at", sa.DateTime(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_calendar_outbox_id", "calendar_outbox", ["id"])
+    op.create_index(
+        "ix_calendar_outbox_next_attempt_at", "calendar_outbox", ["next_attempt_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_calendar_outbox_next_attempt_at", table_name="calendar_outbox")
+    op.drop_index("ix_calendar_outbox_id", table_name="calendar_outbox")
+    op.drop_table("calendar_outbox")
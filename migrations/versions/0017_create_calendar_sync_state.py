@@ -0,0 +1,22 @@
+"""create calendar_sync_state table"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0017_create_calendar_sync_state"
+down_revision = "0016_create_calendar_outbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "calendar_sync_state",
+        sa.Column("calendar_id", sa.String(), primary_key=True),
+        sa.Column("sync_token", sa.String(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("calendar_sync_state")
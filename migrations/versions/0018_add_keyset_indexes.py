@@ -0,0 +1,38 @@
+"""add sort key indexes for keyset pagination of the lists"""
+
+from alembic import op
+
+revision = "0018_add_keyset_indexes"
+down_revision = "0017_create_calendar_sync_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_events_data_ora_id", "events", ["data_ora", "id"])
+    op.create_index(
+        "ix_determinazioni_scadenza_id", "determinazioni", ["scadenza", "id"]
+    )
+    op.create_index("ix_pdf_files_uploaded_at_id", "pdf_files", ["uploaded_at", "id"])
+    op.create_index(
+        "ix_segnaletica_orizzontale_anno_id",
+        "segnaletica_orizzontale",
+        ["anno", "id"],
+    )
+    op.create_index(
+        "ix_segnaletica_verticale_descrizione_id",
+        "segnaletica_verticale",
+        ["descrizione", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_segnaletica_verticale_descrizione_id", table_name="segnaletica_verticale"
+    )
+    op.drop_index(
+        "ix_segnaletica_orizzontale_anno_id", table_name="segnaletica_orizzontale"
+    )
+    op.drop_index("ix_pdf_files_uploaded_at_id", table_name="pdf_files")
+    op.drop_index("ix_determinazioni_scadenza_id", table_name="determinazioni")
+    op.drop_index("ix_events_data_ora_id", table_name="events")
@@ -1,12 +1,18 @@
 import os
 import shutil
 import importlib
+import uuid
+from datetime import date, time, timedelta
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 # Ensure DATABASE_URL is set for tests
 os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+# Render PDFs in-process so tests can patch WeasyPrint
+os.environ.setdefault("PDF_RENDER_WORKERS", "0")
+# Cheap password hashes: the tests create many users
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
 
 from app.database import Base, engine
 from app import config
@@ -21,6 +27,49 @@ def setup_db():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def seed_shifts(setup_db):
+    """Return a function bulk-inserting agents with a shift on every day.
+
+    ``seed_shifts(users, days)`` adds ``users`` agents (``U00``, ``U01``...)
+    each with a 08:00-14:00 shift on ``days`` consecutive days from
+    ``start`` and returns their ids.
+    """
+    from app.models.turno import Turno
+    from app.models.user import User
+    from sqlalchemy import insert
+
+    def seed(users, days, start=date(2021, 1, 1), note=None):
+        agents = [
+            {
+                "id": str(uuid.uuid4()),
+                "email": f"u{i}@example.com",
+                "nome": f"U{i:02}",
+                "hashed_password": "x",
+            }
+            for i in range(users)
+        ]
+        turni = [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": agent["id"],
+                "giorno": start + timedelta(days=d),
+                "inizio_1": time(8),
+                "fine_1": time(14),
+                "tipo": "NORMALE",
+                "note": note,
+            }
+            for agent in agents
+            for d in range(days)
+        ]
+        with engine.begin() as conn:
+            conn.execute(insert(User), agents)
+            conn.execute(insert(Turno), turni)
+        return [agent["id"] for agent in agents]
+
+    return seed
+
+
 @pytest.fixture(autouse=True)
 def setup_upload_dir(tmp_path):
     upload_dir = tmp_path / "pdfs"
@@ -42,12 +91,43 @@ def setup_upload_dir(tmp_path):
     config.settings.PDF_UPLOAD_ROOT = original
 
 
+@pytest.fixture(autouse=True)
+def setup_pdf_cache(tmp_path):
+    """Keep the weekly PDF cache in a per-test directory."""
+    from app.services import pdf_cache
+
+    original = pdf_cache.week_pdf_cache.root
+    pdf_cache.week_pdf_cache.root = str(tmp_path / "pdf_cache")
+    pdf_cache.week_pdf_cache.clear()
+    yield
+    pdf_cache.week_pdf_cache.clear()
+    pdf_cache.week_pdf_cache.root = original
+
+
+@pytest.fixture(autouse=True)
+def clear_auth_cache():
+    """Drop cached tokens and users of the previous test's database."""
+    from app.services import auth_cache
+
+    auth_cache.clear()
+    yield
+    auth_cache.clear()
+
+
 @pytest.fixture(autouse=True)
 def patch_google_clients():
     """Mock Google API clients so tests run without network access."""
+    from app.services import google_clients
+
+    google_clients.clear()
     with patch(
         "google.oauth2.service_account.Credentials.from_service_account_file",
         return_value=MagicMock(),
     ):
         with patch("googleapiclient.discovery.build", return_value=MagicMock()):
-            yield
+            with patch(
+                "googleapiclient.discovery.build_from_document",
+                return_value=MagicMock(),
+            ):
+                yield
+    google_clients.clear()
@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app import database
+from app.crud import event as crud_event
+from app.crud import todo as crud_todo
+from app.dependencies import get_current_user_async
+from app.main import app
+
+client = TestClient(app)
+
+
+def auth_user(email: str, nome: str = "Async"):
+    client.post("/users/", json={"email": email, "password": "secret", "nome": nome})
+    token = client.post("/login", json={"email": email, "password": "secret"}).json()[
+        "access_token"
+    ]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_async_engine_uses_aiosqlite():
+    assert database.async_engine.url.drivername == "sqlite+aiosqlite"
+    assert database.async_engine.url.database == database.engine.url.database
+
+
+def test_read_routes_only_use_async_pool(setup_db):
+    headers = auth_user("async@example.com")
+    when = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    client.post(
+        "/events/",
+        json={"titolo": "E", "descrizione": "", "data_ora": when, "is_public": True},
+        headers=headers,
+    )
+    client.post("/todo/", json={"descrizione": "T", "scadenza": when}, headers=headers)
+
+    database.pool_metrics.reset()
+    database.async_pool_metrics.reset()
+
+    for path in ("/events/", "/todo/", "/segnalazioni/", "/orari/", "/dashboard/upcoming"):
+        res = client.get(path, headers=headers)
+        assert res.status_code == 200, path
+
+    assert client.get("/events/", headers=headers).json()[0]["titolo"] == "E"
+    assert client.get("/todo/", headers=headers).json()[0]["descrizione"] == "T"
+    assert database.pool_metrics.stats()["checkouts"] == 0
+    assert database.async_pool_metrics.stats()["checkouts"] >= 5
+
+
+def test_async_crud_matches_sync(setup_db):
+    headers = auth_user("crud@example.com")
+    now = datetime.utcnow()
+    for days in (1, 3, 10):
+        client.post(
+            "/todo/",
+            json={
+                "descrizione": f"T{days}",
+                "scadenza": (now + timedelta(days=days)).isoformat(),
+            },
+            headers=headers,
+        )
+
+    async def load():
+        async with database.AsyncSessionLocal() as db:
+            user = await get_current_user_async(
+                db=db, authorization=headers["Authorization"]
+            )
+            todos = await crud_todo.get_todos_between_async(
+                db, user, now, now + timedelta(days=7)
+            )
+            events = await crud_event.get_events_async(db, None)
+            return [t.descrizione for t in todos], events
+
+    todos, events = asyncio.run(load())
+    assert todos == ["T1", "T3"]
+    assert events == []
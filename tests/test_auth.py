@@ -40,14 +40,12 @@ def test_google_login_valid(monkeypatch, setup_db):
 
     config.reload_settings()
 
-    def fake_verify(token, req, client_id):
+    def fake_verify(token, client_id):
         assert token == "tok"
         assert client_id == "gid"
         return {"email": "google@example.com"}
 
-    monkeypatch.setattr(
-        "google.oauth2.id_token.verify_oauth2_token", fake_verify
-    )
+    monkeypatch.setattr("app.services.google_id_token.verify", fake_verify)
 
     res = client.post("/google-login", json={"token": "tok"})
     assert res.status_code == 200
@@ -62,12 +60,40 @@ def test_google_login_invalid(monkeypatch):
 
     config.reload_settings()
 
-    def fake_verify(token, req, client_id):
+    def fake_verify(token, client_id):
         raise ValueError("bad")
 
-    monkeypatch.setattr(
-        "google.oauth2.id_token.verify_oauth2_token", fake_verify
-    )
+    monkeypatch.setattr("app.services.google_id_token.verify", fake_verify)
 
     res = client.post("/google-login", json={"token": "bad"})
     assert res.status_code == 400
+
+
+def test_login_rehashes_password_with_new_cost(setup_db, monkeypatch):
+    client.post(
+        "/users/",
+        json={"email": "rehash@example.com", "password": "secret", "nome": "R"},
+    )
+    from passlib.context import CryptContext
+    from app.dependencies import SessionLocal
+    from app.models.user import User
+    from app.services import passwords
+
+    monkeypatch.setattr(
+        passwords,
+        "pwd_context",
+        CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5),
+    )
+
+    res = client.post(
+        "/login", json={"email": "rehash@example.com", "password": "secret"}
+    )
+    assert res.status_code == 200
+
+    db = SessionLocal()
+    try:
+        stored = db.query(User).filter(User.email == "rehash@example.com").one()
+        assert stored.hashed_password.startswith("$2b$05$")
+        assert passwords.verify_password("secret", stored.hashed_password)
+    finally:
+        db.close()
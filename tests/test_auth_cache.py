@@ -0,0 +1,107 @@
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect
+
+from app.dependencies import SessionLocal
+from app.main import app
+from app.models.user import User
+from app.services import auth_cache
+from app.services.auth_cache import TokenCache, UserCache
+
+client = TestClient(app)
+
+
+def _login(email: str = "cache@example.com", nome: str = "Cache"):
+    client.post("/users/", json={"email": email, "password": "secret", "nome": nome})
+    token = client.post("/login", json={"email": email, "password": "secret"}).json()[
+        "access_token"
+    ]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_repeated_requests_hit_both_caches(setup_db):
+    headers = _login()
+
+    for _ in range(3):
+        res = client.get("/users/me", headers=headers)
+        assert res.status_code == 200
+        assert res.json()["email"] == "cache@example.com"
+
+    # the stats request authenticates through the caches too
+    stats = client.get("/health/auth-cache", headers=headers).json()
+    assert stats["tokens"]["misses"] == 1
+    assert stats["tokens"]["hits"] == 3
+    assert stats["users"]["misses"] == 1
+    assert stats["users"]["hits"] == 3
+    assert stats["users"]["hit_rate"] == 3 / 4
+
+
+def test_invalid_token_is_not_cached(setup_db):
+    res = client.get("/users/me", headers={"Authorization": "Bearer nope"})
+    assert res.status_code == 401
+    assert auth_cache.token_cache.stats()["size"] == 0
+
+
+def test_user_update_invalidates_cached_user(setup_db):
+    headers = _login()
+    assert client.get("/users/me", headers=headers).json()["nome"] == "Cache"
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == "cache@example.com").one()
+        user.nome = "Renamed"
+        db.commit()
+    finally:
+        db.close()
+
+    assert client.get("/users/me", headers=headers).json()["nome"] == "Renamed"
+
+
+def test_deleted_user_is_rejected(setup_db):
+    headers = _login()
+    assert client.get("/users/me", headers=headers).status_code == 200
+
+    db = SessionLocal()
+    try:
+        db.delete(db.query(User).filter(User.email == "cache@example.com").one())
+        db.commit()
+    finally:
+        db.close()
+
+    res = client.get("/users/me", headers=headers)
+    assert res.status_code == 401
+    assert res.json()["detail"] == "User not found"
+
+
+def test_user_cache_returns_detached_copies():
+    cache = UserCache(ttl=60, maxsize=4)
+    cache.put(User(id="00000000-0000-0000-0000-000000000001", email="a@x.it", nome="A"))
+
+    first, second = cache.get("a@x.it"), cache.get("a@x.it")
+    assert first is not second
+    assert first.nome == second.nome == "A"
+    state = inspect(first)
+    assert state.detached and state.session is None
+
+
+def test_user_cache_expires_entries():
+    cache = UserCache(ttl=0.01, maxsize=4)
+    cache.put(User(id="00000000-0000-0000-0000-000000000001", email="a@x.it", nome="A"))
+    time.sleep(0.02)
+    assert cache.get("a@x.it") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_token_cache_drops_expired_and_oldest_tokens():
+    cache = TokenCache(maxsize=2)
+    cache.put(("old",), "old@x.it", time.time() - 1)
+    assert cache.get(("old",)) is None
+
+    cache.put(("a",), "a@x.it", time.time() + 60)
+    cache.put(("b",), "b@x.it", time.time() + 60)
+    assert cache.get(("a",)) == "a@x.it"
+    cache.put(("c",), "c@x.it", time.time() + 60)
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == "a@x.it"
+    assert cache.stats()["size"] == 2
@@ -0,0 +1,214 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.dependencies import SessionLocal
+from app.models.calendar_outbox import CalendarOutbox
+from app.schemas.turno import TipoTurno
+from app.services import calendar_outbox
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def shift_calendar(monkeypatch):
+    monkeypatch.setattr(settings, "G_SHIFT_CAL_ID", "CAL")
+
+
+def auth_user(email: str, nome: str = "Test"):
+    resp = client.post(
+        "/users/", json={"email": email, "password": "secret", "nome": nome}
+    )
+    user_id = resp.json()["id"]
+    token = client.post(
+        "/login",
+        json={"email": email, "password": "secret"},
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}, user_id
+
+
+def shift(user_id: str, **overrides):
+    data = {
+        "user_id": user_id,
+        "giorno": "2024-05-06",
+        "inizio_1": "08:00:00",
+        "fine_1": "12:00:00",
+        "tipo": TipoTurno.NORMALE.value,
+        "note": "",
+    }
+    data.update(overrides)
+    return data
+
+
+def drain():
+    db = SessionLocal()
+    try:
+        return calendar_outbox.drain_once(db)
+    finally:
+        db.close()
+
+
+def test_save_returns_without_calling_google(setup_db):
+    headers, user_id = auth_user("outbox@example.com")
+
+    with patch("app.services.gcal.sync_shift_events") as fake_sync:
+        res = client.post("/orari/", json=shift(user_id), headers=headers)
+        fake_sync.assert_not_called()
+
+    assert res.status_code == 200
+    db = SessionLocal()
+    rows = db.query(CalendarOutbox).all()
+    assert [(r.turno_id, r.action) for r in rows] == [(res.json()["id"], "sync")]
+    db.close()
+
+
+def test_repeated_updates_collapse_into_one_call(setup_db):
+    headers, user_id = auth_user("collapse@example.com")
+    client.post("/orari/", json=shift(user_id), headers=headers)
+    client.post("/orari/", json=shift(user_id, fine_1="13:00:00"), headers=headers)
+    client.post("/orari/", json=shift(user_id, fine_1="14:00:00"), headers=headers)
+
+    synced = []
+    with patch(
+        "app.services.gcal.sync_shift_events",
+        side_effect=lambda turni: synced.extend(t.fine_1.hour for t in turni) or {},
+    ):
+        assert drain() == 1
+
+    assert synced == [14]
+    assert drain() == 0
+
+
+def test_batch_loads_agents_with_the_shifts(setup_db):
+    from sqlalchemy import event
+
+    from app.database import engine
+
+    for i in range(3):
+        headers, user_id = auth_user(f"agent{i}@example.com", nome=f"Agent {i}")
+        client.post("/orari/", json=shift(user_id), headers=headers)
+
+    queries = []
+
+    def sync(turni):
+        def record(*args):
+            queries.append(args[2])
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            names = sorted(t.user.nome for t in turni)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        assert names == ["Agent 0", "Agent 1", "Agent 2"]
+        return {}
+
+    with patch("app.services.gcal.sync_shift_events", side_effect=sync):
+        assert drain() == 3
+
+    assert queries == []
+
+
+def test_delete_supersedes_pending_sync(setup_db):
+    headers, user_id = auth_user("supersede@example.com")
+    turno_id = client.post("/orari/", json=shift(user_id), headers=headers).json()[
+        "id"
+    ]
+    client.delete(f"/orari/{turno_id}", headers=headers)
+
+    with patch("app.services.gcal.sync_shift_events") as fake_sync:
+        with patch("app.services.gcal.delete_shift_events", return_value={}) as fake_delete:
+            drain()
+
+    fake_sync.assert_not_called()
+    fake_delete.assert_called_once_with([turno_id])
+
+
+def test_failures_are_retried_with_backoff(setup_db):
+    headers, user_id = auth_user("retry@example.com")
+    client.post("/orari/", json=shift(user_id), headers=headers)
+
+    with patch("app.services.gcal.sync_shift_events", side_effect=RuntimeError("down")):
+        assert drain() == 1
+        # not due yet: the backoff hides the entry from the next drain
+        assert drain() == 0
+
+    db = SessionLocal()
+    row = db.query(CalendarOutbox).one()
+    assert row.attempts == 1
+    assert row.last_error == "down"
+    assert row.next_attempt_at > datetime.utcnow() + timedelta(seconds=20)
+    row.next_attempt_at = datetime.utcnow()
+    db.commit()
+    db.close()
+
+    with patch("app.services.gcal.sync_shift_events", return_value={}) as fake_sync:
+        assert drain() == 1
+    fake_sync.assert_called_once()
+
+    db = SessionLocal()
+    assert db.query(CalendarOutbox).count() == 0
+    db.close()
+
+
+def test_per_item_failures_are_retried_alone(setup_db):
+    headers, user_id = auth_user("partial@example.com")
+    ok = client.post("/orari/", json=shift(user_id), headers=headers).json()["id"]
+    ko = client.post(
+        "/orari/", json=shift(user_id, giorno="2024-05-07"), headers=headers
+    ).json()["id"]
+
+    report = {
+        ok: {"status": "updated", "error": None},
+        ko: {"status": "failed", "error": "quota"},
+    }
+    with patch("app.services.gcal.sync_shift_events", return_value=report):
+        assert drain() == 2
+
+    db = SessionLocal()
+    row = db.query(CalendarOutbox).one()
+    assert (row.turno_id, row.attempts, row.last_error) == (ko, 1, "quota")
+    db.close()
+
+
+def test_entries_are_parked_after_max_attempts(setup_db):
+    headers, user_id = auth_user("parked@example.com")
+    client.post("/orari/", json=shift(user_id), headers=headers)
+
+    db = SessionLocal()
+    row = db.query(CalendarOutbox).one()
+    row.attempts = calendar_outbox.MAX_ATTEMPTS - 1
+    db.commit()
+    db.close()
+
+    with patch("app.services.gcal.sync_shift_events", side_effect=RuntimeError("down")):
+        drain()
+
+    db = SessionLocal()
+    row = db.query(CalendarOutbox).one()
+    assert row.attempts == calendar_outbox.MAX_ATTEMPTS
+    assert row.next_attempt_at is None
+    db.close()
+
+
+def test_backoff_is_capped():
+    assert calendar_outbox.backoff(1) == calendar_outbox.BACKOFF_BASE
+    assert calendar_outbox.backoff(2) == calendar_outbox.BACKOFF_BASE * 2
+    assert calendar_outbox.backoff(30) == calendar_outbox.BACKOFF_MAX
+
+
+def test_nothing_is_queued_without_a_shift_calendar(setup_db, monkeypatch):
+    monkeypatch.setattr(settings, "G_SHIFT_CAL_ID", None)
+    headers, user_id = auth_user("nocal@example.com")
+
+    res = client.post("/orari/", json=shift(user_id), headers=headers)
+    assert res.status_code == 200
+    res = client.delete(f"/orari/{res.json()['id']}", headers=headers)
+    assert res.status_code == 200
+
+    db = SessionLocal()
+    assert db.query(CalendarOutbox).count() == 0
+    db.close()
@@ -0,0 +1,305 @@
+from datetime import date, time
+import types
+
+import pytest
+
+from app.main import app  # noqa: F401 - registers every model
+from app.dependencies import SessionLocal
+from app.models.calendar_sync_state import CalendarSyncState
+from app.models.turno import Turno
+from app.models.user import User
+from app.services import calendar_reconcile, gcal
+
+
+class FakeHttpError(Exception):
+    def __init__(self, status):
+        self.resp = types.SimpleNamespace(status=status)
+
+
+class FakeCalendar:
+    """Fake Calendar client serving ``events().list`` pages and batches."""
+
+    def __init__(self, pages, failing=()):
+        self.pages = pages
+        self.failing = set(failing)
+        self.list_calls = []
+        self.ops = []
+
+    def events(self):
+        def listing(**kwargs):
+            self.list_calls.append(kwargs)
+
+            class Runner:
+                def execute(runner):
+                    page = self.pages.pop(0)
+                    if isinstance(page, Exception):
+                        raise page
+                    return page
+
+            return Runner()
+
+        def call(method):
+            def build(**kwargs):
+                return (method, kwargs.get("eventId") or kwargs["body"]["id"])
+
+            return build
+
+        return types.SimpleNamespace(
+            list=listing,
+            update=call("update"),
+            insert=call("insert"),
+            delete=call("delete"),
+        )
+
+    def new_batch_http_request(self, callback):
+        fake = self
+
+        class Batch:
+            def __init__(self):
+                self.requests = []
+
+            def add(self, request, request_id):
+                self.requests.append((request_id, request))
+
+            def execute(self):
+                for request_id, request in self.requests:
+                    fake.ops.append(request)
+                    if request[1] in fake.failing:
+                        callback(request_id, None, FakeHttpError(500))
+                    else:
+                        callback(request_id, {}, None)
+
+        return Batch()
+
+
+@pytest.fixture
+def turni(monkeypatch):
+    monkeypatch.setattr(gcal.settings, "G_SHIFT_CAL_ID", "CAL")
+    monkeypatch.setattr(gcal.gerr, "HttpError", FakeHttpError, raising=False)
+    db = SessionLocal()
+    db.add(User(id="u1", email="agent@example.com", nome="Agent", hashed_password="x"))
+    for day in (1, 2, 3):
+        db.add(
+            Turno(
+                id=f"t{day}",
+                user_id="u1",
+                giorno=date(2024, 5, day),
+                inizio_1=time(8, 0),
+                fine_1=time(14, 0),
+                tipo="NORMALE",
+            )
+        )
+    db.commit()
+    rows = {t.id: gcal.shift_event_body(t) for t in db.query(Turno).all()}
+    db.close()
+    return rows
+
+
+def _remote(body, **changes):
+    event = {k: body[k] for k in ("id", "summary", "description", "colorId")}
+    event["start"] = dict(body["start"])
+    event["end"] = dict(body["end"])
+    event.update(changes)
+    return event
+
+
+def test_full_reconcile_sends_only_differences(turni, monkeypatch):
+    orphan = _remote(turni["t1"], id="shift-orphan")
+    fake = FakeCalendar(
+        [
+            {"items": [_remote(turni["t1"])], "nextPageToken": "p2"},
+            {
+                "items": [
+                    _remote(turni["t2"], summary="Someone else"),
+                    orphan,
+                    {"id": "holiday", "summary": "not a shift"},
+                ],
+                "nextSyncToken": "sync-1",
+            },
+        ]
+    )
+    monkeypatch.setattr(gcal, "get_client", lambda: fake)
+
+    summary = calendar_reconcile.reconcile_shift_calendar(
+        date(2024, 5, 1), date(2024, 5, 31)
+    )
+
+    assert summary == {
+        "mode": "full",
+        "listed": 3,
+        "inserted": 1,
+        "updated": 1,
+        "deleted": 1,
+        "failed": 0,
+    }
+    assert sorted(fake.ops) == [
+        ("delete", "shift-orphan"),
+        ("insert", turni["t3"]["id"]),
+        ("update", turni["t2"]["id"]),
+    ]
+    first, second = fake.list_calls
+    assert first["fields"] == gcal.SHIFT_EVENT_FIELDS
+    assert "timeMin" in first and "syncToken" not in first
+    assert second["pageToken"] == "p2"
+
+    db = SessionLocal()
+    assert db.get(CalendarSyncState, "CAL").sync_token == "sync-1"
+    db.close()
+
+
+def test_incremental_reconcile_uses_stored_token(turni, monkeypatch):
+    db = SessionLocal()
+    db.add(CalendarSyncState(calendar_id="CAL", sync_token="sync-1"))
+    db.commit()
+    db.close()
+
+    fake = FakeCalendar(
+        [
+            {
+                "items": [_remote(turni["t1"], status="cancelled")],
+                "nextSyncToken": "sync-2",
+            }
+        ]
+    )
+    monkeypatch.setattr(gcal, "get_client", lambda: fake)
+
+    summary = calendar_reconcile.reconcile_shift_calendar(
+        date(2024, 5, 1), date(2024, 5, 31)
+    )
+
+    assert summary["mode"] == "incremental"
+    # t2 and t3 were not touched on Google: nothing is sent for them
+    assert fake.ops == [("update", turni["t1"]["id"])]
+    assert fake.list_calls[0]["syncToken"] == "sync-1"
+    assert "timeMin" not in fake.list_calls[0]
+
+    db = SessionLocal()
+    assert db.get(CalendarSyncState, "CAL").sync_token == "sync-2"
+    db.close()
+
+
+def test_failed_repairs_do_not_advance_the_token(turni, monkeypatch):
+    db = SessionLocal()
+    db.add(CalendarSyncState(calendar_id="CAL", sync_token="sync-1"))
+    db.commit()
+    db.close()
+
+    fake = FakeCalendar(
+        [
+            {
+                "items": [
+                    _remote(turni["t1"], status="cancelled"),
+                    _remote(turni["t2"], summary="Someone else"),
+                ],
+                "nextSyncToken": "sync-2",
+            }
+        ],
+        failing={turni["t1"]["id"]},
+    )
+    monkeypatch.setattr(gcal, "get_client", lambda: fake)
+
+    summary = calendar_reconcile.reconcile_shift_calendar(
+        date(2024, 5, 1), date(2024, 5, 31)
+    )
+
+    assert (summary["updated"], summary["failed"]) == (1, 1)
+    db = SessionLocal()
+    assert db.get(CalendarSyncState, "CAL").sync_token is None
+    db.close()
+
+    # without a token the next run lists the whole range again
+    fake.pages = [{"items": [], "nextSyncToken": "sync-3"}]
+    fake.failing.clear()
+    summary = calendar_reconcile.reconcile_shift_calendar(
+        date(2024, 5, 1), date(2024, 5, 31)
+    )
+    assert summary["mode"] == "full"
+    assert "syncToken" not in fake.list_calls[-1]
+
+
+def test_out_of_window_changes_are_repaired(turni, monkeypatch):
+    db = SessionLocal()
+    for turno_id, day in (("t8", date(2024, 4, 15)), ("t9", date(2024, 7, 1))):
+        db.add(
+            Turno(
+                id=turno_id,
+                user_id="u1",
+                giorno=day,
+                inizio_1=time(8, 0),
+                fine_1=time(14, 0),
+                tipo="NORMALE",
+            )
+        )
+    db.add(CalendarSyncState(calendar_id="CAL", sync_token="sync-1"))
+    db.commit()
+    outside = {
+        t.id: gcal.shift_event_body(t)
+        for t in db.query(Turno).filter(Turno.id.in_(["t8", "t9"]))
+    }
+    db.close()
+
+    fake = FakeCalendar([{"items": [], "nextSyncToken": "sync-2"}])
+    monkeypatch.setattr(gcal, "get_client", lambda: fake)
+    calendar_reconcile.reconcile_shift_calendar(
+        date(2024, 5, 1), date(2024, 5, 31)
+    )
+    assert fake.ops == []
+
+    # between the runs, events of shifts outside May change on Google
+    fake.pages = [
+        {
+            "items": [
+                _remote(outside["t9"], summary="Someone else"),
+                # cancelled events come back with their id and status only
+                {"id": outside["t8"]["id"], "status": "cancelled"},
+                _remote(outside["t9"], id="shift-ghost"),
+            ],
+            "nextSyncToken": "sync-3",
+        }
+    ]
+    summary = calendar_reconcile.reconcile_shift_calendar(
+        date(2024, 5, 1), date(2024, 5, 31)
+    )
+
+    assert summary["mode"] == "incremental"
+    assert sorted(fake.ops) == [
+        ("delete", "shift-ghost"),
+        ("update", outside["t8"]["id"]),
+        ("update", outside["t9"]["id"]),
+    ]
+    db = SessionLocal()
+    assert db.get(CalendarSyncState, "CAL").sync_token == "sync-3"
+    db.close()
+
+
+def test_expired_token_falls_back_to_full_listing(turni, monkeypatch):
+    db = SessionLocal()
+    db.add(CalendarSyncState(calendar_id="CAL", sync_token="stale"))
+    db.commit()
+    db.close()
+
+    remote = [_remote(turni[t]) for t in ("t1", "t2", "t3")]
+    fake = FakeCalendar([FakeHttpError(410), {"items": remote, "nextSyncToken": "new"}])
+    monkeypatch.setattr(gcal, "get_client", lambda: fake)
+
+    summary = calendar_reconcile.reconcile_shift_calendar(
+        date(2024, 5, 1), date(2024, 5, 31)
+    )
+
+    assert summary["mode"] == "full"
+    assert fake.ops == []
+
+
+def test_event_hash_ignores_time_zone_representation():
+    event = {
+        "summary": "Agent",
+        "start": {"dateTime": "2024-05-01T08:00:00+02:00"},
+        "end": {"dateTime": "2024-05-01T14:00:00+02:00"},
+    }
+    utc = dict(
+        event,
+        start={"dateTime": "2024-05-01T06:00:00Z"},
+        end={"dateTime": "2024-05-01T12:00:00Z"},
+    )
+    assert gcal.event_hash(event) == gcal.event_hash(utc)
+    assert gcal.event_hash(event) != gcal.event_hash(dict(event, summary="Other"))
@@ -88,3 +88,60 @@ def test_dashboard_upcoming(monkeypatch, setup_db):
     assert [item["kind"] for item in data] == ["event", "google", "todo", "google"]
     times = [item["data_ora"] for item in data]
     assert times == sorted(times)
+
+
+def test_dashboard_fetches_google_concurrently(monkeypatch, setup_db):
+    """The Google fetch must overlap with the database queries."""
+    import asyncio
+    import threading
+    from app.crud import event as crud_event
+
+    headers, _ = auth_user("concurrent@example.com", nome="Mario")
+    now = datetime.utcnow()
+    barrier = threading.Barrier(2, timeout=5)
+    original = crud_event.get_events_between_async
+
+    async def db_side(*args, **kwargs):
+        # the queries run on the event loop: wait without blocking it
+        await asyncio.to_thread(barrier.wait)
+        return await original(*args, **kwargs)
+
+    def google_side(days):
+        barrier.wait()
+        return [
+            {
+                "id": "g1",
+                "titolo": "Meeting",
+                "descrizione": "",
+                "data_ora": now + timedelta(hours=1),
+            },
+            {
+                "id": "g2",
+                "titolo": "Too late",
+                "descrizione": "",
+                "data_ora": now + timedelta(days=days + 1),
+            },
+        ]
+
+    monkeypatch.setattr(crud_event, "get_events_between_async", db_side)
+    monkeypatch.setattr(
+        "app.services.google_calendar.list_upcoming_events", google_side
+    )
+    client.post(
+        "/todo/",
+        json={"descrizione": "T1", "scadenza": (now + timedelta(days=2)).isoformat()},
+        headers=headers,
+    )
+    client.post(
+        "/todo/",
+        json={"descrizione": "Old", "scadenza": (now - timedelta(days=2)).isoformat()},
+        headers=headers,
+    )
+
+    res = client.get("/dashboard/upcoming?days=5", headers=headers)
+
+    assert res.status_code == 200
+    assert [item.get("id") for item in res.json() if item["kind"] == "google"] == [
+        "g1"
+    ]
+    assert [item["kind"] for item in res.json()] == ["google", "todo"]
@@ -1,14 +1,14 @@
-import os
-from pathlib import Path
 from unittest.mock import patch
 
 import pytest
 
+import numpy as np
 import pandas as pd
 
 from fastapi import HTTPException
-from app.services.excel_import import parse_excel, df_to_pdf
-from app.schemas.turno import TipoTurno
+from app.services.excel_import import parse_excel, df_to_html, df_to_pdf
+from app.schemas.turno import DAY_OFF_TYPES, TipoTurno
+from app.services.report_templates import logo_url
 
 
 def test_parse_excel(tmp_path):
@@ -136,6 +136,24 @@ def test_parse_excel_with_db(tmp_path):
     db.close()
 
 
+def test_resolve_user_ids_keeps_first_match_for_shared_names():
+    from app.main import app  # noqa: F401 - registers every model
+    from app.database import SessionLocal
+    from app.models.user import User
+    from app.services.excel_import import resolve_user_ids
+
+    db = SessionLocal()
+    db.add(User(id="u1", email="a@example.com", nome="Rossi", hashed_password="x"))
+    db.commit()
+    db.add(User(id="u2", email="b@example.com", nome="ROSSI", hashed_password="x"))
+    db.commit()
+
+    first = db.query(User).filter(User.nome.in_(["Rossi", "ROSSI"])).first()
+    assert resolve_user_ids(db, [" rossi "]) == {"rossi": first.id}
+
+    db.close()
+
+
 def test_parse_excel_missing_column(tmp_path):
     """An HTTPException is raised when required columns are missing."""
     from app.database import SessionLocal
@@ -413,7 +431,7 @@ def test_parse_excel_day_off_nan_times(tmp_path):
     ]
 
 
-def test_df_to_pdf_creates_files_and_cleanup(tmp_path):
+def test_df_to_pdf_renders_in_memory():
     rows = [
         {
             "user_id": "1",
@@ -424,16 +442,19 @@ def test_df_to_pdf_creates_files_and_cleanup(tmp_path):
             "note": "",
         }
     ]
+    captured = {}
 
     def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
+        captured["html"] = self.string
+        target.write(b"%PDF-1.4 fake")
 
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
-        pdf_path, html_path = df_to_pdf(rows, None)
+    with patch(
+        "weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf
+    ):
+        pdf = df_to_pdf(rows, None)
 
-    assert os.path.exists(pdf_path)
-    assert os.path.exists(html_path)
-    html_text = Path(html_path).read_text()
+    assert pdf == b"%PDF-1.4 fake"
+    html_text = captured["html"]
     assert "26/12/2022 – 01/01/2023" in html_text
     assert "DOMENICA<br>01/01/2023" in html_text
     assert "Logo.png" in html_text
@@ -441,14 +462,8 @@ def test_df_to_pdf_creates_files_and_cleanup(tmp_path):
         "COMUNE DI CASTIONE DELLA PRESOLANA – SERVIZIO DI POLIZIA LOCALE" in html_text
     )
 
-    os.remove(pdf_path)
-    os.remove(html_path)
-
-    assert not os.path.exists(pdf_path)
-    assert not os.path.exists(html_path)
-
 
-def test_df_to_pdf_write_pdf_error(tmp_path):
+def test_df_to_pdf_write_pdf_error():
     """Errors from WeasyPrint propagate to the caller."""
     rows = [
         {
@@ -464,12 +479,14 @@ def test_df_to_pdf_write_pdf_error(tmp_path):
     def fake_write_pdf(self, target, *args, **kwargs):
         raise OSError("boom")
 
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
+    with patch(
+        "weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf
+    ):
         with pytest.raises(OSError):
             df_to_pdf(rows, None)
 
 
-def test_df_to_pdf_missing_logo(monkeypatch):
+def test_df_to_html_missing_logo(monkeypatch):
     rows = [
         {
             "user_id": "1",
@@ -481,19 +498,17 @@ def test_df_to_pdf_missing_logo(monkeypatch):
         }
     ]
 
-    def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
-
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
-        with patch("os.path.exists", return_value=False):
-            with pytest.raises(HTTPException) as exc:
-                df_to_pdf(rows, None)
+    logo_url.cache_clear()
+    with patch("os.path.exists", return_value=False):
+        with pytest.raises(HTTPException) as exc:
+            df_to_html(rows, None)
+    logo_url.cache_clear()
 
     assert exc.value.status_code == 500
     assert exc.value.detail == "Logo file missing"
 
 
-def test_df_to_pdf_escapes_html(tmp_path):
+def test_df_to_html_escapes_html():
     rows = [
         {
             "Agente": "<Agent>",
@@ -505,23 +520,14 @@ def test_df_to_pdf_escapes_html(tmp_path):
         }
     ]
 
-    def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
-
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
-        pdf_path, html_path = df_to_pdf(rows, None)
-
-    html_text = Path(html_path).read_text()
+    html_text = df_to_html(rows, None)
     assert "&lt;Agent&gt;" in html_text
     assert "&lt;b&gt;hi&lt;/b&gt;" in html_text
     assert "<Agent>" not in html_text
     assert "<b>hi</b>" not in html_text
 
-    os.remove(pdf_path)
-    os.remove(html_path)
-
 
-def test_df_to_pdf_formats_times_without_seconds(tmp_path):
+def test_df_to_html_formats_times_without_seconds():
     rows = [
         {
             "Agente": "Agent",
@@ -533,26 +539,13 @@ def test_df_to_pdf_formats_times_without_seconds(tmp_path):
         }
     ]
 
-    def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
-
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
-        pdf_path, html_path = df_to_pdf(rows, None)
-
-    html_text = Path(html_path).read_text()
+    html_text = df_to_html(rows, None)
     assert "08:00 – 12:00" in html_text
     assert "08:00:00" not in html_text
     assert "12:00:00" not in html_text
 
-    os.remove(pdf_path)
-    os.remove(html_path)
-
-
-def fake_write_pdf(self, target, *args, **kwargs):
-    Path(target).write_bytes(b"%PDF-1.4 fake")
 
-
-def test_df_to_pdf_skips_nan_second_segment(tmp_path):
+def test_df_to_html_skips_nan_second_segment():
     rows = [
         {
             "Agente": "Agent",
@@ -566,17 +559,11 @@ def test_df_to_pdf_skips_nan_second_segment(tmp_path):
         }
     ]
 
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
-        pdf_path, html_path = df_to_pdf(rows, None)
-
-    html_text = Path(html_path).read_text()
+    html_text = df_to_html(rows, None)
     assert "nan – nan" not in html_text
 
-    os.remove(pdf_path)
-    os.remove(html_path)
-
 
-def test_df_to_pdf_skips_nan_third_segment(tmp_path):
+def test_df_to_html_skips_nan_third_segment():
     rows = [
         {
             "Agente": "Agent",
@@ -590,17 +577,11 @@ def test_df_to_pdf_skips_nan_third_segment(tmp_path):
         }
     ]
 
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
-        pdf_path, html_path = df_to_pdf(rows, None)
-
-    html_text = Path(html_path).read_text()
+    html_text = df_to_html(rows, None)
     assert "nan – nan" not in html_text
 
-    os.remove(pdf_path)
-    os.remove(html_path)
-
 
-def test_df_to_pdf_lists_notes(tmp_path):
+def test_df_to_html_lists_notes():
     rows = [
         {
             "Agente": "Agent",
@@ -620,12 +601,119 @@ def test_df_to_pdf_lists_notes(tmp_path):
         },
     ]
 
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
-        pdf_path, html_path = df_to_pdf(rows, None)
-
-    html_text = Path(html_path).read_text()
+    html_text = df_to_html(rows, None)
     assert "<li>prima</li>" in html_text
     assert "<li>seconda</li>" in html_text
 
-    os.remove(pdf_path)
-    os.remove(html_path)
+
+def _iterrows_parse(df):
+    """The row-by-row ``parse_excel`` replaced by the columnar one.
+
+    Only the ``User ID`` path without a database session, kept to benchmark
+    against it.
+    """
+
+    def clean(cell):
+        if pd.isna(cell):
+            return None
+        if isinstance(cell, str):
+            cell = cell.strip()
+            if cell == "" or cell.lower() == "nan":
+                return None
+        return cell
+
+    columns = ["Inizio1", "Fine1", "Inizio2", "Fine2", "Inizio3", "Fine3"]
+    for c in columns + ["Note"]:
+        if c in df.columns:
+            df[c] = df[c].replace({np.nan: None})
+
+    day_off = {t.value for t in DAY_OFF_TYPES}
+    rows = []
+    for idx, row in df.iterrows():
+        row_num = idx + 2
+        value = row.get("User ID")
+        if pd.isna(value) or str(value).strip() == "":
+            raise HTTPException(
+                status_code=400,
+                detail=f"Row {row_num}: Missing user identifier",
+            )
+        raw_tipo = clean(row.get("Tipo")) or "NORMALE"
+        row_type = TipoTurno(raw_tipo.strip().upper()).value
+        inizio1 = clean(row.get("Inizio1"))
+        fine1 = clean(row.get("Fine1"))
+        if (inizio1 is None or fine1 is None) and row_type not in day_off:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Row {row_num}: Missing 'Inizio1' or 'Fine1'",
+            )
+        payload = {
+            "user_id": str(value),
+            "giorno": (
+                row["Giorno"].date()
+                if hasattr(row["Giorno"], "date")
+                else row["Giorno"]
+            ),
+            "inizio_1": inizio1,
+            "fine_1": fine1,
+            "tipo": row_type,
+            "note": clean(row.get("Note", "")) or "",
+        }
+        if (
+            "Inizio2" in df.columns
+            and clean(row.get("Inizio2")) is not None
+            and clean(row.get("Fine2")) is not None
+        ):
+            payload["inizio_2"] = clean(row["Inizio2"])
+            payload["fine_2"] = clean(row["Fine2"])
+        if (
+            "Inizio3" in df.columns
+            and clean(row.get("Inizio3")) is not None
+            and clean(row.get("Fine3")) is not None
+        ):
+            payload["inizio_3"] = clean(row["Inizio3"])
+            payload["fine_3"] = clean(row["Fine3"])
+        rows.append(payload)
+    return rows
+
+
+@pytest.mark.benchmark(group="parse-excel-10k")
+@pytest.mark.parametrize("parser", ["iterrows", "columnar"])
+def test_parse_excel_benchmark_10k_rows(tmp_path, benchmark, parser):
+    """Parsing a 10k-row sheet, row by row as before and column-wise."""
+    n = 10_000
+    df = pd.DataFrame(
+        {
+            "User ID": [str(i % 40) for i in range(n)],
+            "Giorno": pd.date_range("2020-01-01", periods=n, freq="h"),
+            "Inizio1": [" 08:00 "] * n,
+            "Fine1": ["12:00"] * n,
+            "Inizio2": ["14:00" if i % 2 else None for i in range(n)],
+            "Fine2": ["18:00" if i % 2 else None for i in range(n)],
+            "Inizio3": [None] * n,
+            "Fine3": [None] * n,
+            "Tipo": ["normale" if i % 7 else "FERIE" for i in range(n)],
+            "Note": ["" if i % 3 else "nota" for i in range(n)],
+        }
+    )
+    xls = tmp_path / "big.xlsx"
+    df.to_excel(xls, index=False)
+    sheet = pd.read_excel(xls)
+
+    # read the workbook once so only the parsing step is measured
+    with patch(
+        "app.services.excel_import.pd.read_excel",
+        side_effect=lambda _: sheet.copy(),
+    ):
+        parsers = {
+            "iterrows": lambda: _iterrows_parse(sheet.copy()),
+            "columnar": lambda: parse_excel(str(xls), None),
+        }
+        rows = benchmark(parsers[parser])
+        expected = parse_excel(str(xls), None)
+
+    assert rows == expected == _iterrows_parse(sheet.copy())
+    assert len(rows) == n
+    assert rows[1]["inizio_1"] == "08:00"
+    assert rows[1]["inizio_2"] == "14:00"
+    assert "inizio_2" not in rows[0]
+    assert rows[0]["tipo"] == TipoTurno.FERIE.value
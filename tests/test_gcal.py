@@ -55,22 +55,24 @@ def test_get_client_from_json_string(monkeypatch):
 
     def fake_from_info(info, scopes=None):
         captured["info"] = info
+        captured["scopes"] = scopes
         return "CREDS"
 
     monkeypatch.setattr(
-        gcal.service_account.Credentials,
-        "from_service_account_info",
+        "google.oauth2.service_account.Credentials.from_service_account_info",
         fake_from_info,
     )
-    monkeypatch.setattr(gcal, "build", lambda *a, **k: "CLIENT")
+    monkeypatch.setattr(
+        "googleapiclient.discovery.build_from_document", lambda *a, **k: "CLIENT"
+    )
     monkeypatch.setattr(
         gcal.settings, "GOOGLE_CREDENTIALS_JSON", json.dumps(dummy_info)
     )
 
-    gcal.get_client.cache_clear()
     result = gcal.get_client()
     assert result == "CLIENT"
     assert captured["info"] == dummy_info
+    assert captured["scopes"] == ["https://www.googleapis.com/auth/calendar"]
 
 
 def test_sync_shift_event_requires_calendar_id(monkeypatch):
@@ -493,3 +495,109 @@ def test_delete_shift_event_logs_info_on_success(monkeypatch, caplog):
         gcal.delete_shift_event("1")
 
     assert "Deleted event" in caplog.text
+
+
+class FakeBatchClient:
+    """Fake Calendar client recording batch requests.
+
+    ``errors`` maps ``(method, event_id)`` to the HTTP status the fake batch
+    reports for that call; every other call succeeds.
+    """
+
+    def __init__(self, errors=None):
+        self.errors = errors or {}
+        self.batches = []
+
+    def events(self):
+        def call(method):
+            def build(**kwargs):
+                evt_id = kwargs.get("eventId") or kwargs["body"]["id"]
+                return (method, evt_id)
+
+            return build
+
+        return types.SimpleNamespace(
+            update=call("update"), insert=call("insert"), delete=call("delete")
+        )
+
+    def new_batch_http_request(self, callback):
+        client = self
+
+        class Batch:
+            def __init__(self):
+                self.requests = []
+
+            def add(self, request, request_id):
+                self.requests.append((request_id, request))
+
+            def execute(self):
+                client.batches.append([req for _, req in self.requests])
+                for request_id, req in self.requests:
+                    status = client.errors.get(req)
+                    exc = FakeHttpError(status) if status else None
+                    callback(request_id, None if exc else {}, exc)
+
+        return Batch()
+
+
+def _batch_turni(count):
+    turni = []
+    for i in range(count):
+        turno = _dummy_turno()
+        turno.id = f"t{i}"
+        turni.append(turno)
+    return turni
+
+
+def test_sync_shift_events_groups_requests_in_batches(monkeypatch):
+    fake = FakeBatchClient()
+    monkeypatch.setattr(gcal, "get_client", lambda: fake)
+    monkeypatch.setattr(gcal.settings, "G_SHIFT_CAL_ID", "CAL")
+
+    report = gcal.sync_shift_events(_batch_turni(120))
+
+    assert [len(b) for b in fake.batches] == [50, 50, 20]
+    assert all(method == "update" for b in fake.batches for method, _ in b)
+    assert len(report) == 120
+    assert report["t0"] == {"status": "updated", "error": None}
+
+
+def test_sync_shift_events_inserts_missing_events_in_next_batch(monkeypatch):
+    eid = gcal.shift_event_id
+    fake = FakeBatchClient(errors={("update", eid("t1")): 404, ("update", eid("t2")): 500})
+    monkeypatch.setattr(gcal, "get_client", lambda: fake)
+    monkeypatch.setattr(gcal.settings, "G_SHIFT_CAL_ID", "CAL")
+
+    turni = _batch_turni(3)
+    turni[0].tipo = gcal.TipoTurno.FERIE.value
+    report = gcal.sync_shift_events(turni)
+
+    assert fake.batches == [
+        [("delete", eid("t0")), ("update", eid("t1")), ("update", eid("t2"))],
+        [("insert", eid("t1"))],
+    ]
+    assert report["t0"]["status"] == "deleted"
+    assert report["t1"] == {"status": "inserted", "error": None}
+    assert report["t2"]["status"] == "failed"
+
+
+def test_delete_shift_events_ignores_missing_events(monkeypatch):
+    eid = gcal.shift_event_id
+    fake = FakeBatchClient(errors={("delete", eid("b")): 404, ("delete", eid("c")): 403})
+    monkeypatch.setattr(gcal, "get_client", lambda: fake)
+    monkeypatch.setattr(gcal.settings, "G_SHIFT_CAL_ID", "CAL")
+
+    report = gcal.delete_shift_events(["a", "b", "c"])
+
+    assert {k: v["status"] for k, v in report.items()} == {
+        "a": "deleted",
+        "b": "deleted",
+        "c": "failed",
+    }
+
+
+def test_sync_shift_events_empty_does_not_build_client(monkeypatch):
+    monkeypatch.setattr(gcal, "get_client", lambda: pytest.fail("no client"))
+    monkeypatch.setattr(gcal.settings, "G_SHIFT_CAL_ID", "CAL")
+
+    assert gcal.sync_shift_events([]) == {}
@@ -7,7 +7,7 @@ from app.services import google_calendar
 
 
 def test_list_events_between_success(monkeypatch):
-    google_calendar.get_service.cache_clear()
+    google_calendar.events_cache.clear()
     dummy_info = {"type": "service_account"}
     monkeypatch.setattr(google_calendar.settings, "GOOGLE_CREDENTIALS_JSON", json.dumps(dummy_info))
     monkeypatch.setattr(google_calendar.settings, "GOOGLE_CALENDAR_ID", "CAL")
@@ -54,7 +54,10 @@ def test_list_events_between_success(monkeypatch):
         def events(self):
             return types.SimpleNamespace(list=DummyEvents().list)
 
-    monkeypatch.setattr("googleapiclient.discovery.build", lambda *a, **k: DummyService())
+    monkeypatch.setattr(
+        "googleapiclient.discovery.build_from_document",
+        lambda *a, **k: DummyService(),
+    )
 
     start = datetime(2023, 1, 1)
     end = datetime(2023, 1, 7)
@@ -73,7 +76,6 @@ def test_list_events_between_success(monkeypatch):
 
 
 def test_list_events_between_missing_config(monkeypatch):
-    google_calendar.get_service.cache_clear()
     monkeypatch.setattr(google_calendar.settings, "GOOGLE_CREDENTIALS_JSON", None)
     monkeypatch.setattr(google_calendar.settings, "GOOGLE_CALENDAR_ID", None)
 
@@ -83,9 +85,152 @@ def test_list_events_between_missing_config(monkeypatch):
         called["yes"] = True
         raise AssertionError
 
-    monkeypatch.setattr("googleapiclient.discovery.build", fail_build)
+    monkeypatch.setattr("googleapiclient.discovery.build_from_document", fail_build)
 
     result = google_calendar.list_events_between(datetime.utcnow(), datetime.utcnow())
 
     assert result == []
     assert "yes" not in called
+
+
+class PagedService:
+    """Fake service returning ``pages`` from ``events().list``."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def events(self):
+        return types.SimpleNamespace(list=self.list)
+
+    def list(self, **kwargs):
+        self.calls.append(kwargs)
+        page = self.pages[len(self.calls) - 1]
+        return types.SimpleNamespace(execute=lambda: page)
+
+
+def _event(event_id, start, end=None):
+    return {
+        "id": event_id,
+        "summary": event_id,
+        "start": {"dateTime": start},
+        "end": {"dateTime": end or start},
+    }
+
+
+def _configure(monkeypatch, service, ttl=300, maxsize=8):
+    monkeypatch.setattr(google_calendar.settings, "GOOGLE_CREDENTIALS_JSON", "{}")
+    monkeypatch.setattr(google_calendar.settings, "GOOGLE_CALENDAR_ID", "CAL")
+    monkeypatch.setattr(google_calendar, "get_service", lambda: service)
+    cache = google_calendar.EventWindowCache(ttl=ttl, maxsize=maxsize)
+    monkeypatch.setattr(google_calendar, "events_cache", cache)
+    return cache
+
+
+def test_list_events_between_follows_pages_with_projection(monkeypatch):
+    service = PagedService(
+        [
+            {"items": [_event("a", "2023-01-02T10:00:00Z")], "nextPageToken": "p2"},
+            {"items": [_event("b", "2023-01-03T10:00:00Z")]},
+        ]
+    )
+    _configure(monkeypatch, service)
+
+    result = google_calendar.list_events_between(
+        datetime(2023, 1, 1), datetime(2023, 1, 7)
+    )
+
+    assert [e["id"] for e in result] == ["a", "b"]
+    assert service.calls[0]["fields"] == google_calendar.EVENT_FIELDS
+    assert service.calls[0]["pageToken"] is None
+    assert service.calls[1]["pageToken"] == "p2"
+
+
+def test_overlapping_windows_share_one_superset(monkeypatch):
+    items = [
+        _event("mon", "2023-01-02T10:00:00Z", "2023-01-02T11:00:00Z"),
+        _event("thu", "2023-01-05T10:00:00Z", "2023-01-05T11:00:00Z"),
+        _event("next", "2023-01-10T10:00:00Z", "2023-01-10T11:00:00Z"),
+    ]
+    service = PagedService([{"items": items}, {"items": items}])
+    cache = _configure(monkeypatch, service)
+
+    week = google_calendar.list_events_between(
+        datetime(2023, 1, 2), datetime(2023, 1, 8, 23, 59)
+    )
+    # overlaps the first window: both are refetched as one superset
+    wide = google_calendar.list_events_between(
+        datetime(2023, 1, 4), datetime(2023, 1, 11)
+    )
+    inner = google_calendar.list_events_between(
+        datetime(2023, 1, 3), datetime(2023, 1, 6)
+    )
+
+    assert [e["id"] for e in week] == ["mon", "thu"]
+    assert [e["id"] for e in wide] == ["thu", "next"]
+    assert [e["id"] for e in inner] == ["thu"]
+    assert len(service.calls) == 2
+    assert service.calls[1]["timeMin"].startswith("2023-01-02T00:00")
+    assert service.calls[1]["timeMax"].startswith("2023-01-11T00:00")
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["windows"] == 1
+
+
+def test_upcoming_events_reuse_cached_window(monkeypatch):
+    service = PagedService([{"items": []}])
+    cache = _configure(monkeypatch, service)
+
+    google_calendar.list_upcoming_events(7)
+    google_calendar.list_upcoming_events(7)
+
+    assert len(service.calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_entries_expire_and_are_evicted(monkeypatch):
+    service = PagedService([{"items": []}] * 4)
+    cache = _configure(monkeypatch, service, ttl=0, maxsize=1)
+
+    google_calendar.list_events_between(datetime(2023, 1, 1), datetime(2023, 1, 2))
+    google_calendar.list_events_between(datetime(2023, 1, 1), datetime(2023, 1, 2))
+    assert len(service.calls) == 2  # ttl=0: nothing is reused
+
+    cache.ttl = 300
+    google_calendar.list_events_between(datetime(2023, 1, 1), datetime(2023, 1, 2))
+    google_calendar.list_events_between(datetime(2023, 2, 1), datetime(2023, 2, 2))
+    assert cache.stats()["windows"] == 1  # LRU keeps only the latest window
+
+
+def test_created_event_invalidates_cached_windows(monkeypatch):
+    from app.services import calendar_events
+
+    new = _event("new", "2023-01-03T10:00:00Z", "2023-01-03T11:00:00Z")
+    service = PagedService([{"items": []}, {"items": [new]}])
+    cache = _configure(monkeypatch, service)
+    cache.store("OTHER", datetime(2023, 1, 1), datetime(2023, 1, 8), [])
+
+    inserted = []
+    writer = types.SimpleNamespace(
+        events=lambda: types.SimpleNamespace(
+            insert=lambda **kw: types.SimpleNamespace(
+                execute=lambda: inserted.append(kw)
+            )
+        )
+    )
+    monkeypatch.setattr(
+        calendar_events.google_clients, "get_service", lambda scopes: writer
+    )
+
+    window = (datetime(2023, 1, 2), datetime(2023, 1, 8))
+    assert google_calendar.list_events_between(*window) == []
+    event = types.SimpleNamespace(
+        id="e1", titolo="new", descrizione=None, data_ora=datetime(2023, 1, 3, 10)
+    )
+    calendar_events.create_event(event)
+
+    assert [e["id"] for e in google_calendar.list_events_between(*window)] == ["new"]
+    assert inserted[0]["calendarId"] == "CAL"
+    assert len(service.calls) == 2
+    # windows of other calendars are kept
+    assert cache.lookup("OTHER", *window) == []
@@ -0,0 +1,94 @@
+import json
+import threading
+from unittest.mock import MagicMock
+
+from app.services import calendar_events, gcal, google_calendar, google_clients
+
+
+class FakeCredentials:
+    def __init__(self):
+        self.valid = False
+        self.refreshes = 0
+
+    def refresh(self, request):
+        self.refreshes += 1
+        self.valid = True
+
+
+def _configure(monkeypatch):
+    info = {"type": "service_account", "client_email": "bot@example.com"}
+    monkeypatch.setattr(google_clients.settings, "GOOGLE_CREDENTIALS_JSON", json.dumps(info))
+    loads = []
+
+    def from_info(info, scopes=None):
+        loads.append(tuple(scopes))
+        return FakeCredentials()
+
+    builds = []
+
+    def build_from_document(doc, credentials=None):
+        builds.append((doc["name"], credentials))
+        return MagicMock()
+
+    monkeypatch.setattr(
+        "google.oauth2.service_account.Credentials.from_service_account_info",
+        from_info,
+    )
+    monkeypatch.setattr(
+        "googleapiclient.discovery.build_from_document", build_from_document
+    )
+    return loads, builds
+
+
+def test_discovery_document_is_bundled(monkeypatch):
+    def no_network(*args, **kwargs):
+        raise AssertionError("network fetch")
+
+    monkeypatch.setattr("googleapiclient.discovery.build", no_network)
+    doc = google_clients.discovery_document("calendar", "v3")
+    assert doc["name"] == "calendar"
+    assert doc is google_clients.discovery_document("calendar", "v3")
+
+
+def test_clients_are_shared_per_scope_set(monkeypatch):
+    loads, builds = _configure(monkeypatch)
+    monkeypatch.setattr(calendar_events.settings, "GOOGLE_CALENDAR_ID", "CAL")
+
+    shift_client = gcal.get_client()
+    assert gcal.get_client() is shift_client
+    event = MagicMock(titolo="E", descrizione="", id="1")
+    event.data_ora = gcal.datetime(2024, 1, 1, 9, 0)
+    calendar_events.create_event(event)
+    calendar_events.create_event(event)
+    google_calendar.get_service()
+
+    # one credentials load and one client per scope set
+    assert loads == [
+        (google_clients.CALENDAR_SCOPE,),
+        (google_clients.CALENDAR_READONLY_SCOPE,),
+    ]
+    assert len(builds) == 2
+    assert shift_client.events.return_value.insert.call_count == 2
+
+
+def test_threads_get_own_client_and_refresh_once(monkeypatch):
+    _, builds = _configure(monkeypatch)
+    scopes = [google_clients.CALENDAR_SCOPE]
+    creds = google_clients.get_credentials(scopes)
+    barrier = threading.Barrier(4)
+    clients = []
+
+    def worker():
+        barrier.wait()
+        clients.append(google_clients.get_service(scopes))
+        creds.refresh(None)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(c) for c in clients}) == 4
+    assert all(credentials is creds for _, credentials in builds)
+    assert creds.refreshes == 1
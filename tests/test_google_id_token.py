@@ -0,0 +1,120 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import rsa
+from fastapi.testclient import TestClient
+from google.auth import crypt, exceptions, jwt
+
+from app.main import app
+from app.routes import auth as auth_routes
+from app.services import google_id_token
+
+client = TestClient(app)
+
+AUDIENCE = "test-client"
+
+
+@pytest.fixture(scope="module")
+def signing_key():
+    public, private = rsa.newkeys(1024)
+    signer = crypt.RSASigner.from_string(private.save_pkcs1().decode(), key_id="k1")
+    return signer, public.save_pkcs1().decode()
+
+
+@pytest.fixture
+def certs_server(signing_key, monkeypatch):
+    """Local stand-in for Google's certificate endpoint."""
+    _, public_pem = signing_key
+    state = {"requests": 0, "cache_control": "public, max-age=3600"}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["requests"] += 1
+            body = json.dumps({"k1": public_pem}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Cache-Control", state["cache_control"])
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        google_id_token, "certs_url", f"http://127.0.0.1:{server.server_port}/certs"
+    )
+    monkeypatch.setattr(auth_routes.settings, "GOOGLE_CLIENT_ID", AUDIENCE)
+    google_id_token.certs_request.clear()
+    yield state
+    google_id_token.certs_request.clear()
+    server.shutdown()
+    server.server_close()
+
+
+def _token(signing_key, **claims):
+    signer, _ = signing_key
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com",
+        "aud": AUDIENCE,
+        "iat": now,
+        "exp": now + 600,
+        "email": "google@example.com",
+    }
+    payload.update(claims)
+    return jwt.encode(signer, payload).decode()
+
+
+def test_max_age_parsing():
+    assert google_id_token.max_age({"Cache-Control": "public, max-age=19897"}) == 19897
+    assert google_id_token.max_age({"cache-control": "max-age=60, no-cache"}) == 0
+    assert google_id_token.max_age({}) == 0
+
+
+def test_certs_fetched_once_while_fresh(certs_server, signing_key):
+    for _ in range(3):
+        claims = google_id_token.verify(_token(signing_key), AUDIENCE)
+        assert claims["email"] == "google@example.com"
+
+    assert certs_server["requests"] == 1
+    assert google_id_token.certs_request.stats()["hits"] == 2
+
+
+def test_certs_refetched_without_max_age(certs_server, signing_key):
+    certs_server["cache_control"] = "no-cache"
+    google_id_token.verify(_token(signing_key), AUDIENCE)
+    google_id_token.verify(_token(signing_key), AUDIENCE)
+    assert certs_server["requests"] == 2
+
+
+def test_wrong_issuer_or_audience_rejected(certs_server, signing_key):
+    with pytest.raises(exceptions.GoogleAuthError):
+        google_id_token.verify(_token(signing_key, iss="https://evil.example"), AUDIENCE)
+    with pytest.raises(ValueError):
+        google_id_token.verify(_token(signing_key, aud="other"), AUDIENCE)
+
+
+def test_google_login_uses_cached_certs(certs_server, signing_key, setup_db):
+    client.post(
+        "/users/",
+        json={"email": "google@example.com", "password": "secret", "nome": "G"},
+    )
+
+    for _ in range(2):
+        res = client.post("/google-login", json={"token": _token(signing_key)})
+        assert res.status_code == 200
+        assert "access_token" in res.json()
+
+    assert certs_server["requests"] == 1
+    token = res.json()["access_token"]
+    stats = client.get(
+        "/health/google-certs", headers={"Authorization": f"Bearer {token}"}
+    ).json()
+    assert stats == {"hits": 1, "misses": 1, "cached_urls": 1}
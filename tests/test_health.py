@@ -1,10 +1,83 @@
+import pytest
 from fastapi.testclient import TestClient
 from app.main import app
 
 client = TestClient(app)
 
 
+CREDENTIALS = {"email": "health@example.com", "password": "secret"}
+
+
+def auth_headers():
+    client.post("/users/", json={**CREDENTIALS, "nome": "H"})
+    token = client.post("/login", json=CREDENTIALS).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/health/calendar-cache",
+        "/health/pdf-cache",
+        "/health/pdf-renderer",
+        "/health/auth-cache",
+        "/health/google-certs",
+        "/health/db-pool",
+    ],
+)
+def test_internal_stats_require_login(setup_db, path):
+    assert client.get(path).status_code == 401
+
+
 def test_health_ok(setup_db):
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_calendar_cache_stats(setup_db):
+    response = client.get("/health/calendar-cache", headers=auth_headers())
+    assert response.status_code == 200
+    assert {
+        "hits",
+        "misses",
+        "windows",
+        "ttl_seconds",
+    } <= response.json().keys()
+
+
+def test_pdf_cache_stats(setup_db):
+    response = client.get("/health/pdf-cache", headers=auth_headers())
+    assert response.status_code == 200
+    keys = {"hits", "misses", "files", "bytes", "max_bytes"}
+    assert keys <= response.json().keys()
+
+
+def test_pdf_renderer_stats(setup_db):
+    response = client.get("/health/pdf-renderer", headers=auth_headers())
+    assert response.status_code == 200
+    assert {
+        "workers",
+        "in_flight",
+        "renders",
+        "rejected",
+        "avg_render_seconds",
+        "avg_wait_seconds",
+    } <= response.json().keys()
+
+
+def test_db_pool_stats(setup_db):
+    client.get("/health")
+    response = client.get("/health/db-pool", headers=auth_headers())
+    assert response.status_code == 200
+    data = response.json()
+    assert data["pool"] == "TimedQueuePool"
+    assert data["checkouts"] >= 1
+    assert {
+        "in_use",
+        "overflow_hits",
+        "timeouts",
+        "avg_wait_seconds",
+        "size",
+        "max_overflow",
+    } <= data.keys()
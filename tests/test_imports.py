@@ -1,6 +1,5 @@
 import os
 from unittest.mock import patch
-from pathlib import Path
 import pandas as pd
 from fastapi.testclient import TestClient
 from fastapi import HTTPException
@@ -38,9 +37,9 @@ def test_import_xlsx_creates_turni_and_returns_pdf(setup_db, tmp_path):
     df.to_excel(xlsx_path, index=False)
 
     def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
+        target.write(b"%PDF-1.4 fake")
 
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
         with open(xlsx_path, "rb") as fh:
             res = client.post(
                 "/import/xlsx",
@@ -70,12 +69,10 @@ def test_temp_files_removed_after_request(setup_db, tmp_path):
         return []
 
     def fake_write_pdf(self, target, *args, **kwargs):
-        captured["html"] = target
-        captured["pdf"] = target
-        Path(target).write_bytes(b"%PDF-1.4 fake")
+        target.write(b"%PDF-1.4 fake")
 
     with patch("app.routes.imports.parse_excel", side_effect=fake_parse_excel):
-        with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
+        with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
             dummy = tmp_path / "shift.xlsx"
             dummy.write_bytes(b"data")
             with open(dummy, "rb") as fh:
@@ -90,9 +87,8 @@ def test_temp_files_removed_after_request(setup_db, tmp_path):
                     },
                 )
     assert res.status_code == 200
+    assert res.content == b"%PDF-1.4 fake"
     assert not os.path.exists(captured["xlsx"])
-    assert not os.path.exists(captured["html"])
-    assert not os.path.exists(captured["pdf"])
 
 
 def test_parse_error_returns_400_and_removes_xlsx(tmp_path):
@@ -136,9 +132,9 @@ def test_import_excel_alias_returns_pdf(tmp_path):
     df.to_excel(xlsx_path, index=False)
 
     def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
+        target.write(b"%PDF-1.4 fake")
 
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
         with open(xlsx_path, "rb") as fh:
             res = client.post(
                 "/import/excel",
@@ -186,6 +182,71 @@ def test_import_xlsx_unknown_agent_returns_400(tmp_path):
     assert "Unknown user" in res.json()["detail"]
 
 
+def test_import_xlsx_lists_every_unknown_agent(tmp_path):
+    """All rows with unknown agents are reported in a single error."""
+    _, _, nome = auth_user("known@example.com")
+    df = pd.DataFrame(
+        [
+            {"Agente": "Ghost One", "Data": "2023-01-01", "Inizio1": "08:00", "Fine1": "12:00"},
+            {"Agente": nome, "Data": "2023-01-02", "Inizio1": "08:00", "Fine1": "12:00"},
+            {"Agente": "Ghost Two", "Data": "2023-01-03", "Inizio1": "08:00", "Fine1": "12:00"},
+        ]
+    )
+    xlsx_path = tmp_path / "ghosts.xlsx"
+    df.to_excel(xlsx_path, index=False)
+
+    with open(xlsx_path, "rb") as fh:
+        res = client.post(
+            "/import/xlsx",
+            files={
+                "file": (
+                    "ghosts.xlsx",
+                    fh,
+                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                )
+            },
+        )
+
+    assert res.status_code == 400
+    assert res.json()["detail"] == (
+        "Row 2: Unknown user: Ghost One; Row 4: Unknown user: Ghost Two"
+    )
+
+
+def test_parse_excel_resolves_agents_with_one_query(tmp_path):
+    """Agent names are resolved with a single query regardless of row count."""
+    from sqlalchemy import event
+    from app.dependencies import SessionLocal
+    from app.services.excel_import import parse_excel
+
+    _, user_id, nome = auth_user("bulk@example.com")
+    df = pd.DataFrame(
+        [
+            {"Agente": nome.lower(), "Data": f"2023-01-{d:02d}", "Inizio1": "08:00", "Fine1": "12:00"}
+            for d in range(1, 29)
+        ]
+    )
+    xlsx_path = tmp_path / "bulk.xlsx"
+    df.to_excel(xlsx_path, index=False)
+
+    db = SessionLocal()
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", count)
+    try:
+        rows = parse_excel(str(xlsx_path), db)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", count)
+        db.close()
+
+    assert len(rows) == 28
+    assert {r["user_id"] for r in rows} == {user_id}
+    assert len([s for s in statements if "FROM users" in s]) == 1
+
+
 def test_import_xlsx_nan_time_returns_400(tmp_path):
     """Cells containing the string 'nan' should result in a 400 error."""
     _, user_id, _ = auth_user("nan@example.com")
@@ -229,7 +290,7 @@ def test_tmp_removed_on_late_failure(tmp_path):
         raise RuntimeError("oops")
 
     with patch("app.routes.imports.parse_excel", side_effect=fake_parse_excel):
-        with patch("app.routes.imports.crud_turno.upsert_turno", side_effect=boom):
+        with patch("app.routes.imports.crud_turno.bulk_upsert_turni", side_effect=boom):
             dummy = tmp_path / "shift.xlsx"
             dummy.write_bytes(b"data")
             with open(dummy, "rb") as fh:
@@ -264,9 +325,9 @@ def test_import_xlsx_data_column_alias(setup_db, tmp_path):
     df.to_excel(xlsx_path, index=False)
 
     def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
+        target.write(b"%PDF-1.4 fake")
 
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
         with open(xlsx_path, "rb") as fh:
             res = client.post(
                 "/import/xlsx",
@@ -0,0 +1,161 @@
+"""Login bursts must not hold the request threadpool.
+
+Logins verify bcrypt hashes at a realistic cost while the request threadpool
+is shrunk to a few threads. The test checks that every bcrypt check runs on
+the password hashing executor; the benchmark times ``/health`` during a
+burst with the check on the request threadpool (as before) and on the
+executor.
+"""
+
+import asyncio
+import threading
+
+import anyio.to_thread
+import httpx
+import pytest
+from fastapi.concurrency import run_in_threadpool
+from passlib.context import CryptContext
+
+from app.crud.user import create_user
+from app.dependencies import SessionLocal
+from app.main import app
+from app.services import passwords
+
+ROUNDS = 10
+REQUEST_THREADS = 4
+LOGINS = 12
+CREDENTIALS = {"email": "burst@example.com", "password": "secret"}
+
+
+class _Server:
+    """The app on an event loop of its own thread, with a few request threads.
+
+    The anyio thread limiter is per event loop, so the login burst and the
+    ``/health`` probe have to share one loop to compete for the threads.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, daemon=True
+        )
+        self.thread.start()
+        self.client = self.run(self._start())
+        self.burst = None
+
+    async def _start(self):
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        limiter.total_tokens = REQUEST_THREADS
+        transport = httpx.ASGITransport(app=app)
+        return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def _logins(self):
+        logins = (
+            self.client.post("/login", json=CREDENTIALS) for _ in range(LOGINS)
+        )
+        return await asyncio.gather(*logins)
+
+    def start_burst(self):
+        self.burst = asyncio.run_coroutine_threadsafe(
+            self._logins(), self.loop
+        )
+
+    def finish_burst(self):
+        responses, self.burst = self.burst.result(), None
+        return responses
+
+    def close(self):
+        if self.burst is not None:
+            self.finish_burst()
+        self.run(self.client.aclose())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+@pytest.fixture
+def hashing(setup_db, monkeypatch):
+    """Costly bcrypt context recording the threads running the checks."""
+    context = CryptContext(
+        schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=ROUNDS
+    )
+    db = SessionLocal()
+    try:
+        create_user(db, CREDENTIALS["email"], CREDENTIALS["password"], "Burst")
+    finally:
+        db.close()
+    monkeypatch.setattr(passwords, "pwd_context", context)
+
+    threads = []
+    started = threading.Event()
+    verify_and_update = context.verify_and_update
+
+    def recording(*args, **kwargs):
+        threads.append(threading.current_thread().name)
+        started.set()
+        return verify_and_update(*args, **kwargs)
+
+    monkeypatch.setattr(context, "verify_and_update", recording)
+    return threads, started
+
+
+def _on_request_threads(monkeypatch):
+    """Check passwords on the request threadpool, as before the executor."""
+
+    async def verify_and_update(password, hashed_password):
+        return await run_in_threadpool(
+            passwords.pwd_context.verify_and_update, password, hashed_password
+        )
+
+    monkeypatch.setattr(passwords, "verify_and_update", verify_and_update)
+
+
+def test_login_burst_checks_passwords_on_hash_executor(hashing):
+    threads, _ = hashing
+    server = _Server()
+    try:
+        server.start_burst()
+        health = server.run(server.client.get("/health"))
+        responses = server.finish_burst()
+    finally:
+        server.close()
+
+    assert health.status_code == 200
+    assert all(r.status_code == 200 for r in responses)
+    assert len(threads) == LOGINS
+    assert all(name.startswith("password-hash") for name in threads)
+    assert len(set(threads)) <= passwords.settings.PASSWORD_HASH_WORKERS
+
+
+@pytest.mark.benchmark(group="login-burst-health")
+@pytest.mark.parametrize("checks_on", ["request-threads", "hash-executor"])
+def test_benchmark_health_during_login_burst(
+    benchmark, hashing, monkeypatch, checks_on
+):
+    _, started = hashing
+    if checks_on == "request-threads":
+        _on_request_threads(monkeypatch)
+    server = _Server()
+
+    def start_burst():
+        if server.burst is not None:
+            server.finish_burst()
+        started.clear()
+        server.start_burst()
+        started.wait(10)
+
+    try:
+        health = benchmark.pedantic(
+            lambda: server.run(server.client.get("/health")),
+            setup=start_burst,
+            rounds=3,
+        )
+        responses = server.finish_burst()
+    finally:
+        server.close()
+
+    assert health.status_code == 200
+    assert all(r.status_code == 200 for r in responses)
@@ -0,0 +1,116 @@
+"""Serialization of 10k-row ``/orari/`` responses.
+
+The rows are written by ``TypeAdapter.dump_json`` in one pass. The tests
+check that the bytes match FastAPI's ``response_model`` serialization
+(validate, dump to primitives, encode) and the ``jsonable_encoder`` chain
+that built the week PDF inputs; the benchmarks time them against each
+other.
+"""
+
+import asyncio
+import json
+from datetime import date
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.testclient import TestClient
+
+from app.crud import turno as crud_turno
+from app.dependencies import SessionLocal
+from app.main import app
+from app.schemas.turno import TurnoOut
+from app.services.responses import dump_rows, rows_response
+
+client = TestClient(app)
+
+USERS = 10
+DAYS = 1000
+START = date(2020, 1, 1)
+
+
+def _auth_headers():
+    client.post(
+        "/users/",
+        json={"email": "bench@example.com", "password": "secret", "nome": "B"},
+    )
+    token = client.post(
+        "/login", json={"email": "bench@example.com", "password": "secret"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _route():
+    return next(
+        r
+        for r in app.routes
+        if getattr(r, "path", None) == "/orari/" and "GET" in r.methods
+    )
+
+
+def _response_model_body(rows):
+    field = _route().response_field
+    content = asyncio.run(
+        serialize_response(field=field, response_content=rows)
+    )
+    return JSONResponse(content).body
+
+
+def _encoder_chain(rows):
+    return [
+        jsonable_encoder(TurnoOut.model_validate(t, from_attributes=True))
+        for t in rows
+    ]
+
+
+@pytest.fixture
+def rows(seed_shifts):
+    seed_shifts(USERS, DAYS, START, note="nota")
+    db = SessionLocal()
+    try:
+        yield crud_turno.list_all(db)
+    finally:
+        db.close()
+
+
+def test_orari_10k_rows_match_response_model(rows):
+    res = client.get("/orari/", headers=_auth_headers())
+
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/json"
+    body = res.json()
+    assert len(body) == USERS * DAYS
+    assert body[0]["note"] == "nota"
+    assert json.loads(rows_response(TurnoOut, rows).body) == body
+    assert json.loads(_response_model_body(rows)) == body
+
+
+def test_dump_rows_matches_encoder_chain(rows):
+    assert dump_rows(TurnoOut, rows) == _encoder_chain(rows)
+
+
+@pytest.mark.benchmark(group="orari-response")
+@pytest.mark.parametrize("serializer", ["response_model", "dump_json"])
+def test_benchmark_orari_response(benchmark, rows, serializer):
+    serializers = {
+        "response_model": _response_model_body,
+        "dump_json": lambda r: rows_response(TurnoOut, r).body,
+    }
+
+    body = benchmark(serializers[serializer], rows)
+
+    assert len(json.loads(body)) == USERS * DAYS
+
+
+@pytest.mark.benchmark(group="orari-dump")
+@pytest.mark.parametrize("serializer", ["jsonable_encoder", "dump_rows"])
+def test_benchmark_orari_dump(benchmark, rows, serializer):
+    serializers = {
+        "jsonable_encoder": _encoder_chain,
+        "dump_rows": lambda r: dump_rows(TurnoOut, r),
+    }
+
+    dumped = benchmark(serializers[serializer], rows)
+
+    assert len(dumped) == USERS * DAYS
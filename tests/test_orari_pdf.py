@@ -1,6 +1,4 @@
-from pathlib import Path
 from unittest.mock import patch
-import os
 from datetime import datetime
 from fastapi.testclient import TestClient
 
@@ -66,23 +64,20 @@ def test_week_pdf_filters_turni(setup_db, tmp_path):
     client.post("/orari/", json=shift3, headers=headers)
 
     captured = {}
-    real_df_to_pdf = __import__(
-        "app.services.excel_import", fromlist=["df_to_pdf"]
-    ).df_to_pdf
+    real_df_to_html = __import__(
+        "app.services.excel_import", fromlist=["df_to_html"]
+    ).df_to_html
 
     def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
+        captured["html_text"] = self.string
+        target.write(b"%PDF-1.4 fake")
 
-    def capture_df_to_pdf(rows, db):
+    def capture_df_to_html(rows, db, extra_notes=None):
         captured["rows"] = rows
-        pdf_path, html_path = real_df_to_pdf(rows, db)
-        captured["html"] = html_path
-        captured["pdf"] = pdf_path
-        captured["html_text"] = Path(html_path).read_text()
-        return pdf_path, html_path
-
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
-        with patch("app.routes.orari.df_to_pdf", side_effect=capture_df_to_pdf):
+        return real_df_to_html(rows, db, extra_notes)
+
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
+        with patch("app.routes.orari.df_to_html", side_effect=capture_df_to_html):
             res = client.get("/orari/pdf?week=2023-W01", headers=headers)
 
     assert res.status_code == 200
@@ -111,8 +106,8 @@ def test_week_pdf_invalid_format(setup_db):
     assert "Invalid week format" in res.json()["detail"]
 
 
-def test_week_pdf_temp_files_removed(setup_db, tmp_path):
-    """Temporary PDF and HTML files should be cleaned up after the request."""
+def test_week_pdf_rendered_in_memory(setup_db, tmp_path):
+    """The PDF is rendered from an HTML string without temporary files."""
     headers, user_id = auth_user("clean@example.com")
 
     shift = {
@@ -131,22 +126,17 @@ def test_week_pdf_temp_files_removed(setup_db, tmp_path):
     client.post("/orari/", json=shift, headers=headers)
 
     captured = {}
-    real_df_to_pdf = __import__(
-        "app.services.excel_import", fromlist=["df_to_pdf"]
-    ).df_to_pdf
 
     def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
+        captured["html_text"] = self.string
+        captured["filename"] = self.filename
+        target.write(b"%PDF-1.4 fake")
 
-    def capture_df_to_pdf(rows, db):
-        pdf_path, html_path = real_df_to_pdf(rows, db)
-        captured["pdf"] = pdf_path
-        captured["html"] = html_path
-        captured["html_text"] = Path(html_path).read_text()
-        return pdf_path, html_path
+    def no_temp_files(*args, **kwargs):
+        raise AssertionError("temporary file created")
 
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
-        with patch("app.routes.orari.df_to_pdf", side_effect=capture_df_to_pdf):
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
+        with patch("tempfile.NamedTemporaryFile", side_effect=no_temp_files):
             res = client.get("/orari/pdf?week=2023-W01", headers=headers)
 
     assert res.status_code == 200
@@ -158,8 +148,9 @@ def test_week_pdf_temp_files_removed(setup_db, tmp_path):
         "COMUNE DI CASTIONE DELLA PRESOLANA – SERVIZIO DI POLIZIA LOCALE"
         in captured["html_text"]
     )
-    assert not os.path.exists(captured["pdf"])
-    assert not os.path.exists(captured["html"])
+    assert captured["filename"] is None
+    assert res.content == b"%PDF-1.4 fake"
+    assert res.headers["content-disposition"] == 'attachment; filename="turni_2023-W01.pdf"'
 
 
 def test_week_pdf_escapes_html(setup_db, tmp_path):
@@ -181,21 +172,13 @@ def test_week_pdf_escapes_html(setup_db, tmp_path):
     client.post("/orari/", json=shift, headers=headers)
 
     captured = {}
-    real_df_to_pdf = __import__(
-        "app.services.excel_import", fromlist=["df_to_pdf"]
-    ).df_to_pdf
 
     def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
-
-    def capture_df_to_pdf(rows, db):
-        pdf_path, html_path = real_df_to_pdf(rows, db)
-        captured["html_text"] = Path(html_path).read_text()
-        return pdf_path, html_path
+        captured["html_text"] = self.string
+        target.write(b"%PDF-1.4 fake")
 
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
-        with patch("app.routes.orari.df_to_pdf", side_effect=capture_df_to_pdf):
-            res = client.get("/orari/pdf?week=2023-W01", headers=headers)
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
+        res = client.get("/orari/pdf?week=2023-W01", headers=headers)
 
     assert res.status_code == 200
     assert "&lt;Agent&gt;" in captured["html_text"]
@@ -238,20 +221,14 @@ def test_week_pdf_includes_gcal_events(setup_db, tmp_path):
     ]
 
     captured = {}
-    real_df_to_pdf = __import__("app.services.excel_import", fromlist=["df_to_pdf"]).df_to_pdf
 
     def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
+        captured["html_text"] = self.string
+        target.write(b"%PDF-1.4 fake")
 
-    def capture_df_to_pdf(rows, db):
-        pdf_path, html_path = real_df_to_pdf(rows, db)
-        captured["html_text"] = Path(html_path).read_text()
-        return pdf_path, html_path
-
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
         with patch("app.services.google_calendar.list_events_between", lambda s, e: gcal_events):
-            with patch("app.routes.orari.df_to_pdf", side_effect=capture_df_to_pdf):
-                res = client.get("/orari/pdf?week=2023-W01", headers=headers)
+            res = client.get("/orari/pdf?week=2023-W01", headers=headers)
 
     assert res.status_code == 200
     assert "<li>Evento</li>" in captured["html_text"]
@@ -286,20 +263,14 @@ def test_week_pdf_excludes_turno_titles(setup_db, tmp_path):
     ]
 
     captured = {}
-    real_df_to_pdf = __import__("app.services.excel_import", fromlist=["df_to_pdf"]).df_to_pdf
 
     def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
+        captured["html_text"] = self.string
+        target.write(b"%PDF-1.4 fake")
 
-    def capture_df_to_pdf(rows, db):
-        pdf_path, html_path = real_df_to_pdf(rows, db)
-        captured["html_text"] = Path(html_path).read_text()
-        return pdf_path, html_path
-
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
         with patch("app.services.google_calendar.list_events_between", lambda s, e: gcal_events):
-            with patch("app.routes.orari.df_to_pdf", side_effect=capture_df_to_pdf):
-                res = client.get("/orari/pdf?week=2023-W01", headers=headers)
+            res = client.get("/orari/pdf?week=2023-W01", headers=headers)
 
     assert res.status_code == 200
     assert "Turno Ag.Sc. Danesi" not in captured["html_text"]
@@ -333,20 +304,14 @@ def test_week_pdf_ignores_empty_gcal_titles(setup_db, tmp_path):
     ]
 
     captured = {}
-    real_df_to_pdf = __import__("app.services.excel_import", fromlist=["df_to_pdf"]).df_to_pdf
 
     def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
+        captured["html_text"] = self.string
+        target.write(b"%PDF-1.4 fake")
 
-    def capture_df_to_pdf(rows, db):
-        pdf_path, html_path = real_df_to_pdf(rows, db)
-        captured["html_text"] = Path(html_path).read_text()
-        return pdf_path, html_path
-
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
         with patch("app.services.google_calendar.list_events_between", lambda s, e: gcal_events):
-            with patch("app.routes.orari.df_to_pdf", side_effect=capture_df_to_pdf):
-                res = client.get("/orari/pdf?week=2023-W01", headers=headers)
+            res = client.get("/orari/pdf?week=2023-W01", headers=headers)
 
     assert res.status_code == 200
     assert "<li>None</li>" not in captured["html_text"]
@@ -393,20 +358,14 @@ def test_week_pdf_includes_public_events(setup_db, tmp_path):
     )
 
     captured = {}
-    real_df_to_pdf = __import__("app.services.excel_import", fromlist=["df_to_pdf"]).df_to_pdf
 
     def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
+        captured["html_text"] = self.string
+        target.write(b"%PDF-1.4 fake")
 
-    def capture_df_to_pdf(rows, db):
-        pdf_path, html_path = real_df_to_pdf(rows, db)
-        captured["html_text"] = Path(html_path).read_text()
-        return pdf_path, html_path
-
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
         with patch("app.services.google_calendar.list_events_between", lambda s, e: []):
-            with patch("app.routes.orari.df_to_pdf", side_effect=capture_df_to_pdf):
-                res = client.get("/orari/pdf?week=2023-W01", headers=headers)
+            res = client.get("/orari/pdf?week=2023-W01", headers=headers)
 
     assert res.status_code == 200
     assert "<li>Pubblico</li>" in captured["html_text"]
@@ -432,19 +391,13 @@ def test_week_pdf_strips_emails_from_notes(setup_db, tmp_path):
     client.post("/orari/", json=shift, headers=headers)
 
     captured = {}
-    real_df_to_pdf = __import__("app.services.excel_import", fromlist=["df_to_pdf"]).df_to_pdf
 
     def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
+        captured["html_text"] = self.string
+        target.write(b"%PDF-1.4 fake")
 
-    def capture_df_to_pdf(rows, db):
-        pdf_path, html_path = real_df_to_pdf(rows, db)
-        captured["html_text"] = Path(html_path).read_text()
-        return pdf_path, html_path
-
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
-        with patch("app.routes.orari.df_to_pdf", side_effect=capture_df_to_pdf):
-            res = client.get("/orari/pdf?week=2023-W01", headers=headers)
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
+        res = client.get("/orari/pdf?week=2023-W01", headers=headers)
 
     assert res.status_code == 200
     assert "foo@example.com" not in captured["html_text"]
@@ -490,22 +443,190 @@ def test_week_pdf_strips_emails_from_gcal_and_events(setup_db, tmp_path):
     )
 
     captured = {}
-    real_df_to_pdf = __import__("app.services.excel_import", fromlist=["df_to_pdf"]).df_to_pdf
 
     def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
-
-    def capture_df_to_pdf(rows, db):
-        pdf_path, html_path = real_df_to_pdf(rows, db)
-        captured["html_text"] = Path(html_path).read_text()
-        return pdf_path, html_path
+        captured["html_text"] = self.string
+        target.write(b"%PDF-1.4 fake")
 
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
         with patch("app.services.google_calendar.list_events_between", lambda s, e: gcal_events):
-            with patch("app.routes.orari.df_to_pdf", side_effect=capture_df_to_pdf):
-                res = client.get("/orari/pdf?week=2023-W01", headers=headers)
+            res = client.get("/orari/pdf?week=2023-W01", headers=headers)
 
     assert res.status_code == 200
     assert "foo@example.com" not in captured["html_text"]
     assert "Riunione" in captured["html_text"]
     assert "Pubblico" in captured["html_text"]
+
+
+def _shift(user_id: str, giorno: str, inizio: str = "08:00:00") -> dict:
+    return {
+        "user_id": user_id,
+        "giorno": giorno,
+        "inizio_1": inizio,
+        "fine_1": "12:00:00",
+        "inizio_2": None,
+        "fine_2": None,
+        "inizio_3": None,
+        "fine_3": None,
+        "tipo": TipoTurno.NORMALE.value,
+        "note": "",
+    }
+
+
+def test_week_pdf_cached_with_etag(setup_db):
+    """Repeated downloads reuse the cached PDF and honour If-None-Match."""
+    headers, user_id = auth_user("cache@example.com")
+    client.post("/orari/", json=_shift(user_id, "2023-01-02"), headers=headers)
+
+    calls = []
+
+    def fake_write_pdf(self, target, *args, **kwargs):
+        calls.append(self.string)
+        target.write(b"%PDF-1.4 fake")
+
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
+        first = client.get("/orari/pdf?week=2023-W01", headers=headers)
+        second = client.get("/orari/pdf?week=2023-W01", headers=headers)
+        not_modified = client.get(
+            "/orari/pdf?week=2023-W01",
+            headers={**headers, "If-None-Match": first.headers["etag"]},
+        )
+
+    assert len(calls) == 1
+    assert first.status_code == second.status_code == 200
+    assert second.content == b"%PDF-1.4 fake"
+    assert first.headers["etag"] == second.headers["etag"]
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == first.headers["etag"]
+
+
+def test_week_pdf_etag_changes_with_render_version(setup_db, monkeypatch):
+    """A template or renderer change must not reuse PDFs cached before it."""
+    from app.services import pdf_cache
+
+    headers, user_id = auth_user("version@example.com")
+    client.post("/orari/", json=_shift(user_id, "2023-01-02"), headers=headers)
+
+    calls = []
+
+    def fake_write_pdf(self, target, *args, **kwargs):
+        calls.append(self.string)
+        target.write(b"%PDF-1.4 fake")
+
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
+        first = client.get("/orari/pdf?week=2023-W01", headers=headers)
+        monkeypatch.setattr(pdf_cache, "LAYOUT_VERSION", pdf_cache.LAYOUT_VERSION + 1)
+        pdf_cache.render_version.cache_clear()
+        try:
+            second = client.get(
+                "/orari/pdf?week=2023-W01",
+                headers={**headers, "If-None-Match": first.headers["etag"]},
+            )
+        finally:
+            monkeypatch.undo()
+            pdf_cache.render_version.cache_clear()
+
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
+    assert len(calls) == 2
+
+
+def test_week_pdf_cache_invalidated_by_turni_writes(setup_db):
+    """Saving or deleting a turno in the week drops its cached PDF."""
+    from app.services import pdf_cache
+
+    headers, user_id = auth_user("invalidate@example.com")
+    client.post("/orari/", json=_shift(user_id, "2023-01-02"), headers=headers)
+
+    calls = []
+
+    def fake_write_pdf(self, target, *args, **kwargs):
+        calls.append(self.string)
+        target.write(b"%PDF-1.4 fake")
+
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
+        first = client.get("/orari/pdf?week=2023-W01", headers=headers)
+        assert pdf_cache.week_pdf_cache.stats()["files"] == 1
+
+        # a shift in another week leaves this one cached
+        client.post("/orari/", json=_shift(user_id, "2023-01-09"), headers=headers)
+        assert pdf_cache.week_pdf_cache.stats()["files"] == 1
+
+        turno = client.post(
+            "/orari/", json=_shift(user_id, "2023-01-03", "09:00:00"), headers=headers
+        ).json()
+        assert pdf_cache.week_pdf_cache.stats()["files"] == 0
+
+        second = client.get(
+            "/orari/pdf?week=2023-W01",
+            headers={**headers, "If-None-Match": first.headers["etag"]},
+        )
+        client.delete(f"/orari/{turno['id']}", headers=headers)
+        assert pdf_cache.week_pdf_cache.stats()["files"] == 0
+
+    assert len(calls) == 2
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
+    assert "09:00 – 12:00" in calls[1]
+
+
+def test_range_pdf_renders_one_page_per_week(setup_db):
+    """A month is loaded with one query and laid out in a single render."""
+    from app.crud import turno as crud_turno
+    from app.services import google_calendar
+
+    headers, user_id = auth_user("range@example.com", nome="Rossi")
+    for giorno in ("2023-01-02", "2023-01-11", "2023-01-29"):
+        client.post("/orari/", json=_shift(user_id, giorno), headers=headers)
+
+    calls = []
+
+    def fake_write_pdf(self, target, *args, **kwargs):
+        calls.append(self.string)
+        target.write(b"%PDF-1.4 fake")
+
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
+        with patch.object(
+            crud_turno, "list_between", wraps=crud_turno.list_between
+        ) as list_between:
+            with patch.object(
+                google_calendar, "list_events_between", return_value=[]
+            ) as gcal_events:
+                res = client.get(
+                    "/orari/pdf/range?start=2023-01-04&end=2023-01-31", headers=headers
+                )
+
+    assert res.status_code == 200
+    assert res.content == b"%PDF-1.4 fake"
+    assert (
+        res.headers["content-disposition"]
+        == 'attachment; filename="turni_2023-01-04_2023-01-31.pdf"'
+    )
+    assert len(calls) == 1
+    list_between.assert_called_once()
+    gcal_events.assert_called_once_with(
+        datetime(2023, 1, 2), datetime(2023, 2, 5, 23, 59, 59, 999999)
+    )
+
+    html_text = calls[0]
+    assert html_text.count("<div class='week'>") == 5
+    assert "02/01/2023 – 08/01/2023" in html_text
+    assert "30/01/2023 – 05/02/2023" in html_text
+    assert "MERCOLEDI<br>11/01/2023" in html_text
+    assert "DOMENICA<br>29/01/2023" in html_text
+    assert html_text.count("<th>Rossi</th>") == 3
+
+
+def test_range_pdf_rejects_invalid_ranges(setup_db):
+    headers, _ = auth_user("badrange@example.com")
+
+    reversed_range = client.get(
+        "/orari/pdf/range?start=2023-02-01&end=2023-01-01", headers=headers
+    )
+    too_long = client.get(
+        "/orari/pdf/range?start=2023-01-01&end=2024-06-01", headers=headers
+    )
+
+    assert reversed_range.status_code == 400
+    assert too_long.status_code == 400
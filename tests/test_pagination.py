@@ -0,0 +1,202 @@
+from datetime import date, datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+
+from app.database import engine
+from app.dependencies import SessionLocal
+from app.main import app
+from app.models.pdf_file import PDFFile
+from app.schemas.pdf_file import PDFFileResponse
+from app.services import pagination
+from app.services.pagination import NEXT_CURSOR_HEADER
+
+client = TestClient(app)
+
+
+def auth_user(email: str = "page@example.com"):
+    resp = client.post(
+        "/users/", json={"email": email, "password": "secret", "nome": "Page"}
+    )
+    user_id = resp.json()["id"]
+    token = client.post(
+        "/login", json={"email": email, "password": "secret"}
+    ).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}, user_id
+
+
+def add_turni(headers, user_id, count: int):
+    start = date(2023, 1, 1)
+    for i in range(count):
+        res = client.post(
+            "/orari/",
+            json={
+                "user_id": user_id,
+                "giorno": (start + timedelta(days=i)).isoformat(),
+                "inizio_1": "08:00:00",
+                "fine_1": "14:00:00",
+                "tipo": "NORMALE",
+            },
+            headers=headers,
+        )
+        assert res.status_code == 200
+
+
+def add_determinazioni(count: int):
+    for i in range(count):
+        res = client.post(
+            "/determinazioni/",
+            json={
+                "capitolo": "A",
+                "numero": str(i),
+                "descrizione": f"Det {i}",
+                "somma": 1.0,
+                # same deadline for all: the id breaks the ties
+                "scadenza": "2023-06-01T00:00:00",
+            },
+        )
+        assert res.status_code == 200
+
+
+def test_orari_pages_follow_cursor(setup_db):
+    headers, user_id = auth_user()
+    add_turni(headers, user_id, 5)
+
+    days, cursor, pages = [], None, 0
+    while True:
+        query = {"limit": 2}
+        if cursor:
+            query["after"] = cursor
+        res = client.get("/orari/", params=query, headers=headers)
+        assert res.status_code == 200
+        pages += 1
+        days += [t["giorno"] for t in res.json()]
+        cursor = res.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert days == [f"2023-01-0{i}" for i in range(1, 6)]
+
+
+def test_unpaginated_request_returns_everything(setup_db):
+    headers, user_id = auth_user()
+    add_turni(headers, user_id, 3)
+
+    res = client.get("/orari/", headers=headers)
+    assert len(res.json()) == 3
+    assert NEXT_CURSOR_HEADER not in res.headers
+
+
+def test_compat_off_applies_default_limit(setup_db, monkeypatch):
+    headers, user_id = auth_user()
+    add_turni(headers, user_id, 3)
+    monkeypatch.setattr(pagination.settings, "LIST_PAGINATION_COMPAT", False)
+    monkeypatch.setattr(pagination.settings, "LIST_DEFAULT_LIMIT", 2)
+
+    res = client.get("/orari/", headers=headers)
+    assert len(res.json()) == 2
+    assert NEXT_CURSOR_HEADER in res.headers
+
+
+def test_limit_is_capped(setup_db, monkeypatch):
+    headers, user_id = auth_user()
+    add_turni(headers, user_id, 3)
+    monkeypatch.setattr(pagination.settings, "LIST_MAX_LIMIT", 1)
+
+    res = client.get("/orari/", params={"limit": 50}, headers=headers)
+    assert len(res.json()) == 1
+
+
+def test_fields_projection(setup_db):
+    headers, user_id = auth_user()
+    add_turni(headers, user_id, 3)
+
+    res = client.get(
+        "/orari/", params={"fields": "giorno,tipo", "limit": 2}, headers=headers
+    )
+    assert res.status_code == 200
+    assert res.json() == [
+        {"giorno": "2023-01-01", "tipo": "NORMALE"},
+        {"giorno": "2023-01-02", "tipo": "NORMALE"},
+    ]
+
+    after = res.headers[NEXT_CURSOR_HEADER]
+    res = client.get(
+        "/orari/", params={"fields": "giorno", "after": after}, headers=headers
+    )
+    assert res.json() == [{"giorno": "2023-01-03"}]
+
+
+def test_unknown_field_and_bad_cursor_rejected(setup_db):
+    headers, _ = auth_user()
+
+    res = client.get("/orari/", params={"fields": "giorno,password"}, headers=headers)
+    assert res.status_code == 400
+    assert res.json()["detail"] == "Unknown fields: password"
+
+    res = client.get("/orari/", params={"after": "not-a-cursor"}, headers=headers)
+    assert res.status_code == 400
+    assert res.json()["detail"] == "Invalid cursor"
+
+
+def test_determinazioni_ties_broken_by_id(setup_db):
+    add_determinazioni(5)
+    everything = [d["id"] for d in client.get("/determinazioni/").json()]
+
+    seen, cursor = [], None
+    while True:
+        query = {"limit": 2, "fields": "id"}
+        if cursor:
+            query["after"] = cursor
+        res = client.get("/determinazioni/", params=query)
+        seen += [d["id"] for d in res.json()]
+        cursor = res.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+
+    assert sorted(seen) == sorted(everything)
+    assert len(set(seen)) == 5
+
+
+def test_pdf_files_without_upload_time_are_paged(setup_db):
+    # rows stored without uploaded_at have it NULL
+    with engine.begin() as conn:
+        conn.execute(
+            insert(PDFFile),
+            [
+                {"id": f"p{i}", "title": f"P{i}", "filename": f"p{i}.pdf",
+                 "uploaded_at": None if i % 2 else datetime(2024, 1, 1 + i)}
+                for i in range(5)
+            ],
+        )
+
+    seen, cursor = [], None
+    while True:
+        query = {"limit": 2, "fields": "id"}
+        if cursor:
+            query["after"] = cursor
+        res = client.get("/pdf/", params=query)
+        seen += [d["id"] for d in res.json()]
+        cursor = res.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+
+    # newest first, NULLs before every upload time
+    assert seen == ["p3", "p1", "p4", "p2", "p0"]
+
+    ascending = pagination.Keyset(
+        PDFFile, PDFFileResponse, PDFFile.uploaded_at, PDFFile.id
+    )
+    seen, cursor = [], None
+    with SessionLocal() as db:
+        while True:
+            params = pagination.ListParams(limit=2, after=cursor, fields=None)
+            page = ascending.fetch(db, select(PDFFile), params)
+            seen += [row.id for row in page.rows]
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+    # oldest first, NULLs after every upload time
+    assert seen == ["p0", "p2", "p4", "p1", "p3"]
@@ -0,0 +1,85 @@
+import os
+import time
+from datetime import date
+
+from app.services.pdf_cache import PdfCache, cache_key, iso_week
+
+
+def test_cache_key_is_stable_and_content_addressed():
+    rows = [{"giorno": "2023-01-02", "note": "a"}]
+    assert cache_key(rows, {"b": 1, "a": 2}) == cache_key(rows, {"a": 2, "b": 1})
+    assert cache_key(rows) != cache_key([{"giorno": "2023-01-02", "note": "b"}])
+
+
+def test_iso_week_label():
+    assert iso_week(date(2023, 1, 1)) == "2022-W52"
+    assert iso_week(date(2023, 1, 2)) == "2023-W01"
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=25)
+    cache.put("2023-W01", "a", b"x" * 10)
+    cache.put("2023-W02", "b", b"x" * 10)
+    # make "a" older than "b", then touch it through a hit
+    old = time.time() - 60
+    os.utime(tmp_path / "2023-W01" / "a.pdf", (old, old))
+    os.utime(tmp_path / "2023-W02" / "b.pdf", (old + 1, old + 1))
+    assert cache.get("2023-W01", "a") == b"x" * 10
+
+    cache.put("2023-W03", "c", b"x" * 10)
+
+    assert cache.get("2023-W02", "b") is None
+    assert cache.get("2023-W01", "a") is not None
+    assert cache.get("2023-W03", "c") is not None
+    assert cache.stats()["bytes"] == 20
+
+
+def test_invalidate_drops_only_given_weeks(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=1000)
+    cache.put("2023-W01", "a", b"pdf")
+    cache.put("2023-W02", "b", b"pdf")
+
+    cache.invalidate(["2023-W01"])
+
+    assert cache.get("2023-W01", "a") is None
+    assert cache.get("2023-W02", "b") == b"pdf"
+
+
+def test_oversized_pdf_not_cached(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=4)
+    cache.put("2023-W01", "a", b"too large")
+    assert cache.get("2023-W01", "a") is None
+
+
+def test_put_leaves_no_temporary_files(tmp_path, monkeypatch):
+    cache = PdfCache(str(tmp_path), max_bytes=1000)
+    cache.put("2023-W01", "a", b"pdf")
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    cache.put("2023-W01", "b", b"pdf")
+
+    assert sorted(os.listdir(tmp_path / "2023-W01")) == ["a.pdf"]
+
+
+def test_put_walks_the_directory_only_past_the_limit(tmp_path, monkeypatch):
+    cache = PdfCache(str(tmp_path), max_bytes=50)
+    cache.put("2023-W01", "a", b"x" * 10)
+    walks = []
+    files = cache._files
+    monkeypatch.setattr(cache, "_files", lambda: walks.append(1) or files())
+
+    for key in "bcd":
+        cache.put("2023-W01", key, b"x" * 10)
+    cache.put("2023-W01", "a", b"y" * 10)  # replaced: still 40 bytes
+    cache.invalidate(["2023-W01"])
+    for key in "efghi":
+        cache.put("2023-W02", key, b"x" * 10)
+    assert walks == []
+
+    cache.put("2023-W02", "j", b"x" * 10)
+
+    assert walks == [1]
+    assert len(os.listdir(tmp_path / "2023-W02")) == 5
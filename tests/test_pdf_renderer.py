@@ -0,0 +1,159 @@
+import asyncio
+import os
+import signal
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import pdf_renderer
+from app.services.pdf_renderer import RenderPool
+
+client = TestClient(app)
+
+
+def test_process_pool_renders_in_worker():
+    pool = RenderPool(workers=1, queue_limit=0)
+    try:
+        pdf = asyncio.run(pool.render("<html><body>ciao</body></html>"))
+    finally:
+        pool.shutdown()
+
+    assert pdf.startswith(b"%PDF")
+    stats = pool.stats()
+    assert stats["renders"] == 1
+    assert stats["failures"] == 0
+    assert stats["in_flight"] == 0
+
+
+def _hang(html, base_url):
+    """Stand-in for a document whose layout never ends (runs in the worker)."""
+    time.sleep(60)
+
+
+def test_killed_worker_is_replaced():
+    pool = RenderPool(workers=1, queue_limit=0)
+    try:
+        pool.start()
+        for process in list(pool._executor._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(pool.render("<p>lost</p>"))
+        pdf = asyncio.run(pool.render("<p>again</p>"))
+    finally:
+        pool.shutdown()
+
+    assert exc.value.status_code == 503
+    assert pdf.startswith(b"%PDF")
+    stats = pool.stats()
+    assert stats["restarts"] == 1
+    assert stats["renders"] == 1
+    assert stats["in_flight"] == 0
+
+
+def _nap(html, base_url):
+    """Render that takes 0.6s (runs in the worker)."""
+    time.sleep(0.6)
+    return b"%PDF-1.4 nap", 0.6
+
+
+def test_render_timeout_keeps_the_worker():
+    pool = RenderPool(workers=1, queue_limit=0, timeout=2)
+    try:
+        pool.start()
+        executor = pool._executor
+        with patch("app.services.pdf_renderer._timed_render", _hang):
+            started = time.perf_counter()
+            with pytest.raises(HTTPException) as exc:
+                asyncio.run(pool.render("<p>slow</p>"))
+            elapsed = time.perf_counter() - started
+        pdf = asyncio.run(pool.render("<p>next</p>"))
+        kept = pool._executor is executor
+    finally:
+        pool.shutdown()
+
+    assert exc.value.status_code == 504
+    assert elapsed < 30
+    assert pdf.startswith(b"%PDF")
+    assert kept
+    stats = pool.stats()
+    assert (stats["timeouts"], stats["restarts"]) == (1, 0)
+    assert stats["renders"] == 1
+
+
+def test_queued_time_does_not_count_toward_timeout():
+    # three 0.6s renders on one worker: the last one waits 1.2s in the queue
+    pool = RenderPool(workers=1, queue_limit=2, timeout=1)
+
+    async def scenario():
+        return await asyncio.gather(
+            *(pool.render(f"<p>{i}</p>") for i in range(3))
+        )
+
+    try:
+        pool.start()
+        with patch("app.services.pdf_renderer._timed_render", _nap):
+            pdfs = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+    assert pdfs == [b"%PDF-1.4 nap"] * 3
+    stats = pool.stats()
+    assert (stats["timeouts"], stats["restarts"], stats["renders"]) == (0, 0, 3)
+
+
+def test_queue_limit_rejects_with_503():
+    pool = RenderPool(workers=0, queue_limit=0)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_render(html, base_url):
+        started.set()
+        release.wait(5)
+        return b"%PDF-1.4 slow", 0.01
+
+    async def scenario():
+        first = asyncio.create_task(pool.render("<p>one</p>"))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        with pytest.raises(HTTPException) as exc:
+            await pool.render("<p>two</p>")
+        release.set()
+        return await first, exc.value
+
+    with patch("app.services.pdf_renderer._timed_render", side_effect=slow_render):
+        pdf, error = asyncio.run(scenario())
+
+    assert pdf == b"%PDF-1.4 slow"
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "1"
+    stats = pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["renders"] == 1
+    assert stats["max_render_seconds"] == pytest.approx(0.01)
+
+
+def test_render_failures_are_counted():
+    pool = RenderPool(workers=0, queue_limit=1)
+
+    with patch(
+        "weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=OSError("boom")
+    ):
+        with pytest.raises(OSError):
+            asyncio.run(pool.render("<p>x</p>"))
+
+    assert pool.stats()["failures"] == 1
+    assert pool.stats()["in_flight"] == 0
+
+
+def test_pdf_route_returns_503_when_renderer_busy(setup_db, monkeypatch):
+    monkeypatch.setattr(pdf_renderer.pool, "_in_flight", pdf_renderer.pool.capacity)
+
+    res = client.get("/inventory/pdf?year=2023")
+
+    assert res.status_code == 503
+    assert res.headers["retry-after"] == "1"
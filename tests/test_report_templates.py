@@ -0,0 +1,309 @@
+from datetime import date, timedelta
+import html as html_utils
+import os
+import re
+
+import pytest
+
+from app.main import app  # noqa: F401 - registers every model
+from app.models.segnaletica_orizzontale import SegnaleticaOrizzontale
+from app.database import SessionLocal
+from app.services.excel_import import df_to_html
+from app.services.inventory_pdf import build_inventory_html
+from app.services.report_templates import (
+    LOGO_PATH,
+    WEEK_SCHEDULE,
+    logo_url,
+    render_report,
+)
+from app.services.segnaletica_orizzontale_pdf import (
+    build_segnaletica_orizzontale_html,
+)
+from app.services.shift_grid import _group_by_day, _week_context
+
+
+def _week_rows(agents: int = 12) -> list[dict]:
+    start = date(2024, 1, 1)
+    rows = []
+    for a in range(agents):
+        for d in range(7):
+            rows.append(
+                {
+                    "Agente": f"Agente {a}",
+                    "giorno": (start + timedelta(days=d)).isoformat(),
+                    "inizio_1": "08:00:00",
+                    "fine_1": "12:00:00",
+                    "inizio_2": "14:00:00" if d % 2 else None,
+                    "fine_2": "18:00:00" if d % 2 else None,
+                    "tipo": "FERIE" if d == 6 else "NORMALE",
+                    "note": f"nota {a}" if d == 0 else "",
+                }
+            )
+    return rows
+
+
+def test_logo_url_resolved_once():
+    assert logo_url().startswith("file://")
+    assert logo_url().endswith("/static/Logo.png")
+    assert logo_url.cache_info().hits >= 1
+
+
+def test_inventory_names_are_escaped():
+    items = [{"name": "<script>x</script>", "count": 2}]
+    html = build_inventory_html(items, 2024)
+
+    assert "&lt;script&gt;x&lt;/script&gt;" in html
+    assert "<script>" not in html
+    assert "<td>2</td>" in html
+
+
+def test_week_schedule_cells():
+    html = df_to_html(_week_rows(agents=1), None, ({}, {}))
+
+    assert "<th>Agente 0</th>" in html
+    assert "<td>08:00 – 12:00<br>14:00 – 18:00</td>" in html
+    assert "<span class='dayoff'>FERIE</span>" in html
+    assert "<li>nota 0</li>" in html
+
+
+def test_week_schedule_overtime_segment():
+    rows = [
+        {
+            "Agente": "Agent",
+            "giorno": "2024-01-01",
+            "inizio_1": "08:00",
+            "fine_1": "12:00",
+            "inizio_3": "20:00",
+            "fine_3": "22:00",
+            "tipo": "NORMALE",
+            "note": "",
+        }
+    ]
+
+    html = df_to_html(rows, None, ({}, {}))
+
+    assert (
+        "08:00 – 12:00<br>"
+        "<span class='extra'>20:00 – 22:00 STRAORDINARIO</span>" in html
+    )
+
+
+def test_horizontal_signage_rows(setup_db):
+    db = SessionLocal()
+    try:
+        db.add_all(
+            SegnaleticaOrizzontale(
+                azienda="ACME", descrizione=f"Via {i}", anno=2024
+            )
+            for i in range(200)
+        )
+        db.add(
+            SegnaleticaOrizzontale(
+                azienda="ACME", descrizione="Old", anno=2023
+            )
+        )
+        db.commit()
+        html = build_segnaletica_orizzontale_html(db, 2024)
+    finally:
+        db.close()
+    assert html.count("<tr>") == 201
+    assert "Via 199" in html
+    assert "Old" not in html
+
+
+def test_inventory_rows():
+    items = [{"name": f"Segnale {i}", "count": i} for i in range(200)]
+    html = build_inventory_html(items, 2024)
+    assert html.count("<tr>") == 201
+    assert "<td>Segnale 199</td><td>199</td>" in html
+
+
+# The f-string builders replaced by the templates, kept to benchmark them
+# against ``report_templates``. Only the logo ``src`` is changed, to the
+# ``file://`` URL the templates use, so that both outputs can be compared.
+
+
+def _fstring_week_table(week: dict) -> str:
+    table_header = (
+        "<tr><th>DATA</th>"
+        + "".join(
+            f"<th>{html_utils.escape(str(a))}</th>" for a in week["agents"]
+        )
+        + "<th>ANNOTAZIONI DI SERVIZIO</th></tr>"
+    )
+    rows_html = []
+    for day in week["days"]:
+        cells = [f"<td>{day['weekday']}<br>{day['date']}</td>"]
+        for cell in day["cells"]:
+            if cell["dayoff"]:
+                text = f"<span class='dayoff'>{cell['dayoff']}</span>"
+            else:
+                segments = list(cell["segments"])
+                if cell["extra"]:
+                    segments.append(
+                        f"<span class='extra'>{cell['extra']} "
+                        "STRAORDINARIO</span>"
+                    )
+                text = "<br>".join(segments)
+            cells.append(f"<td>{text}</td>")
+        note_lines = [html_utils.escape(n) for n in day["notes"]]
+        if note_lines:
+            items = "".join(f"<li>{n}</li>" for n in note_lines)
+            note_text = f"<ul>{items}</ul>"
+        else:
+            note_text = ""
+        cells.append(f"<td class='notes'>{note_text}</td>")
+        rows_html.append("<tr>" + "".join(cells) + "</tr>")
+
+    return f"""
+    <table>
+    {table_header}
+    {''.join(rows_html)}
+    </table>
+    """
+
+
+def _fstring_horizontal_signage(db, year: int) -> str:
+    rows = (
+        db.query(
+            SegnaleticaOrizzontale.azienda, SegnaleticaOrizzontale.descrizione
+        )
+        .filter(SegnaleticaOrizzontale.anno == year)
+        .order_by(SegnaleticaOrizzontale.descrizione)
+        .all()
+    )
+    descrizioni = [r.descrizione for r in rows]
+    aziende = {r.azienda for r in rows}
+    azienda = aziende.pop() if len(aziende) == 1 else ""
+
+    styles = """
+    <style>
+    @page { size: A4; margin: 10mm; }
+    body { font-family: Aptos, sans-serif; font-size: 10pt; }
+    table { border-collapse: collapse; width: 100%; page-break-inside: avoid; }
+    th, td { border: 1px solid #000; padding: 4px; text-align: left; }
+    </style>
+    """
+    assert os.path.exists(LOGO_PATH)
+    rows_html = "".join(
+        f"<tr><td>{html_utils.escape(d)}</td></tr>" for d in descrizioni
+    )
+    azienda_html = (
+        f"<h2 style='text-align:center;'>Azienda incaricata: "
+        f"{html_utils.escape(azienda)}</h2>"
+        if azienda
+        else ""
+    )
+    logo_style = "style='width:70px; margin-right:8px;'"
+    title = f"Piano Segnaletica Orizzontale Anno {year}"
+    return f"""
+    <html>
+    <head>
+    <meta charset='utf-8'>
+    {styles}
+    </head>
+    <body>
+    <div style='display:flex; align-items:center; margin-bottom:10px;'>
+        <img src='{logo_url()}' alt='logo' {logo_style} />
+        <h1 style='text-align:center; flex-grow:1; margin:0;'>{title}</h1>
+    </div>
+    {azienda_html}
+    <table>
+    <tr><th>Lavori da eseguire</th></tr>
+    {rows_html}
+    </table>
+    </body>
+    </html>
+    """
+
+
+def _fstring_inventory(items: list[dict], year: int) -> str:
+    rows_html = "".join(
+        f"<tr><td>{item.get('name', '')}</td>"
+        f"<td>{item.get('count', '')}</td></tr>"
+        for item in items
+    )
+    return f"""
+    <html>
+    <body>
+    <h1>Inventario {year}</h1>
+    <h1 style='font-size:64px; color:yellow;'>🚧 LAVORI IN CORSO 🚧</h1>
+    <table border='1' style='border-collapse:collapse;'>
+        <tr><th>Nome</th><th>Quantità</th></tr>
+        {rows_html}
+    </table>
+    </body>
+    </html>
+    """
+
+
+def _normalized(html: str) -> str:
+    """``html`` without the line breaks and indentation between tags."""
+    return re.sub(r"\s*\n\s*", "", html)
+
+
+def _table(html: str) -> str:
+    start = html.index("<table>")
+    end = html.index("</table>") + len("</table>")
+    return html[start:end]
+
+
+OTHER = {"fstring": "jinja", "jinja": "fstring"}
+
+
+@pytest.mark.benchmark(group="report-html-week")
+@pytest.mark.parametrize("builder", ["fstring", "jinja"])
+def test_benchmark_week_schedule_html(benchmark, builder):
+    rows = _week_rows()
+    by_day = _group_by_day(rows, {})
+    week = _week_context(by_day, sorted(by_day), min(by_day), {}, {})
+
+    def jinja():
+        page = render_report(WEEK_SCHEDULE, logo_url=logo_url(), weeks=[week])
+        # the pages differ around the table (one page per week now)
+        return _table(page)
+
+    build = {"fstring": lambda: _fstring_week_table(week), "jinja": jinja}
+    html = benchmark(build[builder])
+
+    other = build[OTHER[builder]]()
+    assert _normalized(html) == _normalized(other)
+    assert html.count("<tr>") == 8
+
+
+@pytest.mark.benchmark(group="report-html-signage")
+@pytest.mark.parametrize("builder", ["fstring", "jinja"])
+def test_benchmark_horizontal_signage_html(setup_db, benchmark, builder):
+    build = {
+        "fstring": _fstring_horizontal_signage,
+        "jinja": build_segnaletica_orizzontale_html,
+    }
+    db = SessionLocal()
+    try:
+        db.add_all(
+            SegnaleticaOrizzontale(
+                azienda="Strade & Co", descrizione=f"Via <{i}>", anno=2024
+            )
+            for i in range(200)
+        )
+        db.commit()
+        html = benchmark(build[builder], db, 2024)
+        other = build[OTHER[builder]](db, 2024)
+    finally:
+        db.close()
+
+    assert _normalized(html) == _normalized(other)
+    assert html.count("<tr>") == 201
+
+
+@pytest.mark.benchmark(group="report-html-inventory")
+@pytest.mark.parametrize("builder", ["fstring", "jinja"])
+def test_benchmark_inventory_html(benchmark, builder):
+    build = {"fstring": _fstring_inventory, "jinja": build_inventory_html}
+    items = [{"name": f"Segnale {i}", "count": i} for i in range(200)]
+
+    html = benchmark(build[builder], items, 2024)
+
+    other = build[OTHER[builder]](items, 2024)
+    assert _normalized(html) == _normalized(other)
+    assert html.count("<tr>") == 201
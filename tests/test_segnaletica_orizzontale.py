@@ -1,5 +1,4 @@
 from fastapi.testclient import TestClient
-from pathlib import Path
 from unittest.mock import patch
 import os
 import datetime
@@ -92,27 +91,13 @@ def test_plan_pdf_single_azienda(setup_db, tmp_path):
     )
 
     captured = {}
-    real_build = __import__(
-        "app.services.segnaletica_orizzontale_pdf",
-        fromlist=["build_segnaletica_orizzontale_pdf"],
-    ).build_segnaletica_orizzontale_pdf
 
     def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
+        captured["text"] = self.string
+        target.write(b"%PDF-1.4 fake")
 
-    def capture_build(db, year):
-        pdf_path, html_path = real_build(db, year)
-        captured["pdf"] = pdf_path
-        captured["html"] = html_path
-        captured["text"] = Path(html_path).read_text()
-        return pdf_path, html_path
-
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
-        with patch(
-            "app.routes.signage_horizontal.build_segnaletica_orizzontale_pdf",
-            side_effect=capture_build,
-        ):
-            res = client.get("/segnaletica-orizzontale/pdf?year=2024")
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
+        res = client.get("/segnaletica-orizzontale/pdf?year=2024")
 
     assert res.status_code == 200
     assert "Linea 1" in captured["text"]
@@ -120,8 +105,7 @@ def test_plan_pdf_single_azienda(setup_db, tmp_path):
     assert "Azienda incaricata" in captured["text"]
     assert "Solo" in captured["text"]
     assert "Logo.png" in captured["text"]
-    assert not os.path.exists(captured["pdf"])
-    assert not os.path.exists(captured["html"])
+    assert res.content == b"%PDF-1.4 fake"
 
 
 def test_plan_pdf_multiple_aziende(setup_db, tmp_path):
@@ -135,35 +119,20 @@ def test_plan_pdf_multiple_aziende(setup_db, tmp_path):
     )
 
     captured = {}
-    real_build = __import__(
-        "app.services.segnaletica_orizzontale_pdf",
-        fromlist=["build_segnaletica_orizzontale_pdf"],
-    ).build_segnaletica_orizzontale_pdf
 
     def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
+        captured["text"] = self.string
+        target.write(b"%PDF-1.4 fake")
 
-    def capture_build(db, year):
-        pdf_path, html_path = real_build(db, year)
-        captured["text"] = Path(html_path).read_text()
-        captured["pdf"] = pdf_path
-        captured["html"] = html_path
-        return pdf_path, html_path
-
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
-        with patch(
-            "app.routes.signage_horizontal.build_segnaletica_orizzontale_pdf",
-            side_effect=capture_build,
-        ):
-            res = client.get("/segnaletica-orizzontale/pdf?year=2023")
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
+        res = client.get("/segnaletica-orizzontale/pdf?year=2023")
 
     assert res.status_code == 200
     assert "Desc" in captured["text"]
     assert "Other" in captured["text"]
     assert "Azienda incaricata" not in captured["text"]
     assert "A" not in captured["text"] or "B" not in captured["text"]
-    assert not os.path.exists(captured["pdf"])
-    assert not os.path.exists(captured["html"])
+    assert res.content == b"%PDF-1.4 fake"
 
 
 def test_import_signage_horizontal_creates_records_and_returns_pdf(setup_db, tmp_path):
@@ -177,17 +146,11 @@ def test_import_signage_horizontal_creates_records_and_returns_pdf(setup_db, tmp
         ]
 
     def fake_build(db, year):
-        pdf = tmp_path / "plan.pdf"
-        html = tmp_path / "plan.html"
-        pdf.write_bytes(b"%PDF-1.4 fake")
-        html.write_text("x")
-        captured["pdf"] = str(pdf)
-        captured["html"] = str(html)
-        return str(pdf), str(html)
+        return "<html><body>piano</body></html>"
 
     with patch("app.routes.signage_horizontal.parse_file", side_effect=fake_parse):
         with patch(
-            "app.routes.signage_horizontal.build_segnaletica_orizzontale_pdf",
+            "app.routes.signage_horizontal.build_segnaletica_orizzontale_html",
             side_effect=fake_build,
         ):
             dummy = tmp_path / "imp.xlsx"
@@ -207,8 +170,7 @@ def test_import_signage_horizontal_creates_records_and_returns_pdf(setup_db, tmp
     assert res.status_code == 200
     assert res.headers["content-type"] == "application/pdf"
     assert not os.path.exists(captured["xlsx"])
-    assert not os.path.exists(captured["pdf"])
-    assert not os.path.exists(captured["html"])
+    assert res.content == b"%PDF-1.4 stub"
     assert len(client.get("/segnaletica-orizzontale/").json()) == 2
 
 
@@ -1,6 +1,4 @@
-import os
 from datetime import date
-from pathlib import Path
 from unittest.mock import patch
 
 import pandas as pd
@@ -28,23 +26,22 @@ def test_parse_and_pdf_generation(setup_db, tmp_path):
     for row in rows:
         crud.create_segnaletica_orizzontale(db, SegnaleticaOrizzontaleCreate(**row))
 
+    captured = {}
+
     def fake_write_pdf(self, target, *args, **kwargs):
-        Path(target).write_bytes(b"%PDF-1.4 fake")
+        captured["html"] = self.string
+        target.write(b"%PDF-1.4 fake")
 
-    with patch("weasyprint_stub.HTML.write_pdf", side_effect=fake_write_pdf):
-        pdf_path, html_path = build_segnaletica_orizzontale_pdf(db, date.today().year)
+    with patch("weasyprint_stub.HTML.write_pdf", autospec=True, side_effect=fake_write_pdf):
+        pdf = build_segnaletica_orizzontale_pdf(db, date.today().year)
 
-    html_text = Path(html_path).read_text()
+    assert pdf == b"%PDF-1.4 fake"
+    html_text = captured["html"]
     assert "ACME" in html_text
     assert "Linea" in html_text
     assert "Stop" in html_text
     assert "Logo.png" in html_text
 
-    os.remove(pdf_path)
-    os.remove(html_path)
-    assert not os.path.exists(pdf_path)
-    assert not os.path.exists(html_path)
-
     records = crud.get_segnaletica_orizzontale(db)
     assert len(records) == 2
     db.close()
@@ -0,0 +1,186 @@
+import os
+import subprocess
+import sys
+from collections import namedtuple
+from datetime import date, time
+from pathlib import Path
+
+from app.database import SessionLocal
+from app.models.turno import Turno
+from app.models.user import User
+from app.services.report_templates import logo_url
+from app.services.shift_grid import _fmt_time, df_to_html, weeks_to_html
+
+GOLDEN = Path(__file__).parent / "golden"
+
+
+def _row(agente, giorno, *slots, tipo="NORMALE", note=""):
+    """Grid row with up to three (start, end) time slots."""
+    slots += ((None, None),) * (3 - len(slots))
+    row = {"Agente": agente, "giorno": giorno}
+    for n, (inizio, fine) in enumerate(slots, 1):
+        row[f"inizio_{n}"] = inizio
+        row[f"fine_{n}"] = fine
+    return {**row, "tipo": tipo, "note": note}
+
+
+ROWS = [
+    _row(
+        "Rossi",
+        "2024-03-04",
+        ("08:00:00", "14:00:00"),
+        note="pattuglia <centro> scrivere a capo@example.com",
+    ),
+    _row(
+        "Bianchi",
+        "2024-03-04",
+        ("07:30", "12:00"),
+        ("14:00", "17:30"),
+        ("20:00:00", "23:00:00"),
+    ),
+    _row("Rossi", "2024-03-05", tipo="FERIE"),
+    _row(
+        "Verdi & Figli",
+        "2024-03-06",
+        ("09:00:00", "13:00:00"),
+        note="mercato",
+    ),
+    _row("Bianchi", "2024-03-10", ("08:00:00", "12:00:00"), tipo="RIPOSO"),
+    _row("Rossi", "2024-03-13", ("10:00:00", "16:00:00")),
+]
+NOTES = (
+    {"04/03/2024": ["Consiglio comunale"], "13/03/2024": ["Fiera"]},
+    {"06/03/2024": ["Processione <S. Giuseppe>"]},
+)
+
+
+def _golden(name: str) -> str:
+    return (GOLDEN / name).read_text()
+
+
+def _normalized(html: str) -> str:
+    return html.replace(logo_url(), "LOGO")
+
+
+def _as_time(value):
+    return time.fromisoformat(value) if value else None
+
+
+def test_week_grid_matches_golden():
+    html = df_to_html(ROWS[:5], None, NOTES)
+    assert _normalized(html) == _golden("turni_settimana.html")
+
+
+def test_range_grid_matches_golden():
+    html = weeks_to_html(
+        ROWS, None, date(2024, 3, 4), date(2024, 3, 24), NOTES
+    )
+    assert _normalized(html) == _golden("turni_range.html")
+
+
+def test_grid_accepts_tuples_with_python_values():
+    Row = namedtuple("Row", list(ROWS[0]))
+    rows = [
+        Row(
+            **{
+                **r,
+                "giorno": date.fromisoformat(r["giorno"]),
+                **{
+                    k: _as_time(r[k])
+                    for k in r
+                    if k.startswith(("inizio", "fine"))
+                },
+            }
+        )
+        for r in ROWS
+    ]
+
+    html = weeks_to_html(
+        rows, None, date(2024, 3, 4), date(2024, 3, 24), NOTES
+    )
+
+    assert _normalized(html) == _golden("turni_range.html")
+
+
+def test_grid_accepts_turno_orm_rows(setup_db):
+    db = SessionLocal()
+    try:
+        for i, nome in enumerate(("Rossi", "Bianchi", "Verdi & Figli")):
+            db.add(
+                User(
+                    id=f"u{i}",
+                    email=f"u{i}@example.com",
+                    nome=nome,
+                    hashed_password="x",
+                )
+            )
+        ids = {"Rossi": "u0", "Bianchi": "u1", "Verdi & Figli": "u2"}
+        for n, r in enumerate(ROWS[:5]):
+            db.add(
+                Turno(
+                    id=f"t{n}",
+                    user_id=ids[r["Agente"]],
+                    giorno=date.fromisoformat(r["giorno"]),
+                    inizio_1=_as_time(r["inizio_1"]),
+                    fine_1=_as_time(r["fine_1"]),
+                    inizio_2=_as_time(r["inizio_2"]),
+                    fine_2=_as_time(r["fine_2"]),
+                    inizio_3=_as_time(r["inizio_3"]),
+                    fine_3=_as_time(r["fine_3"]),
+                    tipo=r["tipo"],
+                    note=r["note"],
+                )
+            )
+        db.commit()
+
+        turni = db.query(Turno).order_by(Turno.id).all()
+        html = df_to_html(turni, db, NOTES)
+    finally:
+        db.close()
+
+    assert _normalized(html) == _golden("turni_settimana.html")
+
+
+def test_fmt_time_without_parsing():
+    assert _fmt_time(time(8, 5)) == "08:05"
+    assert _fmt_time("08:00:00") == "08:00"
+    assert _fmt_time("8:30") == "08:30"
+    assert _fmt_time("07:45:00.000001") == "07:45"
+    assert _fmt_time("mattina") == "mattina"
+    assert _fmt_time(None) == ""
+
+
+def test_days_sorted_by_date_across_months():
+    rows = [
+        {
+            "Agente": "A",
+            "giorno": g,
+            "inizio_1": "08:00",
+            "fine_1": "12:00",
+            "tipo": "NORMALE",
+        }
+        for g in ("2024-03-01", "2024-02-26", "2024-02-29")
+    ]
+
+    html = df_to_html(rows, None, ({}, {}))
+
+    positions = [
+        html.index(day) for day in ("26/02/2024", "29/02/2024", "01/03/2024")
+    ]
+    assert positions == sorted(positions)
+
+
+def test_shift_grid_does_not_import_pandas():
+    code = (
+        "import sys, app.services.shift_grid; "
+        "print('pandas' in sys.modules)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[1],
+        env={**os.environ, "SECRET_KEY": os.environ.get("SECRET_KEY", "x")},
+    )
+    assert out.stdout.strip() == "False"
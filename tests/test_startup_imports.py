@@ -0,0 +1,57 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# libraries that must only load when a request needs them
+HEAVY = {
+    "pandas",
+    "numpy",
+    "weasyprint",
+    "googleapiclient",
+    "openpyxl",
+    "httplib2",
+}
+
+# generous default: the heavy imports alone used to add more than this much
+BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "2500"))
+
+SCRIPT = """
+import json, sys
+before = set(sys.modules)
+import app.main
+print(json.dumps(sorted(set(sys.modules) - before)))
+"""
+
+
+def _import_app():
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+        env={**os.environ, "SECRET_KEY": os.environ.get("SECRET_KEY", "x")},
+    )
+
+
+def test_import_app_main_skips_heavy_libraries_and_fits_budget():
+    result = _import_app()
+
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    heavy = sorted(m for m in loaded if m.split(".")[0] in HEAVY)
+    assert heavy == []
+
+    # "import time: self [us] | cumulative | name" for the top-level import
+    match = re.search(
+        r"import time:\s+\d+ \|\s+(\d+) \| app\.main$", result.stderr, re.M
+    )
+    assert match is not None
+    cumulative_ms = int(match.group(1)) / 1000
+    assert (
+        cumulative_ms < BUDGET_MS
+    ), f"import app.main took {cumulative_ms:.0f} ms"
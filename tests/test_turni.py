@@ -2,6 +2,7 @@ from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
 from app.schemas.turno import TipoTurno
 
+from app.config import settings
 from app.main import app
 
 client = TestClient(app)
@@ -206,7 +207,7 @@ def test_create_turno_day_off_allows_missing_times(setup_db):
         "note": "",
     }
 
-    with patch("app.services.gcal.sync_shift_event") as fake_sync:
+    with patch("app.services.gcal.sync_shift_events") as fake_sync:
         res = client.post("/orari/", json=data, headers=headers)
     assert res.status_code == 200
     fake_sync.assert_not_called()
@@ -231,7 +232,7 @@ def test_create_turno_recupero_skips_gcal_sync(setup_db):
         "note": "",
     }
 
-    with patch("app.services.gcal.sync_shift_event") as fake_sync:
+    with patch("app.services.gcal.sync_shift_events") as fake_sync:
         res = client.post("/orari/", json=data, headers=headers)
 
     assert res.status_code == 200
@@ -240,8 +241,9 @@ def test_create_turno_recupero_skips_gcal_sync(setup_db):
     assert payload["tipo"] == "RECUPERO"
 
 
-def test_delete_turno_calls_gcal(setup_db):
+def test_delete_turno_calls_gcal(setup_db, monkeypatch):
     """Deleting a turno should remove the matching Google Calendar event."""
+    monkeypatch.setattr(settings, "G_SHIFT_CAL_ID", "CAL")
     headers, user_id = auth_user("gcaldelete@example.com")
     data = {
         "user_id": user_id,
@@ -259,11 +261,20 @@ def test_delete_turno_calls_gcal(setup_db):
     res = client.post("/orari/", json=data, headers=headers)
     turno_id = res.json()["id"]
 
-    with patch("app.services.gcal.delete_shift_event") as fake_delete:
+    from app.dependencies import SessionLocal
+    from app.services import calendar_outbox
+
+    with patch(
+        "app.services.gcal.delete_shift_events", return_value={}
+    ) as fake_delete:
         del_res = client.delete(f"/orari/{turno_id}", headers=headers)
+        fake_delete.assert_not_called()
+        db = SessionLocal()
+        calendar_outbox.drain_once(db)
+        db.close()
 
     assert del_res.status_code == 200
-    fake_delete.assert_called_once_with(turno_id)
+    fake_delete.assert_called_once_with([turno_id])
 
 
 def test_delete_turno_day_off_skips_gcal(setup_db):
@@ -285,7 +296,7 @@ def test_delete_turno_day_off_skips_gcal(setup_db):
     res = client.post("/orari/", json=data, headers=headers)
     turno_id = res.json()["id"]
 
-    with patch("app.services.gcal.delete_shift_event") as fake_delete:
+    with patch("app.services.gcal.delete_shift_events") as fake_delete:
         del_res = client.delete(f"/orari/{turno_id}", headers=headers)
 
     assert del_res.status_code == 200
@@ -297,8 +308,217 @@ def test_delete_turno_invalid_id_skips_gcal(setup_db):
     headers, _ = auth_user("missing@example.com")
     fake_id = "11111111-1111-1111-1111-111111111111"
 
-    with patch("app.services.gcal.delete_shift_event") as fake_delete:
+    with patch("app.services.gcal.delete_shift_events") as fake_delete:
         res = client.delete(f"/orari/{fake_id}", headers=headers)
 
     assert res.status_code == 404
     fake_delete.assert_not_called()
+
+
+def test_bulk_upsert_turni_creates_and_updates(setup_db, monkeypatch):
+    """Bulk upserts update rows in place and keep the last duplicate."""
+    monkeypatch.setattr(settings, "G_SHIFT_CAL_ID", "CAL")
+    from datetime import date, time
+    from sqlalchemy import event
+    from app.dependencies import SessionLocal
+    from app.crud import turno as crud_turno
+    from app.schemas.turno import TurnoIn
+    from app.services import calendar_outbox
+
+    headers, user_id = auth_user("bulk@example.com")
+    first = client.post(
+        "/orari/",
+        json={
+            "user_id": user_id,
+            "giorno": "2024-03-01",
+            "inizio_1": "08:00:00",
+            "fine_1": "12:00:00",
+            "tipo": TipoTurno.NORMALE.value,
+            "note": "",
+        },
+        headers=headers,
+    ).json()
+
+    payloads = [
+        TurnoIn(
+            user_id=user_id,
+            giorno=date(2024, 3, day),
+            inizio_1=time(7, 0),
+            fine_1=time(13, 0),
+            tipo=TipoTurno.NORMALE,
+            note=f"day {day}",
+        )
+        for day in range(1, 31)
+    ]
+    payloads.append(
+        TurnoIn(user_id=user_id, giorno=date(2024, 3, 2), tipo=TipoTurno.FERIE)
+    )
+
+    db = SessionLocal()
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", count)
+    try:
+        records = crud_turno.bulk_upsert_turni(db, payloads)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", count)
+
+    assert len(records) == 30
+    # users, existing turni, pending outbox rows, final reload
+    assert len([s for s in statements if s.lstrip().startswith("SELECT")]) <= 4
+
+    with patch(
+        "app.services.gcal.sync_shift_events", return_value={}
+    ) as fake_sync:
+        calendar_outbox.drain_once(db, limit=100)
+    fake_sync.assert_called_once()  # one batched call for all turni
+    assert len(fake_sync.call_args.args[0]) == 30
+    db.close()
+
+    body = client.get("/orari/", headers=headers).json()
+    assert len(body) == 30
+    by_day = {t["giorno"]: t for t in body}
+    assert by_day["2024-03-01"]["id"] == first["id"]
+    assert by_day["2024-03-01"]["inizio_1"] == "07:00:00"
+    assert by_day["2024-03-02"]["tipo"] == "FERIE"
+
+
+def test_bulk_upsert_turni_unknown_user(setup_db):
+    from datetime import date, time
+    from app.dependencies import SessionLocal
+    from app.crud import turno as crud_turno
+    from app.schemas.turno import TurnoIn
+    from fastapi import HTTPException
+    import pytest
+
+    db = SessionLocal()
+    payload = TurnoIn(
+        user_id="missing",
+        giorno=date(2024, 3, 1),
+        inizio_1=time(8, 0),
+        fine_1=time(12, 0),
+        tipo=TipoTurno.NORMALE,
+    )
+    with pytest.raises(HTTPException) as exc:
+        crud_turno.bulk_upsert_turni(db, [payload])
+    db.close()
+
+    assert exc.value.status_code == 400
+    assert exc.value.detail == "Unknown user"
+
+
+def test_bulk_upsert_statement_uses_on_conflict():
+    from sqlalchemy.dialects import postgresql
+    from app.crud.turno import upsert_statement
+
+    stmt = upsert_statement(
+        [
+            {
+                "id": "1",
+                "user_id": "u",
+                "giorno": "2024-01-01",
+                "tipo": "NORMALE",
+            }
+        ]
+    )
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "ON CONFLICT (user_id, giorno) DO UPDATE" in sql
+    assert "inizio_1 = excluded.inizio_1" in sql
+
+
+def test_turni_queries_use_indexes(setup_db):
+    """The turni lookups are served by the composite and ``giorno`` indexes."""
+    from datetime import date
+    from sqlalchemy import event
+    from app.dependencies import SessionLocal
+    from app.crud import turno as crud_turno
+    from app.models.user import User
+
+    db = SessionLocal()
+    user = User(
+        id="u1", email="idx@example.com", nome="Idx", hashed_password="x"
+    )
+    db.add(user)
+    db.commit()
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, *args):
+        if "FROM turni" in statement:
+            captured.append((statement, parameters))
+
+    bind = db.get_bind()
+    event.listen(bind, "before_cursor_execute", capture)
+    try:
+        db.query(crud_turno.Turno).filter_by(
+            user_id="u1", giorno=date(2024, 1, 1)
+        ).first()
+        crud_turno.list_between(db, date(2024, 1, 1), date(2024, 1, 7))
+        crud_turno.get_turni(db, user)
+    finally:
+        event.remove(bind, "before_cursor_execute", capture)
+
+    plans = []
+    with bind.connect() as conn:
+        for statement, parameters in captured:
+            rows = conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN " + statement, parameters
+            ).all()
+            plans.append(" ".join(str(r[-1]) for r in rows))
+    db.close()
+
+    upsert_plan, range_plan, user_plan = plans
+    assert "ux_turni_user_id_giorno" in upsert_plan
+    assert "ix_turni_giorno" in range_plan
+    assert "ux_turni_user_id_giorno" in user_plan
+    assert "TEMP B-TREE" not in range_plan + user_plan
+
+
+def _turni_index_migration():
+    import importlib.util
+    from pathlib import Path
+
+    path = (
+        Path(__file__).resolve().parents[1]
+        / "migrations/versions/0015_add_turni_indexes.py"
+    )
+    spec = importlib.util.spec_from_file_location("turni_indexes", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_turni_index_migration_refuses_duplicates():
+    """Duplicate user/day rows stop the migration instead of being deleted."""
+    import pytest
+    import sqlalchemy as sa
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+
+    migration = _turni_index_migration()
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE turni "
+            "(id VARCHAR PRIMARY KEY, user_id VARCHAR, giorno DATE)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO turni VALUES ('a', 'u1', '2024-01-01'), "
+            "('b', 'u1', '2024-01-01'), ('c', 'u2', '2024-01-01')"
+        )
+        with Operations.context(MigrationContext.configure(conn)):
+            with pytest.raises(RuntimeError) as exc:
+                migration.upgrade()
+        assert "user_id=u1 giorno=2024-01-01 (2 rows)" in str(exc.value)
+        assert "u2" not in str(exc.value)
+        assert conn.exec_driver_sql("SELECT COUNT(*) FROM turni").scalar() == 3
+
+        conn.exec_driver_sql("DELETE FROM turni WHERE id = 'b'")
+        with Operations.context(MigrationContext.configure(conn)):
+            migration.upgrade()
+        indexes = {i["name"] for i in sa.inspect(conn).get_indexes("turni")}
+    assert {"ux_turni_user_id_giorno", "ix_turni_giorno"} <= indexes
@@ -82,9 +82,27 @@ def test_user_turni_listed_after_creation(setup_db):
 
         res = client.get("/users/")
         assert res.status_code == 200
-        users = res.json()
-        found = next(u for u in users if u["id"] == user_id)
+        found = next(u for u in res.json() if u["id"] == user_id)
+        assert found["turni"] == []
+
+        res = client.get(
+            "/users/", params={"turni_from": "2023-01-01", "turni_to": "2023-01-31"}
+        )
+        assert res.status_code == 200
+        found = next(u for u in res.json() if u["id"] == user_id)
         assert len(found["turni"]) == 1
+        assert found["turni"][0]["giorno"] == "2023-01-01"
+
+        res = client.get("/users/", params={"turni_from": "2023-01-02"})
+        found = next(u for u in res.json() if u["id"] == user_id)
+        assert found["turni"] == []
+
+
+def test_list_users_rejects_inverted_window():
+    res = client.get(
+        "/users/", params={"turni_from": "2023-02-01", "turni_to": "2023-01-01"}
+    )
+    assert res.status_code == 400
 
 
 def test_get_user_by_email_success():
@@ -0,0 +1,104 @@
+"""``GET /users/`` must not grow with the shift history.
+
+50 users with three years of daily shifts each. The tests check what the
+lean default and a one-month window read and return; the benchmark times
+them against the old listing (``joinedload(User.turni)`` serialized through
+``UserResponse``).
+"""
+
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload
+
+from app.database import engine
+from app.dependencies import SessionLocal
+from app.main import app
+from app.models.user import User
+from app.schemas.user import UserResponse
+
+client = TestClient(app)
+
+USERS = 50
+DAYS = 3 * 365
+START = date(2021, 1, 1)
+MARCH = {"turni_from": "2022-03-01", "turni_to": "2022-03-31"}
+
+
+def _old_listing():
+    db = SessionLocal()
+    try:
+        users = (
+            db.query(User)
+            .options(joinedload(User.turni))
+            .order_by(User.nome.asc())
+            .all()
+        )
+        return [
+            UserResponse.model_validate(u).model_dump(mode="json")
+            for u in users
+        ]
+    finally:
+        db.close()
+
+
+def _statements(fn):
+    """Run ``fn`` and return its result and the SQL statements it issued."""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        return fn(), statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def test_list_users_does_not_load_shift_history(seed_shifts):
+    seed_shifts(USERS, DAYS, START)
+
+    res, statements = _statements(lambda: client.get("/users/"))
+
+    assert res.status_code == 200
+    body = res.json()
+    assert [u["nome"] for u in body] == [f"U{i:02}" for i in range(USERS)]
+    assert all(u["turni"] == [] for u in body)
+    assert len(statements) == 1
+    assert "turni" not in statements[0]
+    assert "hashed_password" not in statements[0]
+
+
+def test_list_users_loads_only_the_window(seed_shifts):
+    seed_shifts(USERS, DAYS, START)
+
+    res, statements = _statements(lambda: client.get("/users/", params=MARCH))
+
+    assert res.status_code == 200
+    body = res.json()
+    assert len(body) == USERS
+    days = {t["giorno"] for u in body for t in u["turni"]}
+    assert len(days) == 31
+    assert min(days) == "2022-03-01" and max(days) == "2022-03-31"
+    assert all(len(u["turni"]) == 31 for u in body)
+    # users, then their turni in the window filtered in SQL
+    assert len(statements) == 2
+    assert "giorno >=" in statements[1] and "giorno <=" in statements[1]
+
+
+@pytest.mark.benchmark(group="users-list")
+@pytest.mark.parametrize("listing", ["joinedload", "lean", "window"])
+def test_benchmark_list_users(benchmark, seed_shifts, listing):
+    seed_shifts(USERS, DAYS, START)
+    listings = {
+        "joinedload": _old_listing,
+        "lean": lambda: client.get("/users/").json(),
+        "window": lambda: client.get("/users/", params=MARCH).json(),
+    }
+
+    users = benchmark(listings[listing])
+
+    assert len(users) == USERS
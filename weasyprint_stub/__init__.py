@@ -1,7 +1,14 @@
 class HTML:
-    def __init__(self, filename=None, string=None):
+    def __init__(self, filename=None, string=None, base_url=None):
         self.filename = filename
         self.string = string
-    def write_pdf(self, target, *args, **kwargs):
+        self.base_url = base_url
+    def write_pdf(self, target=None, *args, **kwargs):
+        data = b"%PDF-1.4 stub"
+        if target is None:
+            return data
+        if hasattr(target, "write"):
+            target.write(data)
+            return None
         with open(target, 'wb') as f:
-            f.write(b"%PDF-1.4 stub")
+            f.write(data)